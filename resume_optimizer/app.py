@@ -1,12 +1,43 @@
 from pathlib import Path
 import os
 import json
+import uuid
 import streamlit as st
 
-from utils.parser import extract_text_and_fields
-from utils.scorer import load_keywords, score_text
+from utils.parser import iter_extract
+from utils.vocab import CompactScore
+from utils.incremental import SessionCache
+from utils.keyword_store import get_keywords
 from utils.optimizer import optimize_text, llm_available
-from utils.exporter import to_pdf_bytes, to_docx_bytes
+from utils.exporter import export_bytes
+from utils.semantic import load_model
+from utils.metrics import trace
+from utils.jobs import LOCAL_WORKERS, WorkerPool, get_job_store
+
+
+@st.cache_resource
+def load_semantic_model():
+    # IDF and term index are memory-mapped, so processes share their pages; falls back to per-pair TF-IDF when no model is saved
+    model_dir = os.environ.get("SEMANTIC_MODEL_DIR") or str(Path(__file__).parent / "data" / "semantic_model")
+    try:
+        return load_model(Path(model_dir))
+    except Exception:
+        return None
+
+
+@st.cache_resource
+def scoring_sessions():
+    # Shared and bounded: a session's resume analysis is too heavy to keep in every browser's session state
+    return SessionCache()
+
+
+@st.cache_resource
+def job_queue():
+    # One queue and worker pool per app process; jobs and their results outlive page reruns
+    store = get_job_store()
+    if LOCAL_WORKERS > 0:
+        WorkerPool(store.path, LOCAL_WORKERS).start()
+    return store
 
 
 def load_css():
@@ -22,38 +53,102 @@ def sidebar_controls():
     with st.sidebar:
         st.header("Settings")
         # Allow entering an API key inline (optional); will be set only for this session
-        api_key = st.text_input("Groq API Key (optional)", type="password", help="If provided, enables LLM optimization via Groq for this session.")
+        api_key = st.text_input("Groq API Key (optional)", type="password", key="groq_key", help="If provided, enables LLM optimization via Groq for this session.")
         if api_key:
             os.environ["GROQ_API_KEY"] = api_key
         use_llm_default = llm_available()
         use_llm = st.toggle("Use LLM optimization", value=use_llm_default)
         export_fmt = st.selectbox("Export format", ["PDF", "DOCX"], index=0)
+        live_score = st.toggle("Live scoring", value=False, help="Re-score on every job description edit.")
+        show_timings = st.toggle("Show timings", value=False, help="Per-stage timing breakdown for this run.")
+        background = st.toggle(
+            "Background jobs", value=True, help="Score and optimise in worker processes; results appear when ready."
+        )
         st.caption("Set GROQ_API_KEY or enter it above. If unset, optimization falls back to rule-based.")
-    return use_llm, export_fmt
+    return use_llm, export_fmt, live_score, show_timings, background
 
 
 def _reset_state():
     for k in [
         "resume_text",
         "fields",
-        "score",
-        "details",
-        "matched",
-        "missing",
+        "score_result",
         "optimized",
+        "score_job",
+        "optimize_job",
+        "job_error",
     ]:
         if k in st.session_state:
             del st.session_state[k]
 
 
+def render_fields(fields):
+    st.subheader("Extracted details")
+    cols = st.columns(3)
+    cols[0].metric("Name", fields.get("name", "-") or "-")
+    cols[1].metric("Email", fields.get("email", "-") or "-")
+    cols[2].metric("Phone", fields.get("phone", "-") or "-")
+
+
+@st.experimental_fragment(run_every=1.0)
+def poll_jobs(store, kw_dir):
+    # Re-runs on its own every second while jobs are pending; a finished job triggers a full rerun
+    finished = False
+    for key, label in (("score_job", "Scoring"), ("optimize_job", "Optimization")):
+        job_id = st.session_state.get(key)
+        if not job_id:
+            continue
+        job = store.get(job_id)
+        if job is not None and job.pending:
+            st.info(f"{label} {job.status}…")
+            continue
+        del st.session_state[key]
+        finished = True
+        if job is None:
+            st.session_state.job_error = f"{label} job expired before its result was collected."
+        elif job.status == "failed":
+            st.session_state.job_error = f"{label} failed: {job.error}"
+        elif key == "score_job":
+            r = job.result
+            st.session_state.score_result = CompactScore.from_result(
+                (r["overall"], r["matched"], r["missing"], r["details"]), get_keywords(kw_dir)
+            )
+        else:
+            st.session_state.optimized = job.result["optimized"]
+    if finished:
+        st.rerun()
+
+
+def render_timings(request_trace):
+    with st.expander("Timing breakdown (this run)", expanded=True):
+        st.caption(f"Total {request_trace.elapsed * 1000:.1f} ms")
+        rows = request_trace.breakdown()
+        if rows:
+            st.table(rows)
+        else:
+            st.write("No instrumented work ran.")
+        counts = request_trace.counts()
+        if counts:
+            st.write(", ".join(f"{k}: {v:g}" for k, v in sorted(counts.items())))
+
+
 def main():
     st.set_page_config(page_title="AI Resume Optimiser", page_icon="🧠", layout="wide")
     load_css()
+    load_semantic_model()
+
+    with trace() as request_trace:
+        show_timings = render_page()
+    if show_timings:
+        render_timings(request_trace)
+
 
+def render_page() -> bool:
     st.title("AI Resume Optimiser and Generator")
     st.caption("Upload a resume and paste a job description to get ATS-style scoring, semantic similarity, optimization suggestions, and export.")
 
-    use_llm, export_fmt = sidebar_controls()
+    use_llm, export_fmt, live_score, show_timings, background = sidebar_controls()
+    store = job_queue() if background else None
 
     left, right = st.columns([1, 1])
     with left:
@@ -97,10 +192,7 @@ def main():
     defaults = {
         "resume_text": "",
         "fields": {},
-        "score": None,
-        "details": None,
-        "matched": set(),
-        "missing": set(),
+        "score_result": None,
         "optimized": None,
     }
     for k, v in defaults.items():
@@ -109,8 +201,17 @@ def main():
 
     if uploaded is not None:
         try:
+            # Contact fields arrive with the first page/paragraph; show them while the rest is extracted
+            early = st.empty()
+            text, fields = "", {}
             with st.spinner("Parsing resume..."):
-                text, fields = extract_text_and_fields(uploaded)
+                for event in iter_extract(uploaded):
+                    if event.kind == "fields":
+                        with early.container():
+                            render_fields(event.fields)
+                    else:
+                        text, fields = event.text, event.fields
+            early.empty()
             if not (text or '').strip():
                 st.warning("No text could be extracted from the uploaded file.")
             st.session_state.resume_text = text
@@ -120,70 +221,52 @@ def main():
             st.error(f"Failed to parse file: {e}")
 
     if st.session_state.resume_text:
-        st.subheader("Extracted details")
-        cols = st.columns(3)
-        cols[0].metric("Name", st.session_state.fields.get("name", "-") or "-")
-        cols[1].metric("Email", st.session_state.fields.get("email", "-") or "-")
-        cols[2].metric("Phone", st.session_state.fields.get("phone", "-") or "-")
+        render_fields(st.session_state.fields)
 
         st.subheader("Resume text (parsed)")
         st.text_area("", st.session_state.resume_text, height=220, key="resume_text_view")
 
-        if st.button("Score vs Job Description", type="primary", disabled=not bool(jd.strip())):
-            kw_dir = Path(__file__).parent / "data" / "keywords"
+        kw_dir = Path(__file__).parent / "data" / "keywords"
+        clicked = st.button("Score vs Job Description", type="primary", disabled=not bool(jd.strip()))
+        if clicked and store is not None and not live_score:
+            # Live scoring stays in-process: it only re-scans the edited JD lines
+            st.session_state.score_job = store.submit(
+                "score", {"resume_text": st.session_state.resume_text, "job_desc": jd}
+            )
+        elif clicked or (live_score and jd.strip()):
             with st.spinner("Scoring vs JD..."):
-                kw_by_cat = load_keywords(kw_dir)
-                score, matched, missing, details = score_text(st.session_state.resume_text, jd, kw_by_cat)
-            st.session_state.score = score
-            st.session_state.details = details
-            st.session_state.matched = matched
-            st.session_state.missing = missing
-
-        if st.session_state.score is not None and st.session_state.details is not None:
+                kw_by_cat = get_keywords(kw_dir)
+                # The session keeps the resume analysed and only re-scans the edited JD lines
+                if "scoring_key" not in st.session_state:
+                    st.session_state.scoring_key = uuid.uuid4().hex
+                session = scoring_sessions().get(st.session_state.scoring_key, st.session_state.resume_text, kw_by_cat)
+                # Kept as keyword ids over the shared vocabulary rather than sets of strings
+                st.session_state.score_result = CompactScore.from_result(session.update(jd), kw_by_cat)
+
+        result = st.session_state.score_result
+        if result is not None:
             st.subheader("ATS-style scoring")
             c1, c2, c3 = st.columns(3)
-            c1.metric("Overall score", f"{st.session_state.score:.1f} / 100")
-            c2.metric("Exact match", f"{st.session_state.details.get('exact_score', 0):.1f}")
-            c3.metric("Semantic sim.", f"{st.session_state.details.get('semantic', 0):.1f}")
-            st.progress(min(1.0, st.session_state.score / 100.0))
+            c1.metric("Overall score", f"{result.overall:.1f} / 100")
+            c2.metric("Exact match", f"{result.exact_score:.1f}")
+            c3.metric("Semantic sim.", f"{result.semantic:.1f}")
+            st.progress(min(1.0, result.overall / 100.0))
 
             with st.expander("Matched keywords"):
-                st.write(", ".join(sorted(st.session_state.matched)) or "None")
+                st.write(", ".join(result.matched) or "None")
             with st.expander("Missing keywords (from JD)"):
-                st.write(", ".join(sorted(st.session_state.missing)) or "None")
+                st.write(", ".join(result.missing) or "None")
 
             # Category coverage
-            cat = st.session_state.details.get("category_breakdown", {})
+            cat = result.coverage()
             if cat:
                 st.subheader("Category coverage")
-                for category, info in cat.items():
-                    coverage = info.get("coverage", 0.0)
+                for category, coverage in cat.items():
                     st.write(f"{category} — {coverage:.0f}%")
                     st.progress(int(coverage) / 100.0)
 
-            # Download score report as JSON (ensure all sets are serializable)
-            _details = st.session_state.details or {}
-            _cat = _details.get("category_breakdown", {})
-            cat_json = {}
-            for _k, _v in _cat.items():
-                if isinstance(_v, dict):
-                    cat_json[_k] = {
-                        "coverage": float(_v.get("coverage", 0.0)),
-                        "matched": sorted(list(_v.get("matched", []))),
-                        "missing": sorted(list(_v.get("missing", []))),
-                    }
-            details_json = {
-                "exact_score": float(_details.get("exact_score", 0.0)),
-                "semantic": float(_details.get("semantic", 0.0)),
-                "category_breakdown": cat_json,
-            }
-
-            report = {
-                "overall": float(st.session_state.score),
-                "details": details_json,
-                "matched": sorted(list(st.session_state.matched)),
-                "missing": sorted(list(st.session_state.missing)),
-            }
+            # Download score report as JSON, decoded straight from the compact result
+            report = result.report()
             st.download_button(
                 label="Download score report (JSON)",
                 data=json.dumps(report, indent=2).encode("utf-8"),
@@ -194,25 +277,51 @@ def main():
         if use_llm and not llm_available():
             st.info("LLM is not available (no API key set). Optimization will fall back to rule-based.")
 
-        if st.button("Optimise Resume", disabled=not bool(jd.strip())):
-            with st.spinner("Generating optimized resume..."):
-                st.session_state.optimized = optimize_text(
-                    st.session_state.resume_text,
-                    jd,
-                    st.session_state.get("missing", set()),
-                    use_llm=use_llm,
+        optimise = st.button("Optimise Resume", disabled=not bool(jd.strip()))
+        # A key entered in the sidebar only reaches this process, not the workers
+        if optimise and store is not None and not (use_llm and st.session_state.get("groq_key")):
+            st.session_state.optimize_job = store.submit(
+                "optimize",
+                {
+                    "resume_text": st.session_state.resume_text,
+                    "job_desc": jd,
+                    "missing_keywords": result.missing if result is not None else [],
+                    "use_llm": use_llm,
+                },
+            )
+        elif optimise:
+            # Stream LLM output as it arrives, then hand over to the regular view below
+            live = st.empty()
+            with live.container():
+                st.caption("Generating optimized resume...")
+                streamed = st.write_stream(
+                    optimize_text(
+                        st.session_state.resume_text,
+                        jd,
+                        result.missing if result is not None else [],
+                        use_llm=use_llm,
+                        stream=True,
+                    )
                 )
+            live.empty()
+            st.session_state.optimized = streamed if isinstance(streamed, str) else "".join(map(str, streamed))
+
+        if st.session_state.get("job_error"):
+            st.error(st.session_state.pop("job_error"))
+        if store is not None and (st.session_state.get("score_job") or st.session_state.get("optimize_job")):
+            poll_jobs(store, kw_dir)
 
         if st.session_state.optimized:
             st.subheader("Optimized resume")
             st.text_area("Optimized text", st.session_state.optimized, height=320, key="opt_text_view")
 
+            # Not a background job: download_button needs the bytes while this run renders,
+            # and export_bytes is memoized per text and format, so only the first render pays
+            data_bytes = export_bytes(st.session_state.optimized, export_fmt)
             if export_fmt == "PDF":
-                data_bytes = to_pdf_bytes(st.session_state.optimized)
                 file_name = "optimized_resume.pdf"
                 mime = "application/pdf"
             else:
-                data_bytes = to_docx_bytes(st.session_state.optimized)
                 file_name = "optimized_resume.docx"
                 mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
@@ -223,6 +332,8 @@ def main():
                 mime=mime,
             )
 
+    return show_timings
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+"""
+Throughput of the batch rule-based optimizer.
+
+    python resume_optimizer/benchmarks/bench_optimize_batch.py
+    python resume_optimizer/benchmarks/bench_optimize_batch.py --docs 200000 --min-rate 10000
+
+Three campaign shapes, each ``--docs`` outputs on one core: one resume tailored
+to many JDs, many resumes tailored to one JD, and the triples produced from
+``score_many`` output (scoring itself is not timed). Reports docs/min for
+``optimize_many_rules`` next to calling ``optimize_text`` per document, checks
+that both produce identical texts, and exits 1 if a shape falls below
+``--min-rate`` docs/min.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import corpus  # noqa: E402
+from utils.matcher import KeywordIndex  # noqa: E402
+from utils.optimizer import optimize_many_rules, optimize_text, scored_triples  # noqa: E402
+from utils.scorer import score_many  # noqa: E402
+
+
+def _missing(seed: int):
+    rnd = random.Random(seed)
+    return set(rnd.sample(corpus.SKILLS, rnd.randint(0, 12)))
+
+
+def shapes(n: int):
+    resumes = [corpus.resume_text(2, seed=i) for i in range(50)]
+    jds = [corpus.job_description(i) for i in range(50)]
+    # Distinct missing sets per JD / per resume, as a scorer would produce
+    missing = [_missing(i) for i in range(500)]
+    one_resume = lambda: ((resumes[0], jds[i % len(jds)], missing[i % 500]) for i in range(n))  # noqa: E731
+    one_jd = lambda: ((resumes[i % len(resumes)], jds[0], missing[i % 50]) for i in range(n))  # noqa: E731
+    rows = score_many(resumes[:20], jds, KeywordIndex(corpus.keywords(200)))
+    triples = list(scored_triples(resumes[:20], jds, rows))
+    from_scores = lambda: (triples[i % len(triples)] for i in range(n))  # noqa: E731
+    return {"one resume x JDs": one_resume, "resumes x one JD": one_jd, "from score_many": from_scores}
+
+
+def _rate(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return n / max(1e-9, time.perf_counter() - t0) * 60.0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the batch rule-based optimizer")
+    ap.add_argument("--docs", type=int, default=50_000)
+    ap.add_argument("--min-rate", type=float, default=10_000.0, help="Required docs/min for the batch path")
+    args = ap.parse_args(argv)
+
+    failed = False
+    print(f"{'shape':<20}{'batch docs/min':>16}{'per-call docs/min':>19}{'peak MB':>9}  identical")
+    for name, make in shapes(args.docs).items():
+        # Input generation is part of the loop for both paths, so the difference is the optimizer
+        sink = [0]
+
+        def batch():
+            for text in optimize_many_rules(make()):
+                sink[0] += len(text)
+
+        def single():
+            for r, jd, missing in make():
+                sink[0] += len(optimize_text(r, jd, missing, use_llm=False))
+
+        batch_rate = _rate(batch, args.docs)
+        single_rate = _rate(single, args.docs)
+        tracemalloc.start()
+        batch()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        sample = list(itertools.islice(make(), 2000))
+        same = list(optimize_many_rules(sample)) == [optimize_text(r, j, m, use_llm=False) for r, j, m in sample]
+        print(f"{name:<20}{batch_rate:>16,.0f}{single_rate:>19,.0f}{peak:>9.1f}  {'yes' if same else 'NO'}")
+        failed |= not same or batch_rate < args.min_rate
+    if failed:
+        print(f"FAIL: output mismatch or below {args.min_rate:,.0f} docs/min")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
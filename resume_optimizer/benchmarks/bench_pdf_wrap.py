@@ -0,0 +1,126 @@
+"""
+PDF line-wrapping benchmark.
+
+    python resume_optimizer/benchmarks/bench_pdf_wrap.py --pages 100
+
+Wraps a synthetic ~100-page resume with the width-table engine in
+``utils.exporter`` and with the previous per-candidate measuring algorithm,
+checks that both produce identical lines and reports the timings.
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fpdf import FPDF  # noqa: E402
+
+from utils.exporter import _WidthTable, _latin1_safe, _wrap_line, to_pdf_bytes  # noqa: E402
+
+WORDS = (
+    "led designed built scaled python kubernetes microservices latency throughput "
+    "reduced improved 35% customers pipeline data platform team stakeholders "
+    "architecture observability https://example.com/a/really/long/path/segment"
+).split()
+
+
+def synthetic_text(pages: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    lines = []
+    # ~45 lines per page, a mix of bullets, long paragraphs and unbreakable tokens
+    for i in range(pages * 45):
+        if i % 15 == 0:
+            lines.append("")
+            lines.append("EXPERIENCE")
+        n = rnd.choice([6, 12, 40, 120])
+        words = [rnd.choice(WORDS) for _ in range(n)]
+        if i % 37 == 0:
+            words.append("x" * 400)
+        lines.append("- " + " ".join(words))
+    return "\n".join(lines)
+
+
+def legacy_wrap_line(pdf: FPDF, s: str, max_w: float):
+    """The original quadratic algorithm, kept here as the reference output."""
+
+    def break_long_word(word: str):
+        parts = []
+        buf = ""
+        for ch in word:
+            if pdf.get_string_width(buf + ch) <= max_w:
+                buf += ch
+            else:
+                if buf:
+                    parts.append(buf)
+                    buf = ch
+                else:
+                    parts.append(ch)
+                    buf = ""
+        if buf:
+            parts.append(buf)
+        return parts
+
+    words = s.split(" ")
+    lines = []
+    current = ""
+    while words:
+        w = words[0]
+        candidate = w if not current else current + " " + w
+        if pdf.get_string_width(candidate) <= max_w:
+            current = candidate
+            words.pop(0)
+        else:
+            if current:
+                lines.append(current)
+                current = ""
+            else:
+                parts = break_long_word(w)
+                lines.extend(parts[:-1])
+                current = parts[-1] if parts else ""
+                words.pop(0)
+    if current:
+        lines.append(current)
+    return lines
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    text = synthetic_text(args.pages)
+    raw_lines = [_latin1_safe(r).replace("\t", "    ") for r in text.splitlines()]
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=11)
+    max_w = pdf.w - pdf.l_margin - pdf.r_margin
+
+    t0 = time.perf_counter()
+    widths = _WidthTable(pdf)
+    new = [_wrap_line(r, widths, max_w) for r in raw_lines if r.strip()]
+    t_new = time.perf_counter() - t0
+    print(f"input: {len(text):,} chars, {len(raw_lines):,} lines")
+    print(f"width-table wrap: {t_new * 1000:.1f} ms")
+
+    if not args.skip_legacy:
+        t0 = time.perf_counter()
+        old = [legacy_wrap_line(pdf, r, max_w) for r in raw_lines if r.strip()]
+        t_old = time.perf_counter() - t0
+        print(f"legacy wrap:      {t_old * 1000:.1f} ms ({t_old / max(t_new, 1e-9):.1f}x slower)")
+        if old != new:
+            print("MISMATCH: wrapped output differs from the legacy algorithm")
+            return 1
+        print("output identical")
+
+    t0 = time.perf_counter()
+    size = len(to_pdf_bytes(text))
+    print(f"to_pdf_bytes end-to-end: {(time.perf_counter() - t0) * 1000:.1f} ms, {size:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""
+Search index benchmark: build time, query latency and ranking agreement.
+
+    python resume_optimizer/benchmarks/bench_search.py                  # 100k resumes
+    python resume_optimizer/benchmarks/bench_search.py --docs 1000000 --index /data/idx
+    python resume_optimizer/benchmarks/bench_search.py --quick
+
+Builds a ``SearchIndex`` over synthetic resumes (model fitted on the first
+batch), then times ``search`` for a set of job descriptions and reports
+p50/p95/p99 latency. ``--check`` resumes are also ranked with
+``score_many`` under the index's model; the top-k ids must agree (ties aside).
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import corpus  # noqa: E402
+from utils import semantic  # noqa: E402
+from utils.matcher import KeywordIndex  # noqa: E402
+from utils.scorer import score_many  # noqa: E402
+from utils.search_index import SearchIndex  # noqa: E402
+
+
+def _docs(n: int):
+    for i in range(n):
+        # First 16 lines: contact, summary, skills and a few bullets
+        yield f"cand-{i:07d}", "\n".join(corpus.resume_text(1, seed=i).splitlines()[:16])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the resume search index")
+    ap.add_argument("--docs", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--top-k", type=int, default=10)
+    ap.add_argument("--keywords", type=int, default=500)
+    ap.add_argument("--batch-size", type=int, default=50_000)
+    ap.add_argument("--check", type=int, default=2000, help="Resumes to re-rank with score_many (0 to skip)")
+    ap.add_argument("--index", type=Path, help="Keep the index here (default: a temporary directory)")
+    ap.add_argument("--quick", action="store_true", help="10k resumes, 20 queries")
+    args = ap.parse_args(argv)
+    if args.quick:
+        args.docs, args.queries = 10_000, 20
+
+    directory = args.index or Path(tempfile.mkdtemp()) / "index"
+    kw = KeywordIndex(corpus.keywords(args.keywords))
+    try:
+        t0 = time.perf_counter()
+        index = SearchIndex.create(directory, kw)
+        index.add(_docs(args.docs), batch_size=args.batch_size)
+        build = time.perf_counter() - t0
+        size = sum(f.stat().st_size for f in directory.rglob("*") if f.is_file())
+        print(f"built {len(index)} docs in {build:.1f}s ({len(index) / build:.0f} docs/s), {size / 1e6:.1f} MB on disk")
+
+        jds = [corpus.job_description(seed) for seed in range(args.queries)]
+        index.search(jds[0], args.top_k)  # warm-up: vectorizer, page cache
+        samples = []
+        for jd in jds:
+            t0 = time.perf_counter()
+            index.search(jd, args.top_k)
+            samples.append(time.perf_counter() - t0)
+        ms = np.asarray(samples) * 1000.0
+        print(
+            f"search top-{args.top_k}: p50 {np.percentile(ms, 50):.2f} ms  p95 {np.percentile(ms, 95):.2f} ms  "
+            f"p99 {np.percentile(ms, 99):.2f} ms  ({len(samples) / ms.sum() * 1000.0:.0f} queries/s)"
+        )
+
+        if args.check:
+            # Rank a subset both ways; the subset lives in its own index so the top-k are comparable
+            sub_dir = directory.with_name(directory.name + "-check")
+            sub = SearchIndex.create(sub_dir, kw, index.model)
+            docs = list(_docs(min(args.check, args.docs)))
+            sub.add(docs)
+            semantic.set_model(index.model)
+            texts = [t for _, t in docs]
+            mismatches = 0
+            for jd in jds[:5]:
+                hits = sub.search(jd, args.top_k)
+                ref = sorted(((row[0][0], i) for i, row in enumerate(score_many(texts, [jd], kw))), reverse=True)
+                cutoff = ref[args.top_k - 1][0]
+                expected = {docs[i][0] for s, i in ref if s >= cutoff}
+                mismatches += sum(1 for h in hits if h.doc_id not in expected)
+                mismatches += sum(1 for h, (s, _) in zip(hits, ref) if h.score != s)
+            semantic.set_model(None)
+            shutil.rmtree(sub_dir, ignore_errors=True)
+            print(f"ranking check vs score_many on {len(docs)} docs: {'ok' if not mismatches else f'{mismatches} mismatches'}")
+            if mismatches:
+                return 1
+    finally:
+        if args.index is None:
+            shutil.rmtree(directory.parent, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
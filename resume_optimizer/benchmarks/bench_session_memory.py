@@ -0,0 +1,87 @@
+"""
+Per-session memory of stored scoring results.
+
+    python resume_optimizer/benchmarks/bench_session_memory.py
+    python resume_optimizer/benchmarks/bench_session_memory.py --sessions 500 --keywords 500,5000,20000
+
+Scores ``--sessions`` different resume/JD pairs and keeps each result the way a
+Streamlit session would: the full ``score_text`` tuple (sets of keywords overall
+and per category) versus a ``CompactScore`` (two sorted keyword-id arrays over
+the shared keyword vocabulary). Reports the retained Python heap per session
+measured with tracemalloc, the one-off size of the shared vocabulary, and the
+size of one live-scoring ``ScoringSession`` (the app keeps at most
+``RESUME_SCORING_SESSIONS`` of those per process, not one per browser session).
+"""
+from __future__ import annotations
+import argparse
+import copy
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import corpus  # noqa: E402
+from utils.matcher import KeywordIndex  # noqa: E402
+from utils.incremental import ScoringSession  # noqa: E402
+from utils.scorer import score_text  # noqa: E402
+from utils.vocab import CompactScore  # noqa: E402
+
+
+def _retained(build) -> int:
+    """Bytes still allocated after ``build()`` returns (its result is kept alive)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def _live_session(resume: str, jd: str, kw) -> ScoringSession:
+    session = ScoringSession(resume, kw)
+    session.update(jd)
+    return session
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Per-session memory of stored score results")
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--keywords", default="500,5000", help="Comma-separated keyword list sizes")
+    args = ap.parse_args(argv)
+
+    print(
+        f"{'keywords':>9}{'sets B/session':>16}{'compact B/session':>19}{'ratio':>8}{'vocab KB':>10}"
+        f"{'scoring session KB':>20}"
+    )
+    for n in [int(x) for x in args.keywords.split(",") if x.strip()]:
+        kw = KeywordIndex(corpus.keywords(n))
+        kw.matcher
+        vocab_bytes = _retained(lambda: kw.vocab)
+        # 40 skills per JD so the results carry realistic matched/missing lists
+        pairs = [
+            (corpus.resume_text(1, seed=i), corpus.job_description(i, n_skills=40)) for i in range(args.sessions)
+        ]
+        results = [score_text(r, jd, kw) for r, jd in pairs]
+
+        # deepcopy: each session holds its own sets (keyword strings stay shared, as in the app)
+        sets_bytes = _retained(lambda: copy.deepcopy(results)) / args.sessions
+        compact_bytes = _retained(lambda: [CompactScore.from_result(r, kw) for r in results]) / args.sessions
+        n_live = min(args.sessions, 20)
+        session_bytes = _retained(lambda: [_live_session(r, jd, kw) for r, jd in pairs[:n_live]]) / n_live
+        print(
+            f"{n:>9}{sets_bytes:>16.0f}{compact_bytes:>19.0f}{sets_bytes / max(1.0, compact_bytes):>7.1f}x"
+            f"{vocab_bytes / 1024:>10.1f}{session_bytes / 1024:>20.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
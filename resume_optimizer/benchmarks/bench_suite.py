@@ -0,0 +1,212 @@
+"""
+Benchmark suite for the parse, score, semantic, optimize and export stages.
+
+    python resume_optimizer/benchmarks/bench_suite.py                      # full run
+    python resume_optimizer/benchmarks/bench_suite.py --quick --stages score,semantic
+    python resume_optimizer/benchmarks/bench_suite.py --json base.json     # save results
+    python resume_optimizer/benchmarks/bench_suite.py --baseline base.json # flag regressions
+    python resume_optimizer/benchmarks/bench_suite.py --profile prof/      # cProfile dumps
+
+Inputs are deterministic synthetic corpora (``corpus.py``) from a one-page
+resume to a 40-page CV, and keyword lists from 25 to 5000 entries. Every case
+reports latency percentiles, throughput and the peak Python heap measured with
+tracemalloc on a separate run. Caches (parse, pair vectorizer, export) are
+bypassed so each call does the full work.
+
+``--profile DIR`` writes one ``<stage>-<size>.prof`` per case; open them with
+``python -m pstats``, snakeviz, or turn them into a flamegraph with flameprof.
+With ``--baseline`` a case is a regression when its p50 latency or peak memory
+grows by more than ``--threshold`` (default 25%); the exit status is then 1.
+"""
+from __future__ import annotations
+import argparse
+import cProfile
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import corpus  # noqa: E402
+from utils.exporter import to_docx_bytes, to_pdf_bytes  # noqa: E402
+from utils.matcher import KeywordIndex  # noqa: E402
+from utils.optimizer import optimize_text  # noqa: E402
+from utils.parser import extract_text_and_fields  # noqa: E402
+from utils.scorer import score_text  # noqa: E402
+from utils.semantic import _vectorize_pair, semantic_similarity  # noqa: E402
+
+STAGES = ["parse_pdf", "parse_docx", "score", "semantic", "optimize", "export_pdf", "export_docx"]
+
+
+class Case(NamedTuple):
+    stage: str
+    size: str
+    fn: Callable[[], object]
+
+    @property
+    def name(self) -> str:
+        return f"{self.stage}/{self.size}"
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def build_cases(stages: List[str], quick: bool) -> List[Case]:
+    pages = [1, 5] if quick else [1, 5, 40]
+    kw_sizes = [25, 500] if quick else [25, 500, 5000]
+    texts = {p: corpus.resume_text(p, seed=p) for p in pages}
+    jd = corpus.job_description(0)
+    default_kw = KeywordIndex(corpus.keywords(100))
+    cases: List[Case] = []
+
+    def add(stage: str, size: str, fn: Callable[[], object]) -> None:
+        if stage in stages:
+            cases.append(Case(stage, size, fn))
+
+    for p in pages:
+        if "parse_pdf" in stages:
+            data = corpus.pdf_bytes(texts[p])
+            add("parse_pdf", f"{p}p", lambda d=data: extract_text_and_fields(_Upload(d, "cv.pdf"), use_cache=False))
+        if "parse_docx" in stages:
+            data = corpus.docx_bytes(texts[p])
+            add("parse_docx", f"{p}p", lambda d=data: extract_text_and_fields(_Upload(d, "cv.docx"), use_cache=False))
+
+    def scored(text: str, kw) -> object:
+        _vectorize_pair.cache_clear()
+        return score_text(text, jd, kw)
+
+    for p in pages:
+        add("score", f"{p}p-kw100", lambda t=texts[p]: scored(t, default_kw))
+    for n in kw_sizes:
+        kw = KeywordIndex(corpus.keywords(n))
+        kw.matcher  # compiled once, as with a KeywordStore
+        add("score", f"5p-kw{n}", lambda k=kw: scored(texts[5], k))
+
+    def semantic(text: str) -> float:
+        _vectorize_pair.cache_clear()
+        return semantic_similarity(text, jd)
+
+    for p in pages:
+        add("semantic", f"{p}p", lambda t=texts[p]: semantic(t))
+        add("optimize", f"{p}p", lambda t=texts[p]: optimize_text(t, jd, ["kubernetes", "terraform"], use_llm=False))
+        add("export_pdf", f"{p}p", lambda t=texts[p]: to_pdf_bytes(t))
+        add("export_docx", f"{p}p", lambda t=texts[p]: to_docx_bytes(t))
+    return cases
+
+
+def run_case(case: Case, repeat: int, max_time: float, profile_dir: Optional[Path]) -> Dict[str, float]:
+    case.fn()  # warm-up: imports, compiled regexes, font metrics
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < repeat:
+        t0 = time.perf_counter()
+        case.fn()
+        samples.append(time.perf_counter() - t0)
+        if len(samples) >= 3 and time.perf_counter() - started > max_time:
+            break
+
+    if profile_dir:
+        # Profiled separately so the tracing overhead does not skew the timings
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in samples:
+            case.fn()
+        profiler.disable()
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(profile_dir / f"{case.stage}-{case.size}.prof"))
+
+    tracemalloc.start()
+    try:
+        case.fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ms = np.asarray(samples) * 1000.0
+    return {
+        "n": len(samples),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "ops_per_s": float(len(samples) / max(1e-9, sum(samples))),
+        "peak_mb": peak / 1e6,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Names of cases whose p50 latency or peak memory grew by more than ``threshold`` over the baseline."""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "peak_mb"):
+            if base.get(metric) and r[metric] > base[metric] * (1.0 + threshold):
+                regressions.append(f"{name} {metric}: {base[metric]:.2f} -> {r[metric]:.2f}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark parse/score/semantic/optimize/export")
+    ap.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)}")
+    ap.add_argument("--quick", action="store_true", help="Smaller sizes and fewer repeats (CI smoke run)")
+    ap.add_argument("--repeat", type=int, default=None, help="Timed calls per case (default 20, quick 5)")
+    ap.add_argument("--max-time", type=float, default=10.0, help="Stop repeating a case after this many seconds")
+    ap.add_argument("--json", type=Path, help="Write results to this file")
+    ap.add_argument("--baseline", type=Path, help="Compare against results saved with --json")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Relative growth counted as a regression")
+    ap.add_argument("--profile", type=Path, help="Directory for per-case cProfile dumps")
+    args = ap.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    repeat = args.repeat or (5 if args.quick else 20)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"] if args.baseline else {}
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'case':<24}{'n':>4}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'peak MB':>9}  vs base")
+    for case in build_cases(stages, args.quick):
+        r = run_case(case, repeat, args.max_time, args.profile)
+        results[case.name] = r
+        base = baseline.get(case.name)
+        delta = f"{r['p50_ms'] / base['p50_ms']:.2f}x" if base and base.get("p50_ms") else ""
+        print(
+            f"{case.name:<24}{r['n']:>4}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            f"{r['ops_per_s']:>10.1f}{r['peak_mb']:>9.2f}  {delta}"
+        )
+
+    if args.json:
+        meta = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+        }
+        args.json.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+    if args.profile:
+        print(f"profiles written to {args.profile}/")
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+"""
+Deterministic synthetic corpora for the benchmarks: resumes of a given page
+count, job descriptions, keyword category sets of a given size, and the same
+resumes rendered as PDF/DOCX bytes.
+"""
+from __future__ import annotations
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.scorer import DEFAULT_KEYWORDS  # noqa: E402
+
+SKILLS = sorted(DEFAULT_KEYWORDS["General"]) + [
+    "terraform", "spark", "kafka", "airflow", "react", "typescript", "go", "rust",
+    "postgresql", "redis", "elasticsearch", "linux", "ci/cd", "git", "jenkins",
+    "data engineering", "deep learning", "computer vision", "a/b testing",
+]
+VERBS = "led designed built scaled migrated automated reduced improved launched mentored owned shipped".split()
+NOUNS = (
+    "pipeline platform service api dashboard model cluster workflow team roadmap "
+    "latency throughput cost reliability onboarding customers stakeholders"
+).split()
+HEADINGS = ["Experience", "Projects", "Education", "Publications", "Certifications"]
+LINES_PER_PAGE = 45
+
+
+def _bullet(rnd: random.Random) -> str:
+    words = [rnd.choice(VERBS)]
+    for _ in range(rnd.randint(6, 18)):
+        words.append(rnd.choice(SKILLS) if rnd.random() < 0.25 else rnd.choice(NOUNS))
+    return "- " + " ".join(words) + f", cutting cost by {rnd.randint(5, 60)}%."
+
+
+def resume_text(pages: int, seed: int = 0) -> str:
+    """A resume of roughly ``pages`` pages: contact block, summary, skills, then headed sections of bullets."""
+    rnd = random.Random(seed)
+    lines = [
+        "Jordan Example",
+        "Senior Software Engineer",
+        f"jordan{seed}@example.com | +1-555-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)} | Remote",
+        "",
+        "Summary",
+        "Engineer with a track record of " + " ".join(rnd.choice(NOUNS) for _ in range(12)) + ".",
+        "",
+        "Skills",
+        ", ".join(rnd.sample(SKILLS, 12)),
+    ]
+    target = max(1, pages) * LINES_PER_PAGE
+    while len(lines) < target:
+        lines.extend(["", rnd.choice(HEADINGS)])
+        lines.append(f"Company {rnd.randint(1, 999)} — {rnd.choice(NOUNS).title()} Engineer, 20{rnd.randint(10, 24)}")
+        lines.extend(_bullet(rnd) for _ in range(rnd.randint(4, 10)))
+    return "\n".join(lines[:target])
+
+
+def job_description(seed: int = 0, n_skills: int = 10) -> str:
+    rnd = random.Random(10_000 + seed)
+    skills = rnd.sample(SKILLS, min(n_skills, len(SKILLS)))
+    return (
+        f"We are hiring a {rnd.choice(NOUNS)} engineer.\n"
+        f"Requirements: {', '.join(skills)}.\n"
+        + "\n".join(_bullet(rnd)[2:] for _ in range(8))
+        + "\nStrong communication and leadership in agile teams."
+    )
+
+
+def keywords(n: int, seed: int = 0) -> Dict[str, Set[str]]:
+    """``n`` keywords in four categories: the real skills first, padded with synthetic terms and phrases."""
+    rnd = random.Random(20_000 + seed)
+    pool: List[str] = list(SKILLS)
+    i = 0
+    while len(pool) < n:
+        i += 1
+        pool.append(f"tool{i}" if rnd.random() < 0.7 else f"{rnd.choice(NOUNS)} tool{i}")
+    pool = pool[:n]
+    cats: Dict[str, Set[str]] = {}
+    for j, kw in enumerate(pool):
+        cats.setdefault(["Languages", "Cloud", "Data", "Soft Skills"][j % 4], set()).add(kw)
+    return cats
+
+
+def pdf_bytes(text: str) -> bytes:
+    from utils.exporter import to_pdf_bytes
+
+    return to_pdf_bytes(text)
+
+
+def docx_bytes(text: str) -> bytes:
+    from utils.exporter import to_docx_bytes
+
+    return to_docx_bytes(text)
@@ -0,0 +1,135 @@
+"""
+Local fake OpenAI-compatible chat completions server for exercising the LLM path
+without a Groq account.
+
+    python resume_optimizer/benchmarks/fake_llm.py --port 8765 --latency 0.5
+    GROQ_API_KEY=test GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run resume_optimizer/app.py
+
+Answers any POST ending in ``/chat/completions`` (the Groq SDK calls
+``/openai/v1/chat/completions``), in one piece or as server-sent events when the
+request has ``"stream": true``. ``--fail-rate`` returns the given status code for
+that fraction of requests, which is handy for testing fallbacks.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+REPLY = (
+    "Professional Summary\n"
+    "Engineer delivering measurable impact with Python and cloud platforms.\n\n"
+    "Key Skills\n"
+    "Python, SQL, AWS, Docker, Kubernetes\n\n"
+    "Experience\n"
+    "- Cut p95 latency by 40% by redesigning the scoring service.\n"
+)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    chunk_delay = 0.02
+    fail_rate = 0.0
+    fail_status = 429
+    reply = REPLY
+    requests = 0
+    _lock = threading.Lock()
+
+    def log_message(self, fmt, *args):  # keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        req = json.loads(self.rfile.read(length) or b"{}")
+        with self._lock:
+            type(self).requests += 1
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            self._send_json(self.fail_status, {"error": {"message": "fake failure", "type": "fake"}})
+            return
+
+        model = req.get("model", "fake")
+        created = int(time.time())
+        if not req.get("stream"):
+            self._send_json(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": self.reply}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def emit(data: str) -> None:
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+            self.wfile.flush()
+
+        for i, word in enumerate(self.reply.split(" ")):
+            piece = word if i == 0 else " " + word
+            emit(json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }))
+            time.sleep(self.chunk_delay)
+        emit("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def serve(port: int = 0, latency: float = 0.0, fail_rate: float = 0.0, fail_status: int = 429,
+          reply: Optional[str] = None) -> ThreadingHTTPServer:
+    """Start the fake server in a daemon thread and return it (``server.server_address`` has the port)."""
+    handler = type("Handler", (FakeLLMHandler,), {
+        "latency": latency,
+        "fail_rate": fail_rate,
+        "fail_status": fail_status,
+        "reply": reply or REPLY,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds before the first byte")
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--fail-status", type=int, default=429)
+    args = ap.parse_args()
+    server = serve(args.port, args.latency, args.fail_rate, args.fail_status)
+    print(f"fake LLM listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""
+Cold-import budget check.
+
+    python resume_optimizer/benchmarks/import_budget.py            # exit 1 if over budget
+    python resume_optimizer/benchmarks/import_budget.py --update   # re-baseline import_budget.json
+
+Each case runs in a fresh interpreter (median of ``--runs``) and is checked
+against two budgets from ``import_budget.json``: its wall time in milliseconds,
+and the heavy dependencies it must not load (e.g. a .txt upload must never
+import PyPDF2). ``--update`` records the measured times with 50% headroom.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_FILE = Path(__file__).with_name("import_budget.json")
+HEAVY = ["PyPDF2", "docx", "fpdf", "sklearn", "scipy", "numpy", "groq", "httpx"]
+
+# name -> (code to time, modules it must not load)
+CASES: Dict[str, tuple] = {
+    "import utils": ("import utils", HEAVY),
+    "parse txt upload": (
+        "import io, utils\n"
+        "f = io.BytesIO(b'Jane Doe\\njane@example.com\\n+1 555 123 4567')\n"
+        "f.name = 'cv.txt'\n"
+        "utils.extract_text_and_fields(f, use_cache=False)",
+        HEAVY,
+    ),
+    "load keywords": (
+        "from pathlib import Path\nfrom utils.keyword_store import get_keywords\n"
+        "get_keywords(Path('data/keywords')).matcher",
+        HEAVY,
+    ),
+    "import optimizer": ("import utils.optimizer", ["sklearn", "groq", "httpx", "PyPDF2", "docx", "fpdf"]),
+    "import exporter": ("import utils.exporter", ["fpdf", "docx"]),
+    "import service": ("import service", ["PyPDF2", "docx", "fpdf", "sklearn", "groq"]),
+}
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+exec(compile({code!r}, "<case>", "exec"))
+ms = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({{"ms": ms, "modules": sorted({{m.split(".")[0] for m in sys.modules}})}}))
+"""
+
+
+def measure(code: str) -> Dict[str, object]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONWARNINGS="ignore")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(code=code)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check cold-import time and lazy-loading budgets")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--update", action="store_true", help="Write measured times (+50%%) to the budget file")
+    args = ap.parse_args(argv)
+
+    budgets = json.loads(BUDGET_FILE.read_text(encoding="utf-8")) if BUDGET_FILE.exists() else {}
+    measured: Dict[str, float] = {}
+    failures: List[str] = []
+    print(f"{'case':<20}{'median ms':>10}{'budget':>9}  heavy modules loaded")
+    for name, (code, forbidden) in CASES.items():
+        runs = [measure(code) for _ in range(max(1, args.runs))]
+        ms = statistics.median(r["ms"] for r in runs)
+        measured[name] = ms
+        loaded = sorted(set(runs[-1]["modules"]) & set(HEAVY))
+        budget = budgets.get(name)
+        print(f"{name:<20}{ms:>10.1f}{(f'{budget:.0f}' if budget else '-'):>9}  {', '.join(loaded) or '-'}")
+        leaked = sorted(set(loaded) & set(forbidden))
+        if leaked:
+            failures.append(f"{name}: loaded {', '.join(leaked)}")
+        if budget and not args.update and ms > budget:
+            failures.append(f"{name}: {ms:.1f} ms > budget {budget:.0f} ms")
+
+    if args.update:
+        BUDGET_FILE.write_text(
+            json.dumps({k: round(v * 1.5 + 5) for k, v in measured.items()}, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"budgets written to {BUDGET_FILE}")
+    for f in failures:
+        print(f"FAIL {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
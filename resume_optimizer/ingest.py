@@ -0,0 +1,274 @@
+"""
+Headless bulk resume ingestion.
+
+    python resume_optimizer/ingest.py resumes/ exports.zip -o parsed.jsonl --workers 8
+
+Walks directories and zip archives (members are read in memory, never extracted
+to disk), parses every PDF/DOCX/TXT with ``extract_text_and_fields`` in a
+process pool and streams one record per file to JSONL or Parquet as results
+arrive. Files already present in the output are skipped, so an interrupted run
+can simply be restarted.
+"""
+from __future__ import annotations
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from utils import parser as _parser
+from utils.parser import extract_text_and_fields
+
+SUPPORTED = {".pdf", ".docx", ".txt"}
+ZIP_SEP = "!"
+
+# (record id, path on disk, zip member or None)
+Task = Tuple[str, str, Optional[str]]
+
+
+class _NamedBytes(io.BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def iter_tasks(inputs: Sequence[str]) -> Iterator[Task]:
+    for raw in inputs:
+        p = Path(raw)
+        if p.is_dir():
+            for f in sorted(p.rglob("*")):
+                if f.is_file():
+                    yield from iter_tasks([str(f)])
+        elif p.suffix.lower() == ".zip":
+            try:
+                with zipfile.ZipFile(p) as zf:
+                    members = [m.filename for m in zf.infolist() if not m.is_dir()]
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"skipping {p}: {e}", file=sys.stderr)
+                continue
+            for m in members:
+                if Path(m).suffix.lower() in SUPPORTED:
+                    yield f"{p}{ZIP_SEP}{m}", str(p), m
+        elif p.suffix.lower() in SUPPORTED and p.is_file():
+            yield str(p), str(p), None
+
+
+_zip_handles: Dict[str, zipfile.ZipFile] = {}
+
+
+def _init_worker() -> None:
+    # Pool workers are daemonic and may not start their own PDF pool
+    _parser.PDF_WORKERS = 1
+
+
+def _read(path: str, member: Optional[str]) -> bytes:
+    if member is None:
+        return Path(path).read_bytes()
+    zf = _zip_handles.get(path)
+    if zf is None:
+        zf = _zip_handles[path] = zipfile.ZipFile(path)
+    return zf.read(member)
+
+
+def process_task(task: Task) -> Dict[str, object]:
+    rec_id, path, member = task
+    name = member or path
+    try:
+        data = _read(path, member)
+        text, fields = extract_text_and_fields(_NamedBytes(data, os.path.basename(name)), use_cache=False)
+        return {"id": rec_id, "name": os.path.basename(name), "bytes": len(data), "text": text, "fields": fields, "error": ""}
+    except Exception as e:
+        return {"id": rec_id, "name": os.path.basename(name), "bytes": 0, "text": "", "fields": {}, "error": f"{type(e).__name__}: {e}"}
+
+
+class JsonlSink:
+    def __init__(self, path: Path):
+        self.path = path
+
+    def recorded_ids(self) -> Tuple[Set[str], Set[str]]:
+        """``(parsed ids, failed ids)`` already in the output."""
+        ok: Set[str] = set()
+        failed: Set[str] = set()
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # partial line from an interrupted run
+                    (failed if rec.get("error") else ok).add(rec["id"])
+        return ok, failed
+
+    def _trim_partial_line(self) -> None:
+        """Cut a line left unfinished by a killed run, so new records start on a line of their own."""
+        with self.path.open("rb+") as f:
+            end = pos = f.seek(0, os.SEEK_END)
+            keep = 0
+            while pos > 0:
+                step = min(1 << 16, pos)
+                f.seek(pos - step)
+                nl = f.read(step).rfind(b"\n")
+                if nl >= 0:
+                    keep = pos - step + nl + 1
+                    break
+                pos -= step
+            if keep < end:
+                f.truncate(keep)
+                print(f"dropped a partial last line ({end - keep} bytes) from {self.path}", file=sys.stderr)
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._trim_partial_line()
+        self._f = self.path.open("a", encoding="utf-8")
+        return self
+
+    def write(self, rec: Dict[str, object]) -> None:
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+class ParquetSink:
+    """
+    Writes a directory of part files (requires pyarrow). Every flushed batch is a
+    complete part, written under a temporary name and renamed into place, so an
+    interrupted run loses at most the rows not yet flushed. Rows are flushed every
+    ``batch_size`` records or ``flush_seconds``, whichever comes first.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 500, flush_seconds: float = 30.0):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)") from e
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._rows: List[Dict[str, object]] = []
+        self._parts = 0
+        self._last_flush = time.monotonic()
+
+    def recorded_ids(self) -> Tuple[Set[str], Set[str]]:
+        """``(parsed ids, failed ids)`` already in the output."""
+        ok: Set[str] = set()
+        failed: Set[str] = set()
+        for part in sorted(self.path.glob("part-*.parquet")) if self.path.is_dir() else []:
+            try:
+                table = self.pq.read_table(part, columns=["id", "error"])
+            except (self.pa.ArrowInvalid, OSError) as e:
+                # e.g. a part left without a footer by a killed run of an older version
+                print(f"skipping unreadable part {part.name}: {e}", file=sys.stderr)
+                continue
+            for rec_id, err in zip(table.column("id").to_pylist(), table.column("error").to_pylist()):
+                (failed if err else ok).add(rec_id)
+        return ok, failed
+
+    def __enter__(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._prefix = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        return self
+
+    def write(self, rec: Dict[str, object]) -> None:
+        row = dict(rec)
+        row["fields"] = json.dumps(rec.get("fields") or {})
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        table = self.pa.Table.from_pylist(self._rows)
+        part = self.path / f"{self._prefix}-{self._parts:05d}.parquet"
+        tmp = part.with_name(part.name + ".tmp")
+        self.pq.write_table(table, tmp)
+        os.replace(tmp, part)
+        self._parts += 1
+        self._rows = []
+
+    def __exit__(self, *exc):
+        self._flush()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Parse directories and zip archives of resumes into JSONL or Parquet.")
+    ap.add_argument("inputs", nargs="+", help="Files, directories or .zip archives")
+    ap.add_argument("-o", "--output", required=True, help="Output .jsonl file, or directory for --format parquet")
+    ap.add_argument("--format", choices=["jsonl", "parquet"], default=None, help="Defaults to the output's extension")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunksize", type=int, default=8)
+    ap.add_argument("--no-skip", action="store_true", help="Re-process files already in the output")
+    args = ap.parse_args(argv)
+
+    out = Path(args.output)
+    fmt = args.format or ("parquet" if out.suffix.lower() == ".parquet" else "jsonl")
+    sink = ParquetSink(out) if fmt == "parquet" else JsonlSink(out)
+
+    # Failed files are retried, but a failure already recorded is not written again
+    done, known_failures = (set(), set()) if args.no_skip else sink.recorded_ids()
+    skipped = 0
+
+    def pending() -> Iterator[Task]:
+        nonlocal skipped
+        for task in iter_tasks(args.inputs):
+            if task[0] in done:
+                skipped += 1
+                continue
+            yield task
+
+    ok = failed = 0
+    start = time.perf_counter()
+    with sink:
+        if args.workers <= 1:
+            _init_worker()
+            results = map(process_task, pending())
+            pool = None
+        else:
+            pool = multiprocessing.get_context().Pool(args.workers, initializer=_init_worker)
+            results = pool.imap_unordered(process_task, pending(), chunksize=max(1, args.chunksize))
+        try:
+            for rec in results:
+                if rec["error"]:
+                    failed += 1
+                    if rec["id"] in known_failures:
+                        continue
+                else:
+                    ok += 1
+                sink.write(rec)
+                if (ok + failed) % 1000 == 0:
+                    rate = (ok + failed) / max(1e-9, time.perf_counter() - start)
+                    print(f"{ok + failed} files, {rate:.1f} files/sec", file=sys.stderr)
+        except BaseException:
+            # Ctrl-C or an error: do not wait for the parses still in flight
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    elapsed = time.perf_counter() - start
+    total = ok + failed
+    print(
+        f"processed {total} files in {elapsed:.2f}s ({total / max(1e-9, elapsed):.1f} files/sec): "
+        f"{ok} ok, {failed} failed, {skipped} skipped",
+        file=sys.stderr,
+    )
+    return 1 if failed and not ok else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
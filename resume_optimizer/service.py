@@ -0,0 +1,402 @@
+"""
+Headless HTTP API for parsing, scoring, optimization and export.
+
+    python resume_optimizer/service.py --port 8080 --workers 4
+
+Keywords and the semantic model are loaded once per worker at startup, and
+CPU-bound work (parsing, scoring, export) runs in a process pool. LLM
+optimization is I/O-bound, so it runs on a thread pool in the server process
+and shares the pooled client, cache and scheduler. Every request is bounded by
+``--timeout``: workers abandon a task once its deadline passes (including tasks
+that waited in the queue past it), and requests beyond ``--max-queue`` waiting
+tasks (per pool: process workers, LLM threads) are refused with 503 rather than
+queued behind stuck work.
+
+Endpoints (JSON in, JSON out unless noted):
+    GET  /healthz
+    GET  /metrics        Prometheus text format (per-stage latency histograms, counters)
+    POST /parse          {"filename": "cv.pdf", "content_b64": "..."}
+    POST /score          {"resume_text": "...", "job_desc": "..."}
+    POST /score/batch    {"resumes": [...], "jds": [...], "top_k": 10}
+    POST /optimize       {"resume_text": "...", "job_desc": "...", "missing_keywords": [...], "use_llm": false}
+    POST /export         {"text": "...", "format": "PDF" | "DOCX"}  -> file bytes
+    POST /search         {"job_desc": "...", "top_k": 10}  (needs --index; see utils/search_index.py)
+"""
+from __future__ import annotations
+import argparse
+import base64
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from utils import metrics
+from utils import parser as _parser
+from utils.exporter import EXPORTERS, export_bytes
+from utils.keyword_store import get_keywords
+from utils.llm_scheduler import get_scheduler
+from utils.optimizer import optimize_text
+from utils.parser import FileTooLarge, extract_text_and_fields
+from utils.scorer import score_many, score_report, score_text
+from utils.search_index import SearchIndex
+from utils.semantic import load_model
+
+KW_DIR = Path(__file__).parent / "data" / "keywords"
+MODEL_DIR = Path(os.environ.get("SEMANTIC_MODEL_DIR") or Path(__file__).parent / "data" / "semantic_model")
+MIME = {
+    "PDF": "application/pdf",
+    "DOCX": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class WorkTimeout(Exception):
+    """Raised inside a worker when a task passes its request deadline."""
+
+
+class _NamedBytes(io.BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+# ---- worker-side functions (run in the process pool) -------------------------
+
+# Search index opened by each worker (memory-mapped, so workers share its pages)
+_INDEX: Optional[SearchIndex] = None
+
+
+def _warm_worker(index_dir: Optional[str] = None) -> None:
+    global _INDEX
+    # Worker processes are daemonic and may not start their own PDF pool
+    _parser.PDF_WORKERS = 1
+    # utils imports these on first use; load them up front so no request pays for it
+    for module in ("PyPDF2", "docx", "fpdf", "sklearn.feature_extraction.text", "sklearn.metrics.pairwise"):
+        importlib.import_module(module)
+    get_keywords(KW_DIR).matcher
+    try:
+        load_model(MODEL_DIR)
+    except Exception:
+        pass
+    if index_dir:
+        _INDEX = SearchIndex.open(Path(index_dir))
+
+
+def _ping(hold: float) -> int:
+    # Holding the worker briefly makes the executor start a new process for each ping
+    time.sleep(hold)
+    return os.getpid()
+
+
+def _on_deadline(signum, frame):
+    raise WorkTimeout("Task exceeded its deadline")
+
+
+def _traced(deadline: float, fn, *args):
+    # Tasks run on the worker's main thread, so an interval timer can interrupt one that
+    # overruns and free the worker (a long call inside C code is interrupted when it returns)
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise WorkTimeout("Task waited in the queue past its deadline")
+    timer = hasattr(signal, "setitimer")
+    if timer:
+        signal.signal(signal.SIGALRM, _on_deadline)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        # Spans recorded in the worker are shipped back and replayed into the server's metrics
+        with metrics.trace() as t:
+            result = fn(*args)
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result, t.events
+
+
+def _work_parse(filename: str, data: bytes) -> Dict[str, object]:
+    text, fields = extract_text_and_fields(_NamedBytes(data, filename))
+    return {"text": text, "fields": fields}
+
+
+def _work_score(resume_text: str, job_desc: str) -> Dict[str, object]:
+    kw = get_keywords(KW_DIR)
+    report = score_report(*score_text(resume_text, job_desc, kw))
+    report["keywords_version"] = kw.version
+    return report
+
+
+def _work_score_many(resumes, jds, top_k: Optional[int]) -> Dict[str, object]:
+    kw = get_keywords(KW_DIR)
+    rows = score_many(resumes, jds, kw, top_k=top_k)
+    if top_k is None:
+        results = [[score_report(*r) for r in row] for row in rows]
+    else:
+        results = [[dict(score_report(*r), jd_index=j) for j, r in row] for row in rows]
+    return {"results": results, "keywords_version": kw.version}
+
+
+def _work_search(job_desc: str, top_k: int) -> Dict[str, object]:
+    hits = _INDEX.search(job_desc, top_k)
+    return {"results": [h._asdict() for h in hits], "documents": len(_INDEX)}
+
+
+def _work_export(text: str, fmt: str) -> bytes:
+    return export_bytes(text, fmt)
+
+
+# ---- server ------------------------------------------------------------------
+
+class ResumeService:
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        max_body: int,
+        io_threads: int = 32,
+        index_dir: Optional[Path] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.timeout = timeout
+        self.index_dir = index_dir
+        self.max_body = max_body
+        self.workers = workers
+        # Tasks running or waiting in the process pool; released when a task ends, not when
+        # its request gives up, so stuck work keeps counting against capacity
+        self.max_queue = 2 * workers if max_queue is None else max_queue
+        self._capacity = threading.BoundedSemaphore(workers + self.max_queue)
+        # LLM threads cannot be interrupted at the deadline, so a hung call holds its slot until it returns
+        self._io_capacity = threading.BoundedSemaphore(io_threads + self.max_queue)
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(),
+            initializer=_warm_worker,
+            initargs=(str(index_dir) if index_dir else None,),
+        )
+        self.io_pool = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="llm")
+        self.routes: Dict[Tuple[str, str], Callable[[dict], object]] = {
+            ("GET", "/healthz"): self.healthz,
+            ("GET", "/metrics"): self.prometheus,
+            ("POST", "/parse"): self.parse,
+            ("POST", "/score"): self.score,
+            ("POST", "/score/batch"): self.score_batch,
+            ("POST", "/optimize"): self.optimize,
+            ("POST", "/export"): self.export,
+            ("POST", "/search"): self.search,
+        }
+
+    def warm_up(self) -> None:
+        """Start every worker (running its initializer) before accepting traffic."""
+        _warm_worker()
+        pids = {f.result() for f in [self.pool.submit(_ping, 0.2) for _ in range(self.workers)]}
+        print(f"warmed {len(pids)} worker(s); keywords {get_keywords(KW_DIR).version}", file=sys.stderr)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, pool, fn, *args):
+        traced = pool is self.pool
+        capacity = self._capacity if traced else self._io_capacity
+        if not capacity.acquire(blocking=False):
+            metrics.count("errors", stage="request", reason="busy")
+            raise HTTPError(503, "Server busy, retry later")
+        try:
+            if traced:
+                fut = pool.submit(_traced, time.time() + self.timeout, fn, *args)
+            else:
+                fut = pool.submit(fn, *args)
+        except BaseException:
+            capacity.release()
+            raise
+        fut.add_done_callback(lambda _: capacity.release())
+        try:
+            # A little slack so a worker's own deadline error arrives as such
+            result = fut.result(timeout=self.timeout + (1.0 if traced else 0.0))
+        except (FutureTimeout, WorkTimeout):
+            fut.cancel()
+            metrics.count("errors", stage="request", reason="timeout")
+            raise HTTPError(504, "Request timed out")
+        if traced:
+            result, events = result
+            metrics.replay(events)
+        return result
+
+    @staticmethod
+    def _require(body: dict, *names: str) -> None:
+        missing = [n for n in names if not isinstance(body.get(n), str)]
+        if missing:
+            raise HTTPError(400, f"Missing or non-string field(s): {', '.join(missing)}")
+
+    def healthz(self, _body: dict):
+        return {"status": "ok", "workers": self.workers, "keywords_version": get_keywords(KW_DIR).version}
+
+    def prometheus(self, _body: dict):
+        sched = get_scheduler().metrics()
+        gauges = {
+            "resume_llm_queue_depth": sched["queue_depth"],
+            "resume_llm_in_flight": sched["in_flight"],
+            "resume_llm_breaker_open": 0.0 if sched["breaker_state"] == "closed" else 1.0,
+        }
+        return "text/plain; version=0.0.4", metrics.render_prometheus(gauges).encode("utf-8")
+
+    def parse(self, body: dict):
+        self._require(body, "filename", "content_b64")
+        try:
+            data = base64.b64decode(body["content_b64"], validate=True)
+        except ValueError:
+            raise HTTPError(400, "content_b64 is not valid base64")
+        try:
+            return self._run(self.pool, _work_parse, body["filename"], data)
+        except FileTooLarge as e:
+            raise HTTPError(413, str(e))
+
+    def score(self, body: dict):
+        self._require(body, "resume_text", "job_desc")
+        return self._run(self.pool, _work_score, body["resume_text"], body["job_desc"])
+
+    def score_batch(self, body: dict):
+        resumes, jds = body.get("resumes"), body.get("jds")
+        if not isinstance(resumes, list) or not isinstance(jds, list):
+            raise HTTPError(400, "resumes and jds must be lists of strings")
+        if not all(isinstance(x, str) for x in resumes) or not all(isinstance(x, str) for x in jds):
+            raise HTTPError(400, "resumes and jds must be lists of strings")
+        top_k = body.get("top_k")
+        if top_k is not None and not isinstance(top_k, int):
+            raise HTTPError(400, "top_k must be an integer")
+        return self._run(self.pool, _work_score_many, resumes, jds, top_k)
+
+    def optimize(self, body: dict):
+        self._require(body, "resume_text", "job_desc")
+        missing = [str(k) for k in body.get("missing_keywords") or []]
+        text = self._run(
+            self.io_pool, optimize_text, body["resume_text"], body["job_desc"], missing, bool(body.get("use_llm"))
+        )
+        return {"optimized": text}
+
+    def export(self, body: dict):
+        self._require(body, "text")
+        fmt = str(body.get("format", "PDF")).upper()
+        if fmt not in EXPORTERS:
+            raise HTTPError(400, f"Unsupported format: {fmt}")
+        return MIME[fmt], self._run(self.pool, _work_export, body["text"], fmt)
+
+    def search(self, body: dict):
+        if self.index_dir is None:
+            raise HTTPError(404, "No search index configured (start with --index)")
+        self._require(body, "job_desc")
+        top_k = body.get("top_k", 10)
+        if not isinstance(top_k, int) or top_k < 1:
+            raise HTTPError(400, "top_k must be a positive integer")
+        return self._run(self.pool, _work_search, body["job_desc"], top_k)
+
+
+def make_handler(service: ResumeService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            if os.environ.get("RESUME_SERVICE_ACCESS_LOG"):
+                super().log_message(fmt, *args)
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, payload) -> None:
+            self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+        def _dispatch(self, method: str) -> None:
+            route = service.routes.get((method, self.path.split("?", 1)[0]))
+            try:
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                # The body is left unread, so the connection cannot carry another request
+                if length < 0:
+                    self.close_connection = True
+                    raise HTTPError(400, "Invalid Content-Length")
+                if length > service.max_body:
+                    self.close_connection = True
+                    raise HTTPError(413, "Request body too large")
+                raw = self.rfile.read(length) if length else b""
+                if route is None:
+                    raise HTTPError(404, "Not found")
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    raise HTTPError(400, "Body must be JSON")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "Body must be a JSON object")
+                with metrics.span("request", route=self.path.split("?", 1)[0]):
+                    result = route(body)
+            except HTTPError as e:
+                self._send_json(e.status, {"error": str(e)})
+                return
+            except Exception as e:
+                self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            if isinstance(result, tuple):
+                content_type, data = result
+                self._send(200, data, content_type)
+            else:
+                self._send_json(200, result)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+    return Handler
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Resume parsing/scoring/optimization HTTP service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    ap.add_argument(
+        "--max-queue", type=int, default=None, help="Pool tasks allowed to wait beyond one per worker (default 2x workers)"
+    )
+    ap.add_argument("--max-body", type=int, default=20 * 1024 * 1024, help="Maximum request body in bytes")
+    ap.add_argument("--index", type=Path, default=os.environ.get("SEARCH_INDEX_DIR"), help="Search index for /search")
+    args = ap.parse_args(argv)
+
+    service = ResumeService(args.workers, args.timeout, args.max_body, index_dir=args.index, max_queue=args.max_queue)
+    service.warm_up()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    print(f"listening on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pytest
+
+# Modules are imported as the app and the benchmarks do: ``utils.*`` from resume_optimizer/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Small scoring corpus. The keywords overlap ("learning" inside "machine learning" and
+# "deep learning"), span phrases, and have aliases, one of which ("learning") collides
+# with a keyword and must be ignored.
+KEYWORDS = {
+    "Languages": {"python", "go", "java", "javascript", "c++", "node.js"},
+    "Data": {"sql", "machine learning", "deep learning", "learning", "pandas", "apache spark"},
+    "Cloud": {"aws", "kubernetes", "docker", "amazon web services", "ci/cd"},
+    "Soft Skills": {"communication", "leadership", "mentoring"},
+}
+ALIASES = {
+    "k8s": "kubernetes",
+    "golang": "go",
+    "ml": "machine learning",
+    "spark": "apache spark",
+    "learning": "deep learning",
+}
+RESUMES = [
+    "Jane Doe\njane.doe@example.com | +1 (555) 123-4567\nSenior engineer: Python, Go and SQL.\n"
+    "Built machine learning pipelines with pandas and Apache Spark on AWS.\nMentoring and leadership.",
+    "John Smith\nDevOps: k8s, Docker, CI/CD on Amazon Web Services.\nGolang services, some JavaScript and Node.js.",
+    "Data scientist\nDeep learning, ML research, Python, spark jobs.\nCommunication with stakeholders.",
+    "Frontend developer\nJavaScript, design systems, accessibility.",
+    "",
+]
+JOB_DESCRIPTIONS = [
+    "We need a Python engineer.\nExperience with machine\nlearning and SQL.\nKubernetes (k8s) a plus.",
+    "Backend role: Go, Java, Docker.\nAWS or amazon web services.\nStrong communication.",
+    "Looking for a kind colleague who enjoys teamwork.",
+    "ML engineer\nDeep learning, pandas, spark.\nLeadership and mentoring.\nC++ nice to have.",
+    "",
+]
+
+
+@pytest.fixture
+def keyword_index():
+    from utils.matcher import KeywordIndex
+
+    index = KeywordIndex({cat: set(kws) for cat, kws in KEYWORDS.items()}, ALIASES)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # the colliding alias
+        index.matcher
+    return index
+
+
+@pytest.fixture
+def matcher(keyword_index):
+    return keyword_index.matcher
+
+
+@pytest.fixture(params=["pair", "model"])
+def semantic_mode(request):
+    """Runs a test with per-pair TF-IDF and again with a corpus model active."""
+    from utils import semantic
+    from utils.semantic_model import SemanticModel
+
+    previous = semantic.get_model()
+    semantic.set_model(SemanticModel.fit(RESUMES + JOB_DESCRIPTIONS) if request.param == "model" else None)
+    yield request.param
+    semantic.set_model(previous)
+
+
+@pytest.fixture
+def make_job_store(tmp_path):
+    from utils.jobs import JobStore
+
+    def make(**kwargs):
+        return JobStore(tmp_path / "jobs.sqlite", **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def half_open():
+    """``(scheduler, breaker)`` with the breaker just turned half-open."""
+    from utils.llm_scheduler import CircuitBreaker, LLMScheduler
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    sched = LLMScheduler(max_retries=0, breaker=breaker)
+
+    def timeout():
+        raise TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        sched.call(timeout)
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    return sched, breaker
+
+
+SEARCH_KEYWORDS = {"Languages": {"python", "go", "sql"}, "Cloud": {"aws", "kubernetes", "docker"}}
+SEARCH_DOCS = [
+    ("a", "Python developer with SQL and AWS experience"),
+    ("b", "Go engineer running Kubernetes and Docker on AWS"),
+    ("c", "Data analyst, SQL reporting and Python scripts"),
+    ("d", "Frontend developer, design systems and accessibility"),
+]
+
+
+@pytest.fixture
+def search_index(tmp_path):
+    from utils.search_index import SearchIndex
+
+    index = SearchIndex.create(tmp_path / "index", SEARCH_KEYWORDS)
+    index.add(SEARCH_DOCS)
+    return index
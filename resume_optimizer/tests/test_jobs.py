@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+def test_late_finish_after_requeue_is_ignored(make_job_store):
+    store = make_job_store(lease=0.01, max_attempts=3)
+    job_id = store.submit("score", {"resume_text": "a", "job_desc": "b"})
+    job, first, _, _ = store.claim("w1")
+    time.sleep(0.02)
+    assert store.purge()["requeued"] == 1
+    assert not store.heartbeat(job_id, first)
+
+    _, second, _, _ = store.claim("w2")
+    assert not store.finish(job_id, first, {"who": "w1"})
+    assert store.get(job_id).status == "running"
+    assert store.finish(job_id, second, {"who": "w2"})
+    assert store.get(job_id).result == {"who": "w2"}
+
+
+def test_late_finish_after_worker_lost_is_ignored(make_job_store):
+    store = make_job_store(lease=0.01, max_attempts=1)
+    job_id = store.submit("score", {"resume_text": "a", "job_desc": "b"})
+    _, token, _, _ = store.claim("w1")
+    time.sleep(0.02)
+    assert store.purge()["failed"] == 1
+    assert not store.finish(job_id, token, {"late": True})
+    job = store.get(job_id)
+    assert (job.status, job.error) == ("failed", "Worker lost")
+
+
+def test_concurrent_claims_take_each_job_once(make_job_store):
+    store = make_job_store()
+    ids = {store.submit("score", {"resume_text": str(i), "job_desc": "jd"}) for i in range(40)}
+    claimed = []
+
+    def worker(name):
+        other = make_job_store()
+        while True:
+            got = other.claim(name)
+            if got is None:
+                return
+            claimed.append(got[0].id)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == sorted(ids)
@@ -0,0 +1,12 @@
+from utils.llm_cache import LLMCache
+
+
+def test_broken_database_degrades_to_misses(tmp_path):
+    cache = LLMCache(tmp_path / "cache.sqlite")
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    cache._conn.execute("DROP TABLE llm_cache")
+
+    assert cache.get("k") is None
+    assert cache.get_or_compute("k", lambda: "computed") == "computed"
+    assert (cache.read_errors, cache.write_errors) == (2, 1)
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from utils.llm_scheduler import CircuitBreaker, LLMUnavailable
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+def _raise(exc):
+    def fn():
+        raise exc
+
+    return fn
+
+
+@pytest.mark.parametrize("exc", [ValueError("Empty completion"), _BadRequest("bad request")])
+def test_non_retryable_trial_releases_half_open_breaker(half_open, exc):
+    sched, breaker = half_open
+    with pytest.raises(type(exc)):
+        sched.call(_raise(exc))
+    assert not breaker._trial_running
+    assert sched.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_trial_releases_breaker_in_stream(half_open):
+    sched, breaker = half_open
+
+    def broken():
+        raise ValueError("Empty completion")
+
+    with pytest.raises(ValueError):
+        list(sched.stream(broken))
+    assert list(sched.stream(lambda: iter(["a", "b"]))) == ["a", "b"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_trial_releases_breaker_in_acall(half_open):
+    sched, breaker = half_open
+
+    async def broken():
+        raise ValueError("Empty completion")
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(ValueError):
+        asyncio.run(sched.acall(broken))
+    assert asyncio.run(sched.acall(ok)) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retryable_trial_failure_reopens(half_open):
+    sched, breaker = half_open
+    with pytest.raises(TimeoutError):
+        sched.call(_raise(TimeoutError()))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(LLMUnavailable):
+        sched.call(lambda: "ok")
+
+
+def test_cancelled_acall_releases_half_open_trial(half_open):
+    sched, breaker = half_open
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(sched.acall(hang), 0.05))
+    assert not breaker._trial_running
+    assert asyncio.run(sched.acall(ok)) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_interrupted_call_releases_half_open_trial(half_open):
+    sched, breaker = half_open
+    with pytest.raises(KeyboardInterrupt):
+        sched.call(_raise(KeyboardInterrupt()))
+    assert sched.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,56 @@
+import re
+
+import pytest
+from conftest import ALIASES, JOB_DESCRIPTIONS, KEYWORDS, RESUMES
+
+from utils.matcher import TOKEN_RE, KeywordMatcher, get_matcher, keyword_tokens
+
+EDGE_TEXTS = [
+    "Machine\nLearning",  # a phrase across a line break
+    "machine learning learning deep learning",  # overlapping keywords
+    "k8s,docker;AWS.",  # punctuation next to keywords
+    "C++ and node.js, not c or node",
+    "amazon web",  # an unfinished phrase
+    "ML/AI and golang",  # "ml/ai" is one token, so no alias match
+]
+
+
+def _reference_find(text, keywords_by_cat, aliases):
+    """One regex per keyword and alias over the lowercased token stream, as matching worked before the trie."""
+    stream = " " + " ".join(t.lower() for t in TOKEN_RE.findall(text)) + " "
+    own = {tuple(keyword_tokens(kw)) for kws in keywords_by_cat.values() for kw in kws}
+    phrases = {kw: kw for kws in keywords_by_cat.values() for kw in kws}
+    for alias, canonical in aliases.items():
+        if canonical in phrases.values() and tuple(keyword_tokens(alias)) not in own:
+            phrases[alias] = canonical
+    found = set()
+    for phrase, canonical in phrases.items():
+        toks = keyword_tokens(phrase)
+        if toks and re.search(" " + re.escape(" ".join(toks)) + " ", stream):
+            found.add(canonical)
+    return found
+
+
+@pytest.mark.parametrize("text", RESUMES + JOB_DESCRIPTIONS + EDGE_TEXTS)
+def test_find_matches_reference(matcher, text):
+    assert matcher.find(text) == _reference_find(text, KEYWORDS, ALIASES)
+
+
+@pytest.mark.parametrize("text", RESUMES + JOB_DESCRIPTIONS + EDGE_TEXTS)
+def test_plain_dict_matches_reference(text):
+    plain = {cat: set(kws) for cat, kws in KEYWORDS.items()}
+    assert get_matcher(plain).find(text) == _reference_find(text, plain, {})
+
+
+def test_colliding_alias_keeps_keyword():
+    with pytest.warns(UserWarning, match="is itself a keyword"):
+        matcher = KeywordMatcher({"Data": {"learning", "deep learning"}}, {"learning": "deep learning"})
+    assert matcher.find("learning") == {"learning"}
+    assert matcher.find("deep learning") == {"deep learning", "learning"}
+
+
+def test_match_tokens_counts_occurrences_starting_before_stop(matcher):
+    tokens = keyword_tokens("python machine learning python")
+    assert sorted(matcher.match_tokens(tokens)) == ["learning", "machine learning", "python", "python"]
+    # "machine learning" starts at 1, so it is counted even though it ends past stop
+    assert sorted(matcher.match_tokens(tokens, 2)) == ["machine learning", "python"]
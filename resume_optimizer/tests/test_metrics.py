@@ -0,0 +1,27 @@
+import pytest
+
+from utils import metrics
+
+
+def _stream():
+    with metrics.span("optimize"):
+        yield "a"
+        yield "b"
+
+
+def test_abandoned_stream_is_not_an_error():
+    metrics.reset()
+    chunks = _stream()
+    next(chunks)
+    chunks.close()  # GeneratorExit inside the span
+    snap = metrics.snapshot()
+    assert snap["counters"] == {}
+    assert snap["optimize"]["count"] == 1
+
+
+def test_exception_is_counted():
+    metrics.reset()
+    with pytest.raises(ValueError):
+        with metrics.span("optimize"):
+            raise ValueError("boom")
+    assert metrics.snapshot()["counters"] == {'errors{stage="optimize"}': 1.0}
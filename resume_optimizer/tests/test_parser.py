@@ -0,0 +1,52 @@
+import pytest
+from conftest import RESUMES
+
+from utils.parser import EMAIL_RE, PHONE_RE, _FieldScanner
+
+TEXTS = RESUMES + [
+    "\n\n  Ada Lovelace  \nada@example.org",
+    "Curriculum vitae of a very long named person here\nPhone: 555 123 4567",  # six-word first line
+    "Call 555-123-4567 or +44 (020) 555-0199; mail a.b-c@mail.example.co.uk",
+    "Phone 555 123\n4567 after a line break",
+    "no contact details\n\n",
+]
+
+
+def _reference_fields(text):
+    """Field extraction as done on the whole joined text before streaming."""
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    first = lines[0] if lines else ""
+    email, phone = EMAIL_RE.search(text), PHONE_RE.search(text)
+    return {
+        "name": first if 1 <= len(first.split()) <= 5 else "",
+        "email": email.group(0) if email else "",
+        "phone": phone.group(0) if phone else "",
+    }
+
+
+def _scan(chunks):
+    scanner = _FieldScanner()
+    reported = {}
+    for chunk in chunks:
+        scanner.feed(chunk)
+        for key, value in scanner.fields.items():
+            assert reported.setdefault(key, value) == value  # never revised
+    return scanner.finish()
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_every_two_chunk_split_matches_reference(text):
+    want = _reference_fields(text)
+    assert _scan([text]) == want
+    for i in range(len(text) + 1):
+        if text[i : i + 1] == "\n":
+            # Chunks are joined with "\n", so a split at a newline drops it
+            assert _scan([text[:i], text[i + 1 :]]) == want
+        assert _scan(text[:i].split("\n") + [text[i:]]) == _reference_fields(text[:i] + "\n" + text[i:])
+
+
+def test_phone_split_across_many_chunks():
+    chunks = ["Jane Doe", "+1 (555", ") 123", "-4567", "more text"]
+    assert _scan(chunks) == _reference_fields("\n".join(chunks))
+    chunks = ["Jane Doe", "+1", "555", "123", "4567"]
+    assert _scan(chunks) == _reference_fields("\n".join(chunks))
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from conftest import JOB_DESCRIPTIONS, RESUMES
+
+from utils.incremental import ScoringSession
+from utils.scorer import score_many, score_text
+from utils.semantic import _pair_similarity_matrix, semantic_similarity, similarity_matrix
+
+# Each step is applied to the session in turn and compared against a fresh score_text
+JD_EDITS = [
+    "We need a Python engineer.",
+    "We need a Python engineer.\nExperience with machine",
+    "We need a Python engineer.\nExperience with machine\nlearning and SQL.",  # phrase completed across lines
+    "Kubernetes (k8s) a plus.\nWe need a Python engineer.\nExperience with machine\nlearning and SQL.",
+    "Kubernetes (k8s) a plus.\nExperience with machine\nlearning and SQL.",  # a line removed
+    "Kubernetes (k8s) a plus.\nExperience with deep\nlearning and SQL.",  # a line edited
+    "Kubernetes (k8s) a plus.\nExperience with deep\nlearning and SQL.\nGolang, spark, ML.",
+    "Kubernetes (k8s) a plus.\n\nExperience with deep\nlearning and SQL.",  # an alias line swapped for a blank
+    "Looking for a kind colleague who enjoys teamwork.",  # no keywords at all
+    "",
+    "ML engineer\nDeep learning, pandas, spark.",
+]
+
+
+def assert_same_score(got, want):
+    overall, matched, missing, details = got
+    w_overall, w_matched, w_missing, w_details = want
+    assert (matched, missing) == (w_matched, w_missing)
+    assert overall == pytest.approx(w_overall, abs=1e-9)
+    assert details["exact_score"] == pytest.approx(w_details["exact_score"], abs=1e-9)
+    assert details["semantic"] == pytest.approx(w_details["semantic"], abs=1e-9)
+    for cat, want_cat in w_details["category_breakdown"].items():
+        got_cat = details["category_breakdown"][cat]
+        assert (got_cat["matched"], got_cat["missing"]) == (want_cat["matched"], want_cat["missing"])
+        assert got_cat["coverage"] == pytest.approx(want_cat["coverage"])
+
+
+@pytest.mark.parametrize("resume", RESUMES)
+def test_session_edits_match_score_text(semantic_mode, keyword_index, resume):
+    session = ScoringSession(resume, keyword_index)
+    for jd in JD_EDITS:
+        assert_same_score(session.update(jd), score_text(resume, jd, keyword_index))
+
+
+def test_session_rescans_only_changed_lines(keyword_index):
+    session = ScoringSession(RESUMES[0], keyword_index, JD_EDITS[3])
+    session.update(JD_EDITS[3] + "\nDocker.")
+    assert session.lines_rescanned == 1
+    session.update(JD_EDITS[3] + "\nDocker.")
+    assert session.lines_rescanned == 1  # unchanged JD is not rescanned
+
+
+def test_score_many_matches_score_text(semantic_mode, keyword_index):
+    rows = score_many(RESUMES, JOB_DESCRIPTIONS, keyword_index)
+    for resume, row in zip(RESUMES, rows):
+        for jd, got in zip(JOB_DESCRIPTIONS, row):
+            assert_same_score(got, score_text(resume, jd, keyword_index))
+
+
+def test_similarity_matrix_matches_pairs(semantic_mode):
+    docs_b = JOB_DESCRIPTIONS + ["the and of", "Python"]  # stop words only, a single term
+    want = np.array([[semantic_similarity(a, b) for b in docs_b] for a in RESUMES])
+    np.testing.assert_allclose(similarity_matrix(RESUMES, docs_b), want, atol=1e-9)
+
+
+def test_pair_similarity_matrix_matches_pairs():
+    docs = RESUMES + JOB_DESCRIPTIONS + ["the and of"]
+    want = np.array([[semantic_similarity(a, b) for b in docs] for a in docs])
+    np.testing.assert_allclose(_pair_similarity_matrix(docs, docs), want, atol=1e-9)
+    np.testing.assert_allclose(_pair_similarity_matrix(["the"], ["and of"]), [[0.0]])
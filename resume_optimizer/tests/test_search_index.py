@@ -0,0 +1,32 @@
+import pytest
+
+from utils.search_index import SearchIndex
+
+
+def test_readd_replaces_document(search_index):
+    n = len(search_index)
+    search_index.add([("d", "Kubernetes and Docker platform engineer")])
+    assert len(search_index) == n
+    assert search_index.search("Kubernetes Docker", 1)[0].doc_id in {"b", "d"}
+    assert [h.doc_id for h in search_index.search("Kubernetes Docker", 10)].count("d") == 1
+
+
+def test_interrupted_readd_keeps_both_copies_until_healed(search_index, monkeypatch):
+    n = len(search_index)
+
+    def crash(self, ids):
+        raise KeyboardInterrupt
+
+    # Crash after the new segment is committed but before the old copy is tombstoned
+    monkeypatch.setattr(SearchIndex, "delete", crash)
+    with pytest.raises(KeyboardInterrupt):
+        search_index.add([("a", "Go and Docker engineer")])
+    monkeypatch.undo()
+
+    reopened = SearchIndex.open(search_index.directory)
+    assert len(reopened) == n + 1  # nothing lost
+    reopened.delete(["missing"])  # any write resolves the duplicate
+    assert len(reopened) == n
+    assert reopened.compact() == n
+    hits = SearchIndex.open(search_index.directory).search("Go Docker", 10)
+    assert [h.doc_id for h in hits].count("a") == 1
@@ -1,14 +1,68 @@
-from .parser import extract_text_and_fields
-from .scorer import load_keywords, score_text
-from .optimizer import optimize_text, llm_available
-from .exporter import to_pdf_bytes, to_docx_bytes
-
-__all__ = [
-    "extract_text_and_fields",
-    "load_keywords",
-    "score_text",
-    "optimize_text",
-    "llm_available",
-    "to_pdf_bytes",
-    "to_docx_bytes",
-]
+"""
+Resume parsing, scoring, optimization and export.
+
+Public names are resolved on first access (PEP 562), so ``import utils`` does
+not pull in PyPDF2, python-docx, fpdf, scikit-learn or groq; each submodule in
+turn imports its heavy dependencies inside the functions that need them.
+"""
+from __future__ import annotations
+import importlib
+from typing import TYPE_CHECKING
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "extract_text_and_fields": "parser",
+    "ParseCache": "parse_cache",
+    "get_parse_cache": "parse_cache",
+    "load_keywords": "scorer",
+    "score_text": "scorer",
+    "score_many": "scorer",
+    "KeywordStore": "keyword_store",
+    "get_keywords": "keyword_store",
+    "ScoringSession": "incremental",
+    "scoring_session": "incremental",
+    "SessionCache": "incremental",
+    "SearchIndex": "search_index",
+    "SearchHit": "search_index",
+    "CompactScore": "vocab",
+    "KeywordVocab": "vocab",
+    "optimize_text": "optimizer",
+    "llm_available": "optimizer",
+    "optimize_many_rules": "optimizer",
+    "scored_triples": "optimizer",
+    "JobStore": "jobs",
+    "WorkerPool": "jobs",
+    "get_job_store": "jobs",
+    "to_pdf_bytes": "exporter",
+    "to_docx_bytes": "exporter",
+    "export_bytes": "exporter",
+    "export_zip": "exporter",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .parser import extract_text_and_fields
+    from .parse_cache import ParseCache, get_parse_cache
+    from .scorer import load_keywords, score_text, score_many
+    from .keyword_store import KeywordStore, get_keywords
+    from .incremental import ScoringSession, SessionCache, scoring_session
+    from .search_index import SearchIndex, SearchHit
+    from .vocab import CompactScore, KeywordVocab
+    from .optimizer import optimize_text, llm_available, optimize_many_rules, scored_triples
+    from .jobs import JobStore, WorkerPool, get_job_store
+    from .exporter import to_pdf_bytes, to_docx_bytes, export_bytes, export_zip
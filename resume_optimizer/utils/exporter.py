@@ -1,15 +1,121 @@
 from __future__ import annotations
+import hashlib
 import io
-from fpdf import FPDF
-from docx import Document
-from docx.shared import Pt
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+from . import metrics
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
 
 
 def _latin1_safe(text: str) -> str:
     return text.encode("latin-1", "replace").decode("latin-1")
 
 
+class _WidthTable:
+    """
+    Memoized string widths for the PDF's active font.
+
+    Words and single characters are measured once; line widths are then running
+    sums, so wrapping is linear in the text length. Sums that land within
+    ``_EPS`` of the limit are re-measured exactly so the breaks match
+    ``pdf.get_string_width`` on the full candidate line.
+    """
+
+    _EPS = 1e-6
+
+    def __init__(self, pdf: FPDF):
+        self.pdf = pdf
+        self._cache: Dict[str, float] = {}
+        self.space = self.width(" ")
+
+    def width(self, s: str) -> float:
+        w = self._cache.get(s)
+        if w is None:
+            w = self._cache[s] = self.pdf.get_string_width(s)
+        return w
+
+    def fits(self, approx: float, max_w: float, exact_text) -> bool:
+        if approx < max_w - self._EPS:
+            return True
+        if approx > max_w + self._EPS:
+            return False
+        return self.pdf.get_string_width(exact_text()) <= max_w
+
+
+def _break_long_word(word: str, widths: _WidthTable, max_w: float) -> List[str]:
+    parts = []
+    buf: List[str] = []
+    buf_w = 0.0
+    for ch in word:
+        ch_w = widths.width(ch)
+        if widths.fits(buf_w + ch_w, max_w, lambda: "".join(buf) + ch):
+            buf.append(ch)
+            buf_w += ch_w
+        else:
+            if buf:
+                parts.append("".join(buf))
+                buf = [ch]
+                buf_w = ch_w
+            else:
+                # Force progress even if a single character exceeds width (rare)
+                parts.append(ch)
+                buf = []
+                buf_w = 0.0
+    if buf:
+        parts.append("".join(buf))
+    return parts
+
+
+def _wrap_line(s: str, widths: _WidthTable, max_w: float) -> List[str]:
+    lines = []
+    # The current line is kept as its words plus a running width; it is only
+    # joined into a string when emitted (or for an exact re-measure).
+    current: List[str] = []
+    current_w = 0.0
+    current_empty = True  # mirrors `not current` for the joined string
+    for w in s.split(" "):
+        w_w = widths.width(w)
+        if current_empty:
+            candidate_w = w_w
+            fits = widths.fits(candidate_w, max_w, lambda: w)
+        else:
+            candidate_w = current_w + widths.space + w_w
+            fits = widths.fits(candidate_w, max_w, lambda: " ".join(current) + " " + w)
+        if fits:
+            if current_empty:
+                current = [w]
+            else:
+                current.append(w)
+            current_w = candidate_w
+            current_empty = not w and current_empty
+            continue
+        if not current_empty:
+            lines.append(" ".join(current))
+            current, current_w, current_empty = [], 0.0, True
+            # Retry the word on a fresh line
+            if widths.fits(w_w, max_w, lambda: w):
+                current, current_w, current_empty = [w], w_w, not w
+                continue
+        # Word alone longer than max width: break it
+        parts = _break_long_word(w, widths, max_w)
+        lines.extend(parts[:-1])
+        last = parts[-1] if parts else ""
+        current, current_w, current_empty = [last], widths.width(last), not last
+    if not current_empty:
+        lines.append(" ".join(current))
+    return lines
+
+
 def to_pdf_bytes(text: str) -> bytes:
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -17,64 +123,44 @@ def to_pdf_bytes(text: str) -> bytes:
 
     max_w = pdf.w - pdf.l_margin - pdf.r_margin
     line_height = 6
-
-    def break_long_word(word: str):
-        parts = []
-        buf = ""
-        for ch in word:
-            if pdf.get_string_width(buf + ch) <= max_w:
-                buf += ch
-            else:
-                if buf:
-                    parts.append(buf)
-                    buf = ch
-                else:
-                    # Force progress even if a single character exceeds width (rare)
-                    parts.append(ch)
-                    buf = ""
-        if buf:
-            parts.append(buf)
-        return parts
-
-    def wrap_line(s: str):
-        words = s.split(" ")
-        lines = []
-        current = ""
-        while words:
-            w = words[0]
-            candidate = w if not current else current + " " + w
-            if pdf.get_string_width(candidate) <= max_w:
-                current = candidate
-                words.pop(0)
-            else:
-                if current:
-                    lines.append(current)
-                    current = ""
-                else:
-                    # Word alone longer than max width: break it
-                    parts = break_long_word(w)
-                    lines.extend(parts[:-1])
-                    last = parts[-1] if parts else ""
-                    current = last
-                    words.pop(0)
-        if current:
-            lines.append(current)
-        return lines
+    widths = _WidthTable(pdf)
 
     for raw in text.splitlines():
         safe = _latin1_safe(raw).replace("\t", "    ")
         if not safe.strip():
             pdf.ln(line_height // 2)
             continue
-        for chunk in wrap_line(safe):
+        for chunk in _wrap_line(safe, widths, max_w):
             pdf.set_x(pdf.l_margin)
             pdf.cell(0, line_height, chunk, ln=1)
 
-    return pdf.output(dest="S").encode("latin-1", "ignore")
+    out = pdf.output(dest="S")
+    # fpdf2 returns a bytearray; the legacy PyFPDF API returned a latin-1 str
+    if isinstance(out, (bytes, bytearray)):
+        return bytes(out)
+    return out.encode("latin-1", "ignore")
+
+
+_DOCX_TEMPLATE: Optional[bytes] = None
+
+
+def _docx_template() -> bytes:
+    # The default template is read from the package once per process
+    global _DOCX_TEMPLATE
+    if _DOCX_TEMPLATE is None:
+        from docx import Document
+
+        bio = io.BytesIO()
+        Document().save(bio)
+        _DOCX_TEMPLATE = bio.getvalue()
+    return _DOCX_TEMPLATE
 
 
 def to_docx_bytes(text: str) -> bytes:
-    doc = Document()
+    from docx import Document
+    from docx.shared import Pt
+
+    doc = Document(io.BytesIO(_docx_template()))
 
     # Basic styling: detect simple section headers
     def is_header(line: str) -> bool:
@@ -93,3 +179,85 @@ def to_docx_bytes(text: str) -> bytes:
     bio = io.BytesIO()
     doc.save(bio)
     return bio.getvalue()
+
+
+EXPORTERS = {"PDF": to_pdf_bytes, "DOCX": to_docx_bytes}
+
+_EXPORT_CACHE_SIZE = int(os.environ.get("RESUME_EXPORT_CACHE_SIZE", "32"))
+_export_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_export_lock = threading.Lock()
+
+
+def export_bytes(text: str, fmt: str) -> bytes:
+    """
+    Render ``text`` as "PDF" or "DOCX", memoized by (text hash, format) so
+    Streamlit reruns don't rebuild an unchanged file.
+    """
+    fmt = fmt.upper()
+    render = EXPORTERS[fmt]
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), fmt)
+    with _export_lock:
+        data = _export_cache.get(key)
+        if data is not None:
+            _export_cache.move_to_end(key)
+    if data is not None:
+        metrics.count("export_cache", result="hit")
+        return data
+    metrics.count("export_cache", result="miss")
+    with metrics.span("export", format=fmt.lower()):
+        data = render(text)
+    with _export_lock:
+        _export_cache[key] = data
+        while len(_export_cache) > _EXPORT_CACHE_SIZE:
+            _export_cache.popitem(last=False)
+    return data
+
+
+def _init_export_worker() -> None:
+    _docx_template()
+
+
+def _render_item(job: Tuple[str, str, str]) -> Tuple[str, bytes]:
+    name, text, fmt = job
+    return name, EXPORTERS[fmt](text)
+
+
+def export_zip(
+    items: Iterable[Tuple[str, str]],
+    fmt: str,
+    out: Union[str, os.PathLike, BinaryIO],
+    workers: Optional[int] = None,
+    chunksize: int = 4,
+) -> int:
+    """
+    Render many ``(file_name, text)`` resumes as ``fmt`` and stream them into a zip
+    archive written to ``out`` (a path or writable binary file). Rendering runs
+    in a process pool whose workers set up the document machinery once; archive
+    order follows ``items``. Returns the number of files written.
+    """
+    fmt = fmt.upper()
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    ext = "." + fmt.lower()
+    jobs = ((name if name.lower().endswith(ext) else name + ext, text, fmt) for name, text in items)
+    workers = workers or os.cpu_count() or 1
+
+    count = 0
+    # DOCX files are zip archives and fpdf2 compresses page streams: store, don't deflate again
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+        if workers <= 1:
+            _init_export_worker()
+            rendered = map(_render_item, jobs)
+            pool = None
+        else:
+            pool = multiprocessing.get_context().Pool(workers, initializer=_init_export_worker)
+            rendered = pool.imap(_render_item, jobs, chunksize=max(1, chunksize))
+        try:
+            for name, data in rendered:
+                zf.writestr(name, data)
+                count += 1
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    return count
@@ -0,0 +1,318 @@
+from __future__ import annotations
+import math
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from . import metrics
+from .matcher import TOKEN_RE, get_matcher
+from .scorer import _blend
+from .semantic import _PAIR_IDF_UNIQUE, get_model
+
+# Sessions kept by SessionCache across all callers (RESUME_SCORING_SESSIONS, default 32)
+MAX_SESSIONS = int(os.environ.get("RESUME_SCORING_SESSIONS", "32"))
+
+
+class _TokenLines:
+    """
+    A text kept as per-line token lists plus the counts of everything that starts
+    on each line (keyword matches, n-grams). Items may run up to ``window - 1``
+    tokens into following lines, so replacing a block of lines only recounts that
+    block and the few lines just before it whose items could reach into it.
+    """
+
+    def __init__(self, tokenize: Callable[[str], List[str]], count: Callable[[List[str], int], Counter], window: int):
+        self._tokenize = tokenize
+        self._count = count
+        self.window = max(1, window)
+        self.tokens: List[List[str]] = []
+        self.items: List[Counter] = []
+        self.totals: Counter = Counter()
+
+    def _lookahead(self, k: int) -> List[str]:
+        need = self.window - 1
+        out: List[str] = []
+        k += 1
+        while need > 0 and k < len(self.tokens):
+            out.extend(self.tokens[k][:need])
+            need = self.window - 1 - len(out)
+            k += 1
+        return out
+
+    def replace(self, a: int, b: int, new_lines: List[str]) -> Dict[str, Tuple[int, int]]:
+        """Replace lines [a, b) with ``new_lines``; returns {item: (old count, new count)} for changed items."""
+        start = a
+        gap = 0
+        while start > 0 and gap < self.window - 1:
+            start -= 1
+            gap += len(self.tokens[start])
+
+        before: Counter = Counter()
+        for c in self.items[start:b]:
+            before.update(c)
+        self.tokens[a:b] = [self._tokenize(line) for line in new_lines]
+        self.items[a:b] = [Counter() for _ in new_lines]
+        after: Counter = Counter()
+        for k in range(start, a + len(new_lines)):
+            own = self.tokens[k]
+            c = self._count(own + self._lookahead(k), len(own)) if own else Counter()
+            self.items[k] = c
+            after.update(c)
+
+        changes: Dict[str, Tuple[int, int]] = {}
+        for item in set(before) | set(after):
+            delta = after[item] - before[item]
+            if delta:
+                old = self.totals[item]
+                new = old + delta
+                if new:
+                    self.totals[item] = new
+                else:
+                    del self.totals[item]
+                changes[item] = (old, new)
+        return changes
+
+
+class _SemanticState:
+    """
+    Running cosine similarity between a fixed resume and a changing JD, updated
+    per changed term. Matches ``semantic.semantic_similarity``: with a corpus
+    model the frozen vocabulary and IDF are used; otherwise the pair-fitted IDF
+    (1 for shared terms, 1 + ln 1.5 otherwise) is tracked through the shared terms.
+    """
+
+    def __init__(self, resume_counts: Counter, model=None):
+        self.model = model
+        self.dot = 0.0
+        self.jd_sq = 0.0
+        if model is not None:
+            terms = list(resume_counts)
+            self._weights = {}
+            for t, idx in zip(terms, model.lookup(terms).tolist()):
+                if idx >= 0:
+                    self._weights[t] = resume_counts[t] * float(model.idf[idx])
+            self.res_sq = sum(w * w for w in self._weights.values())
+        else:
+            self._counts = resume_counts
+            self.res_sq = sum(c * c for c in resume_counts.values())
+            self.res_shared_sq = 0
+            self.jd_shared_sq = 0
+
+    def apply(self, changes: Dict[str, Tuple[int, int]]) -> None:
+        """Adjust for JD terms whose count changed: ``{term: (old count, new count)}``."""
+        if self.model is not None:
+            terms = list(changes)
+            for term, idx in zip(terms, self.model.lookup(terms).tolist()):
+                if idx < 0:
+                    continue
+                old, new = changes[term]
+                idf = float(self.model.idf[idx])
+                self.dot += self._weights.get(term, 0.0) * idf * (new - old)
+                self.jd_sq += idf * idf * (new * new - old * old)
+            return
+        for term, (old, new) in changes.items():
+            r = self._counts.get(term, 0)
+            self.dot += r * (new - old)
+            self.jd_sq += new * new - old * old
+            if r:
+                self.jd_shared_sq += new * new - old * old
+                self.res_shared_sq += r * r * ((new > 0) - (old > 0))
+
+    def similarity(self) -> float:
+        if self.model is not None:
+            norm = self.res_sq * self.jd_sq
+        else:
+            c2 = _PAIR_IDF_UNIQUE ** 2
+            norm = (c2 * self.res_sq - (c2 - 1.0) * self.res_shared_sq) * (
+                c2 * self.jd_sq - (c2 - 1.0) * self.jd_shared_sq
+            )
+        if norm <= 0:
+            return 0.0
+        return min(1.0, max(0.0, self.dot / math.sqrt(norm)))
+
+
+class ScoringSession:
+    """
+    Score one resume against a job description that is edited over time.
+
+    The resume is tokenized, matched and vectorized once. Each ``update`` diffs
+    the new JD against the previous one by lines and re-tokenizes only the
+    changed lines (plus the line or two before them that a phrase or bigram can
+    span), then adjusts matched/missing keywords, category coverage and the
+    semantic score by the keywords and terms whose counts changed. Results are
+    the same as ``score_text`` on the full texts.
+
+    The keyword index and the active semantic model are captured when the
+    session is created; start a new session when either changes.
+    """
+
+    def __init__(self, resume_text: str, keywords_by_cat: Dict[str, Set[str]], job_desc: str = ""):
+        self.resume_text = resume_text
+        self.keywords_by_cat = keywords_by_cat
+        self.keywords_version = getattr(keywords_by_cat, "version", "")
+        matcher = get_matcher(keywords_by_cat)
+        self._matcher = matcher
+        self.resume_tokens: Set[str] = matcher.find(resume_text)
+        self._union = matcher.keywords
+
+        # Same analysis as the TF-IDF vectorizers: lowercase, word tokens, stop words removed, then n-grams
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        from .semantic_model import NGRAM_RANGE, STOP_WORDS
+
+        vec = CountVectorizer(ngram_range=NGRAM_RANGE, stop_words=STOP_WORDS)
+        preprocess, split, stop = vec.build_preprocessor(), vec.build_tokenizer(), vec.get_stop_words() or ()
+        self._semantic = _SemanticState(Counter(vec.build_analyzer()(resume_text or "")), get_model())
+
+        self._kw_lines = _TokenLines(
+            lambda line: [t.lower() for t in TOKEN_RE.findall(line)],
+            lambda toks, stop_at: Counter(matcher.match_tokens(toks, stop_at)),
+            matcher.max_tokens,
+        )
+        self._term_lines = _TokenLines(
+            lambda line: [t for t in split(preprocess(line)) if t not in stop],
+            _ngram_counter(NGRAM_RANGE),
+            NGRAM_RANGE[1],
+        )
+
+        # Per-category keyword focus drawn from the JD, with matched/missing split
+        self._jd_kw: Set[str] = set()
+        self._matched: Set[str] = set()
+        self._missing: Set[str] = set()
+        self._cat_matched: Dict[str, Set[str]] = {cat: set() for cat in keywords_by_cat}
+        self._cat_missing: Dict[str, Set[str]] = {cat: set() for cat in keywords_by_cat}
+        # Used when the JD mentions no keyword of a category (or none at all)
+        self._cat_fallback = {
+            cat: (kws & self.resume_tokens, kws - self.resume_tokens) for cat, kws in keywords_by_cat.items()
+        }
+        self._lines: List[str] = []
+        self.job_desc = ""
+        self.lines_rescanned = 0
+        self.update(job_desc)
+
+    def update(self, job_desc: str):
+        """Apply an edited JD and return ``(overall, matched, missing, details)`` like ``score_text``."""
+        job_desc = job_desc or ""
+        with metrics.span("score", mode="incremental"):
+            if job_desc != self.job_desc or not self._lines:
+                lines = job_desc.split("\n")
+                old = self._lines
+                a = 0
+                limit = min(len(old), len(lines))
+                while a < limit and old[a] == lines[a]:
+                    a += 1
+                tail = 0
+                while tail < limit - a and old[-1 - tail] == lines[-1 - tail]:
+                    tail += 1
+                b, new_b = len(old) - tail, len(lines) - tail
+                changed = lines[a:new_b]
+                for kw, (was, now) in self._kw_lines.replace(a, b, changed).items():
+                    self._keyword_changed(kw, was > 0, now > 0)
+                self._semantic.apply(self._term_lines.replace(a, b, changed))
+                self._lines = lines
+                self.job_desc = job_desc
+                self.lines_rescanned = len(changed)
+            return self.result()
+
+    def _keyword_changed(self, kw: str, was: bool, now: bool) -> None:
+        if was == now:
+            return
+        in_resume = kw in self.resume_tokens
+        side = self._matched if in_resume else self._missing
+        if now:
+            self._jd_kw.add(kw)
+            side.add(kw)
+        else:
+            self._jd_kw.discard(kw)
+            side.discard(kw)
+        for cat in self._matcher.categories.get(kw, ()):
+            if cat not in self._cat_matched:
+                continue
+            target = (self._cat_matched if in_resume else self._cat_missing)[cat]
+            if now:
+                target.add(kw)
+            else:
+                target.discard(kw)
+
+    def result(self):
+        if self._jd_kw:
+            matched, missing = set(self._matched), set(self._missing)
+            denom = len(self._jd_kw)
+        else:
+            # JD mentions no known keyword: score against every keyword
+            matched = self._union & self.resume_tokens
+            missing = self._union - self.resume_tokens
+            denom = max(1, len(self._union))
+        exact_score = 100.0 * len(matched) / denom
+
+        cat_breakdown: Dict[str, Dict[str, object]] = {}
+        for cat in self.keywords_by_cat:
+            cat_matched, cat_missing = self._cat_matched[cat], self._cat_missing[cat]
+            if not cat_matched and not cat_missing:
+                cat_matched, cat_missing = self._cat_fallback[cat]
+            denom_c = max(1, len(cat_matched) + len(cat_missing))
+            cat_breakdown[cat] = {
+                "coverage": 100.0 * len(cat_matched) / denom_c,
+                "matched": set(cat_matched),
+                "missing": set(cat_missing),
+            }
+
+        overall, details = _blend(exact_score, self._semantic.similarity() * 100.0, cat_breakdown)
+        return overall, matched, missing, details
+
+
+def _ngram_counter(ngram_range):
+    lo, hi = ngram_range
+
+    def count(tokens: List[str], stop: int) -> Counter:
+        c: Counter = Counter()
+        for n in range(lo, hi + 1):
+            for i in range(min(stop, len(tokens) - n + 1)):
+                c[" ".join(tokens[i : i + n])] += 1
+        return c
+
+    return count
+
+
+def scoring_session(
+    resume_text: str, keywords_by_cat: Dict[str, Set[str]], previous: Optional[ScoringSession] = None
+) -> ScoringSession:
+    """Reuse ``previous`` when it was built for the same resume, keywords and semantic model, else start fresh."""
+    if (
+        previous is not None
+        and previous.keywords_by_cat is keywords_by_cat
+        and previous.keywords_version == getattr(keywords_by_cat, "version", "")
+        and previous._semantic.model is get_model()
+        and previous.resume_text == resume_text
+    ):
+        return previous
+    return ScoringSession(resume_text, keywords_by_cat)
+
+
+class SessionCache:
+    """
+    Bounded LRU of ScoringSessions by caller key (e.g. one per browser session).
+    A session holds the resume's token lines and semantic state, so callers keep
+    only the key; the least recently used sessions beyond ``max_sessions`` are
+    dropped and rebuilt on their next use.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: "OrderedDict[str, ScoringSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, resume_text: str, keywords_by_cat: Dict[str, Set[str]]) -> ScoringSession:
+        """The session for ``key``, rebuilt when the resume, keywords or model changed."""
+        with self._lock:
+            previous = self._sessions.pop(key, None)
+        session = scoring_session(resume_text, keywords_by_cat, previous)
+        with self._lock:
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,424 @@
+from __future__ import annotations
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from . import metrics
+
+# Background jobs: a SQLite queue shared by any number of processes, and worker
+# processes that claim queued jobs and run the parse/score/optimize/export stages.
+#   RESUME_JOBS_DB       queue path (default ~/.cache/resume_optimizer/jobs.sqlite)
+#   RESUME_JOBS_TTL      seconds a finished job's result is kept (default 3600)
+#   RESUME_JOBS_LEASE    seconds before a running job whose worker died is retried (default 600)
+#   RESUME_JOBS_WORKERS  worker processes the app starts (default min(4, CPUs); 0 = run
+#                        ``python -m utils.jobs worker`` separately)
+
+_workers = os.environ.get("RESUME_JOBS_WORKERS", "")
+LOCAL_WORKERS = int(_workers) if _workers else min(4, os.cpu_count() or 1)
+KW_DIR = Path(__file__).resolve().parents[1] / "data" / "keywords"
+MODEL_DIR = Path(os.environ.get("SEMANTIC_MODEL_DIR") or Path(__file__).resolve().parents[1] / "data" / "semantic_model")
+PURGE_INTERVAL = 60.0
+
+
+class Job(NamedTuple):
+    id: str
+    kind: str
+    status: str  # queued, running, done or failed
+    result: Optional[dict]
+    data: Optional[bytes]  # binary result (export)
+    error: str
+    attempts: int
+    created: float
+    started: Optional[float]
+    finished: Optional[float]
+
+    @property
+    def pending(self) -> bool:
+        return self.status in ("queued", "running")
+
+
+_COLUMNS = "id, kind, status, result, result_data, error, attempts, created, started, finished"
+
+
+def _job(row) -> Job:
+    return Job(row[0], row[1], row[2], json.loads(row[3]) if row[3] else None, row[4], row[5] or "", *row[6:])
+
+
+class JobStore:
+    """
+    SQLite-backed job queue. Jobs are claimed atomically, so several worker
+    processes (on one machine) can share a database. Finished jobs keep their
+    result for ``ttl`` seconds; a running job whose worker stopped heartbeating
+    for ``lease`` seconds is queued again, up to ``max_attempts`` runs.
+    """
+
+    def __init__(self, path: Path, ttl: float = 3600.0, lease: float = 600.0, max_attempts: int = 2):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+                " payload TEXT NOT NULL, data BLOB, result TEXT, result_data BLOB, error TEXT,"
+                " worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, ttl REAL NOT NULL,"
+                " created REAL NOT NULL, started REAL, heartbeat REAL, finished REAL, expires REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created)")
+
+    def submit(
+        self, kind: str, payload: Dict[str, object], data: Optional[bytes] = None, ttl: Optional[float] = None
+    ) -> str:
+        """
+        Queue a job; ``data`` carries binary input (e.g. the file to parse). Its
+        result is kept ``ttl`` seconds (default: the store's) after it finishes.
+        Returns the job id.
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, data, ttl, created) VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), data, self.ttl if ttl is None else ttl, time.time()),
+            )
+        metrics.count("jobs", kind=kind, status="queued")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job, or None if it is unknown or its result has expired."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS}, expires FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None or (row[-1] is not None and row[-1] < time.time()):
+            return None
+        return _job(row[:-1])
+
+    def claim(self, worker: str) -> Optional[Tuple[Job, str, dict, Optional[bytes]]]:
+        """
+        Take the oldest queued job: ``(job, token, payload, data)``, or None when
+        the queue is empty. ``token`` identifies this claim; pass it to
+        ``heartbeat``, ``finish`` and ``fail``.
+        """
+        token = f"{worker}:{uuid.uuid4().hex}"
+        now = time.time()
+        with self._lock, self._conn:
+            # Take the write lock before picking the row, so concurrent workers cannot claim the same one
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started = ?, heartbeat = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                (token, now, now, row[0]),
+            )
+            row = self._conn.execute(f"SELECT {_COLUMNS}, payload, data FROM jobs WHERE id = ?", (row[0],)).fetchone()
+        return _job(row[:-2]), token, json.loads(row[-2]), row[-1]
+
+    # The writes below only apply while ``token`` still owns the running job: once the
+    # lease has expired and the job was requeued (or failed), a late worker is ignored.
+
+    def heartbeat(self, job_id: str, token: str) -> bool:
+        """Extend the lease; False if the claim was lost."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, token),
+            )
+        return cur.rowcount > 0
+
+    def finish(self, job_id: str, token: str, result: Optional[dict] = None, data: Optional[bytes] = None) -> bool:
+        """Store the result; False (nothing written) if the claim was lost."""
+        return self._close(job_id, token, "done", json.dumps(result) if result is not None else None, data, "")
+
+    def fail(self, job_id: str, token: str, error: str) -> bool:
+        """Mark the job failed; False (nothing written) if the claim was lost."""
+        return self._close(job_id, token, "failed", None, None, error)
+
+    def _close(
+        self, job_id: str, token: str, status: str, result: Optional[str], data: Optional[bytes], error: str
+    ) -> bool:
+        now = time.time()
+        with self._lock, self._conn:
+            # Inputs are dropped once a job is finished; only the result is kept until it expires
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, result_data = ?, error = ?, finished = ?, expires = ? + ttl,"
+                " payload = '{}', data = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                (status, result, data, error, now, now, job_id, token),
+            )
+        return cur.rowcount > 0
+
+    def purge(self) -> Dict[str, int]:
+        """Delete expired results and requeue (or fail) jobs whose worker stopped heartbeating."""
+        now = time.time()
+        with self._lock, self._conn:
+            expired = self._conn.execute("DELETE FROM jobs WHERE expires < ?", (now,)).rowcount
+            stale = now - self.lease
+            failed = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker lost', finished = ?, expires = ? + ttl,"
+                " payload = '{}', data = NULL"
+                " WHERE status = 'running' AND heartbeat < ? AND attempts >= ?",
+                (now, now, stale, self.max_attempts),
+            ).rowcount
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND heartbeat < ?",
+                (stale,),
+            ).rowcount
+        return {"expired": expired, "requeued": requeued, "failed": failed}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        out = {status: 0 for status in ("queued", "running", "done", "failed")}
+        out.update(dict(rows))
+        return out
+
+
+_default_store: Optional[JobStore] = None
+_default_lock = threading.Lock()
+
+
+def default_db_path() -> Path:
+    setting = os.environ.get("RESUME_JOBS_DB", "")
+    return Path(setting) if setting else Path.home() / ".cache" / "resume_optimizer" / "jobs.sqlite"
+
+
+def _store_for(path: Path) -> JobStore:
+    return JobStore(
+        path,
+        ttl=float(os.environ.get("RESUME_JOBS_TTL", "3600")),
+        lease=float(os.environ.get("RESUME_JOBS_LEASE", "600")),
+    )
+
+
+def get_job_store() -> JobStore:
+    """Process-wide queue at RESUME_JOBS_DB."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = _store_for(default_db_path())
+        return _default_store
+
+
+# ---- stages (run in worker processes) ------------------------------------------
+
+class _NamedBytes(io.BytesIO):
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def _run_parse(payload: dict, data: Optional[bytes]) -> Tuple[dict, Optional[bytes]]:
+    from .parser import extract_text_and_fields
+
+    text, fields = extract_text_and_fields(_NamedBytes(data or b"", str(payload.get("filename", "resume.txt"))))
+    return {"text": text, "fields": fields}, None
+
+
+def _run_score(payload: dict, data: Optional[bytes]) -> Tuple[dict, Optional[bytes]]:
+    from .keyword_store import get_keywords
+    from .scorer import score_report, score_text
+
+    kw = get_keywords(KW_DIR)
+    report = score_report(*score_text(str(payload["resume_text"]), str(payload["job_desc"]), kw))
+    report["keywords_version"] = kw.version
+    return report, None
+
+
+def _run_optimize(payload: dict, data: Optional[bytes]) -> Tuple[dict, Optional[bytes]]:
+    from .optimizer import optimize_text
+
+    text = optimize_text(
+        str(payload["resume_text"]),
+        str(payload["job_desc"]),
+        [str(k) for k in payload.get("missing_keywords") or []],
+        use_llm=bool(payload.get("use_llm")),
+    )
+    return {"optimized": text}, None
+
+
+def _run_export(payload: dict, data: Optional[bytes]) -> Tuple[dict, Optional[bytes]]:
+    from .exporter import export_bytes
+
+    fmt = str(payload.get("format", "PDF")).upper()
+    return {"format": fmt}, export_bytes(str(payload["text"]), fmt)
+
+
+HANDLERS: Dict[str, Callable[[dict, Optional[bytes]], Tuple[dict, Optional[bytes]]]] = {
+    "parse": _run_parse,
+    "score": _run_score,
+    "optimize": _run_optimize,
+    "export": _run_export,
+}
+
+
+def _warm_worker() -> None:
+    from . import parser
+    from .keyword_store import get_keywords
+    from .semantic import load_model
+
+    # Workers are daemonic and may not start their own PDF pool
+    parser.PDF_WORKERS = 1
+    get_keywords(KW_DIR).matcher
+    try:
+        load_model(MODEL_DIR)
+    except Exception:
+        pass
+
+
+def run_worker(
+    db_path: str,
+    stop=None,
+    worker_id: Optional[str] = None,
+    poll_interval: float = 0.5,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """
+    Claim and run jobs until ``stop`` (an Event) is set, or ``max_jobs`` have run.
+    Returns the number of jobs processed.
+    """
+    _warm_worker()
+    store = _store_for(Path(db_path))
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    stop = stop or threading.Event()
+    done = 0
+    last_purge = 0.0
+    while not stop.is_set() and (max_jobs is None or done < max_jobs):
+        if time.time() - last_purge > PURGE_INTERVAL:
+            store.purge()
+            last_purge = time.time()
+        claimed = store.claim(worker_id)
+        if claimed is None:
+            stop.wait(poll_interval)
+            continue
+        job, token, payload, data = claimed
+        # Heartbeat while the stage runs so a long LLM call is not mistaken for a dead worker
+        beating = threading.Event()
+
+        def beat(job_id: str = job.id, token: str = token) -> None:
+            while not beating.wait(max(1.0, store.lease / 4)):
+                if not store.heartbeat(job_id, token):
+                    break
+
+        heart = threading.Thread(target=beat, daemon=True)
+        heart.start()
+        try:
+            with metrics.span("job", kind=job.kind):
+                result, blob = HANDLERS[job.kind](payload, data)
+        except Exception as e:
+            owned = store.fail(job.id, token, f"{type(e).__name__}: {e}")
+            metrics.count("jobs", kind=job.kind, status="failed" if owned else "lost")
+        else:
+            owned = store.finish(job.id, token, result, blob)
+            metrics.count("jobs", kind=job.kind, status="done" if owned else "lost")
+        finally:
+            beating.set()
+            heart.join()
+        done += 1
+    return done
+
+
+def _pool_worker(db_path: str, stop, worker_id: str, poll_interval: float) -> None:
+    # Ctrl-C goes to the whole process group; the pool's owner stops workers via ``stop``
+    # so a job in progress is finished rather than left for the lease to expire
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_worker(db_path, stop, worker_id, poll_interval)
+
+
+class WorkerPool:
+    """``workers`` local processes running ``run_worker`` against one queue."""
+
+    def __init__(self, db_path: Path, workers: Optional[int] = None, poll_interval: float = 0.5):
+        self.db_path = Path(db_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context()
+        self._stop = self._ctx.Event()
+        self._procs = []
+
+    def start(self) -> "WorkerPool":
+        host = socket.gethostname()
+        for i in range(self.workers):
+            proc = self._ctx.Process(
+                target=_pool_worker,
+                args=(str(self.db_path), self._stop, f"{host}-{os.getpid()}-{i}", self.poll_interval),
+                daemon=True,
+            )
+            proc.start()
+            self._procs.append(proc)
+        return self
+
+    def alive(self) -> int:
+        return sum(1 for p in self._procs if p.is_alive())
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Let workers finish their current job, then stop them."""
+        self._stop.set()
+        deadline = time.time() + timeout
+        for p in self._procs:
+            p.join(max(0.0, deadline - time.time()))
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Run background job workers or inspect the job queue.")
+    ap.add_argument("--db", type=Path, default=None, help="Queue database (default: RESUME_JOBS_DB)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_worker = sub.add_parser("worker", help="Run worker processes until interrupted")
+    p_worker.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p_worker.add_argument("--poll", type=float, default=0.5, help="Seconds between polls of an empty queue")
+    p_status = sub.add_parser("status", help="Show one job, or queue counts")
+    p_status.add_argument("job_id", nargs="?")
+    sub.add_parser("purge", help="Delete expired results and requeue jobs of lost workers")
+    args = ap.parse_args(argv)
+
+    db = args.db or default_db_path()
+    if args.cmd == "worker":
+        pool = WorkerPool(db, args.workers, args.poll).start()
+        print(f"{pool.workers} worker(s) on {db}")
+        try:
+            while pool.alive():
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.stop()
+        return 0
+    store = _store_for(db)
+    if args.cmd == "status":
+        if args.job_id:
+            job = store.get(args.job_id)
+            if job is None:
+                print("unknown or expired")
+                return 1
+            print(json.dumps({**job._asdict(), "data": len(job.data) if job.data else 0}, indent=2))
+        else:
+            print(json.dumps(store.stats()))
+    else:
+        print(json.dumps(store.purge()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Set
+
+from .matcher import KeywordIndex
+from .scorer import DEFAULT_KEYWORDS, category_name, parse_keyword_text
+
+
+class _FileEntry(NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    words: Set[str]
+    aliases: Dict[str, str]
+
+
+class KeywordStore:
+    """
+    Process-wide cache of a keyword directory.
+
+    The parsed categories and the compiled matcher are kept between calls; on
+    ``get()`` the directory is re-checked at most once per ``check_interval``
+    seconds and only files whose mtime or size changed are re-read. ``version``
+    is a content hash that changes whenever the loaded keywords change, so
+    downstream caches can use it in their keys.
+    """
+
+    def __init__(self, directory: Path, check_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self._files: Dict[Path, _FileEntry] = {}
+        self._index: Optional[KeywordIndex] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    @property
+    def version(self) -> str:
+        return self.get().version
+
+    def get(self) -> KeywordIndex:
+        with self._lock:
+            now = time.monotonic()
+            if self._index is not None and now - self._last_check < self.check_interval:
+                return self._index
+            self._last_check = now
+            if self._refresh() or self._index is None:
+                self._index = self._build()
+                self.reloads += 1
+            return self._index
+
+    def _refresh(self) -> bool:
+        """Re-read changed files; returns True when anything was added, changed or removed."""
+        changed = False
+        seen = set()
+        paths = sorted(self.directory.glob("*.txt")) if self.directory.is_dir() else []
+        for p in paths:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            seen.add(p)
+            entry = self._files.get(p)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                continue
+            try:
+                raw = p.read_bytes()
+                words, aliases = parse_keyword_text(raw.decode("utf-8"))
+            except Exception:
+                continue
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry is None or entry.digest != digest:
+                changed = True
+            self._files[p] = _FileEntry(st.st_mtime_ns, st.st_size, digest, words, aliases)
+        for p in list(self._files):
+            if p not in seen:
+                del self._files[p]
+                changed = True
+        return changed
+
+    def _build(self) -> KeywordIndex:
+        categories: Dict[str, Set[str]] = {}
+        aliases: Dict[str, str] = {}
+        h = hashlib.sha256()
+        for p in sorted(self._files):
+            entry = self._files[p]
+            if not entry.words:
+                continue
+            categories[category_name(p)] = entry.words
+            aliases.update(entry.aliases)
+            h.update(f"{p.name}:{entry.digest}\n".encode("utf-8"))
+        if not categories:
+            categories = {cat: set(kws) for cat, kws in DEFAULT_KEYWORDS.items()}
+            h.update(b"<default>")
+        return KeywordIndex(categories, aliases, version=h.hexdigest()[:16])
+
+
+_STORES: Dict[Path, KeywordStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_keyword_store(directory: Path) -> KeywordStore:
+    key = Path(directory).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = KeywordStore(key)
+        return store
+
+
+def get_keywords(directory: Path) -> KeywordIndex:
+    """Cached equivalent of ``load_keywords(directory)``."""
+    return get_keyword_store(directory).get()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Longest a request waits for an identical in-flight one before doing the work itself
+FLIGHT_WAIT = float(os.environ.get("RESUME_LLM_FLIGHT_WAIT", "120"))
+
+
+def normalize_text(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def cache_key(
+    resume_text: str,
+    job_desc: str,
+    missing_keywords: Iterable[str],
+    model: str,
+    prompt_version: str,
+) -> str:
+    payload = json.dumps(
+        [
+            normalize_text(resume_text),
+            normalize_text(job_desc),
+            sorted({k.strip().lower() for k in missing_keywords if k and k.strip()}),
+            model,
+            prompt_version,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Collapses concurrent work for the same key into one call whose result everyone shares."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+
+    def begin(self, key: str) -> Tuple[bool, Future]:
+        """Returns (is_leader, future). The leader must call ``finish`` exactly once."""
+        with self._lock:
+            fut = self._flights.get(key)
+            if fut is not None:
+                return False, fut
+            fut = self._flights[key] = Future()
+            return True, fut
+
+    def finish(self, key: str, result: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            fut = self._flights.pop(key, None)
+        if fut is None or fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of optimizer outputs with TTL and size-based (least
+    recently used) eviction. Only successful LLM responses are stored. Reads and
+    writes are best-effort: a failed read (database locked or corrupt) is a miss
+    and a failed write (locked, disk full) is skipped; both are counted in
+    ``stats()`` and otherwise ignored.
+    """
+
+    def __init__(
+        self, path: Path, ttl: float = 7 * 24 * 3600, max_entries: int = 10000, flight_wait: float = FLIGHT_WAIT
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.flight_wait = flight_wait
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.read_errors = 0
+        self.write_errors = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    row = self._conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                    if row is not None and now - row[1] > self.ttl:
+                        self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        row = None
+                    if row is not None:
+                        self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                self.read_errors += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                        (key, value, now, now),
+                    )
+                    self._conn.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+                    (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+                    if count > self.max_entries:
+                        self._conn.execute(
+                            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed LIMIT ?)",
+                            (count - self.max_entries,),
+                        )
+            except sqlite3.Error:
+                self.write_errors += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Cached value for ``key``; otherwise run ``compute`` once even if several
+        threads ask concurrently. Exceptions propagate to every waiter and are not
+        cached. A waiter whose leader takes longer than ``flight_wait`` seconds runs
+        ``compute`` itself.
+        """
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        leader, fut = self.flights.begin(key)
+        if not leader:
+            try:
+                return fut.result(timeout=self.flight_wait)
+            except FutureTimeout:
+                return compute()
+        try:
+            value = compute()
+        except BaseException as e:
+            self.flights.finish(key, error=e)
+            raise
+        try:
+            self.put(key, value)
+        finally:
+            self.flights.finish(key, result=value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": count,
+                "max_entries": self.max_entries,
+                "read_errors": self.read_errors,
+                "write_errors": self.write_errors,
+            }
+
+
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Process-wide cache configured by RESUME_LLM_CACHE (SQLite path, or "off"),
+    RESUME_LLM_CACHE_TTL (seconds) and RESUME_LLM_CACHE_MAX (entries).
+    """
+    global _default_cache
+    setting = os.environ.get("RESUME_LLM_CACHE", "")
+    if setting.lower() in {"off", "0", "false", "none"}:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            path = Path(setting) if setting else Path.home() / ".cache" / "resume_optimizer" / "llm_cache.sqlite"
+            try:
+                _default_cache = LLMCache(
+                    path,
+                    ttl=float(os.environ.get("RESUME_LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                    max_entries=int(os.environ.get("RESUME_LLM_CACHE_MAX", "10000")),
+                )
+            except (OSError, sqlite3.Error):
+                return None
+        return _default_cache
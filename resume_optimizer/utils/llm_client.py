@@ -0,0 +1,92 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+# Shared Groq clients. Each client owns an httpx connection pool, so reusing one
+# per (API key, base URL) lets concurrent optimizations share keep-alive
+# connections instead of paying a TLS handshake per request. SDK retries are
+# disabled: llm_scheduler owns retry/backoff.
+#   GROQ_BASE_URL        point at another OpenAI-compatible server (e.g. a local stub)
+#   GROQ_TIMEOUT         per-request timeout in seconds (default 60)
+#   GROQ_MAX_CONNECTIONS connection pool size (default 20)
+
+_sync_clients: Dict[Tuple[str, Optional[str]], object] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Optional[str]], object]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _settings() -> Tuple[str, Optional[str], float, int]:
+    return (
+        os.environ.get("GROQ_API_KEY", ""),
+        os.environ.get("GROQ_BASE_URL") or None,
+        float(os.environ.get("GROQ_TIMEOUT", "60")),
+        int(os.environ.get("GROQ_MAX_CONNECTIONS", "20")),
+    )
+
+
+def _limits(max_conn: int):
+    import httpx
+
+    return httpx.Limits(max_connections=max_conn, max_keepalive_connections=max_conn)
+
+
+def get_client():
+    """Shared synchronous Groq client for the current API key (raises ImportError without groq)."""
+    from groq import DefaultHttpxClient, Groq
+
+    api_key, base_url, timeout, max_conn = _settings()
+    key = (api_key, base_url)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            client = Groq(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=0,
+                http_client=DefaultHttpxClient(limits=_limits(max_conn)),
+            )
+            _sync_clients[key] = client
+        return client
+
+
+def get_async_client():
+    """
+    Shared AsyncGroq client for the running event loop. httpx async pools are bound
+    to the loop that created them, so clients are cached per loop.
+    """
+    from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+    loop = asyncio.get_running_loop()
+    api_key, base_url, timeout, max_conn = _settings()
+    key = (api_key, base_url)
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(key)
+        if client is None:
+            client = AsyncGroq(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(limits=_limits(max_conn)),
+            )
+            per_loop[key] = client
+        return client
+
+
+def close_clients() -> None:
+    """Close pooled sync clients (async ones are dropped with their event loop)."""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for c in clients:
+        try:
+            c.close()
+        except Exception:
+            pass
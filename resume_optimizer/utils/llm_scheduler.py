@@ -0,0 +1,356 @@
+from __future__ import annotations
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Transport-level failures from the groq/httpx stack, matched by name so this
+# module does not need either package installed.
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "ConnectTimeout"}
+
+
+class LLMUnavailable(RuntimeError):
+    """Raised instead of calling upstream: circuit open or no capacity within the queue timeout."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return int(status) in RETRYABLE_STATUS
+    return isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ in RETRYABLE_ERRORS
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """``rate`` tokens per second with bursts of up to ``capacity``; rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Take a token, returning how long the caller must wait before using it, or
+        None (taking nothing) if that wait would exceed ``max_wait``.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive upstream failures; after
+    ``reset_timeout`` seconds a single trial call is let through (half-open) and
+    its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def abandon(self) -> None:
+        """An admitted call ended without reaching upstream; let another trial through."""
+        with self._lock:
+            self._trial_running = False
+
+
+class LLMScheduler:
+    """
+    Gatekeeper for upstream LLM calls: at most ``max_in_flight`` concurrent
+    requests, a token-bucket rate limit, retries with jittered exponential
+    backoff on 429/5xx/transport errors, and a circuit breaker that makes callers
+    skip straight to their fallback while upstream is unhealthy.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        rate: float = 0.0,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        queue_timeout: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = breaker or CircuitBreaker()
+        self._sem = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "queued": 0,
+            "in_flight": 0,
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rejected": 0,
+            "fallbacks": 0,
+        }
+
+    def _inc(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def record_fallback(self) -> None:
+        """Callers report each time they served the fallback instead of an LLM answer."""
+        self._inc("fallbacks")
+
+    def metrics(self) -> Dict[str, object]:
+        with self._lock:
+            m: Dict[str, object] = dict(self._counters)
+        m["queue_depth"] = m.pop("queued")
+        m["fallback_rate"] = (m["fallbacks"] / m["requests"]) if m["requests"] else 0.0
+        m["breaker_state"] = self.breaker.state
+        return m
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        hinted = _retry_after(exc)
+        if hinted is not None:
+            return min(self.backoff_max, hinted)
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _admit(self) -> None:
+        self._inc("requests")
+        if not self.breaker.allow():
+            self._inc("rejected")
+            raise LLMUnavailable("LLM circuit breaker is open")
+
+    @contextmanager
+    def _slot(self):
+        deadline = time.monotonic() + self.queue_timeout
+        self._inc("queued")
+        try:
+            acquired = self._sem.acquire(timeout=self.queue_timeout)
+        finally:
+            self._inc("queued", -1)
+        if not acquired:
+            self._inc("rejected")
+            raise LLMUnavailable("Timed out waiting for an LLM slot")
+        try:
+            wait = self.bucket.reserve(max(0.0, deadline - time.monotonic()))
+            if wait is None:
+                self._inc("rejected")
+                raise LLMUnavailable("LLM rate limit exceeded")
+            if wait:
+                time.sleep(wait)
+            self._inc("in_flight")
+            try:
+                yield
+            finally:
+                self._inc("in_flight", -1)
+        finally:
+            self._sem.release()
+
+    def _failed(self, exc: BaseException) -> None:
+        self._inc("failures")
+        if is_retryable(exc):
+            self.breaker.record_failure()
+        elif getattr(exc, "status_code", None) is not None:
+            # Upstream answered (e.g. a 400), so it is healthy
+            self.breaker.record_success()
+        else:
+            # Neither an outage nor a health signal (e.g. an empty completion): release a half-open trial
+            self.breaker.abandon()
+
+    def _run(self, fn: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                self._inc("retries")
+                time.sleep(self._backoff(attempt, e))
+                attempt += 1
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run ``fn`` under the limits; raises LLMUnavailable or the last upstream error."""
+        self._admit()
+        finished = False
+        try:
+            with self._slot():
+                result = self._run(fn)
+            finished = True
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            self._failed(e)
+            finished = True
+            raise
+        finally:
+            if not finished:
+                # Rejected before reaching upstream, or interrupted (KeyboardInterrupt, SystemExit)
+                self.breaker.abandon()
+        self._inc("successes")
+        self.breaker.record_success()
+        return result
+
+    def stream(self, open_stream: Callable[[], Iterable[T]]) -> Iterator[T]:
+        """Like ``call`` for streaming responses: opening is retried, and the slot is held until the stream ends."""
+        self._admit()
+        finished = False
+        try:
+            with self._slot():
+                for item in self._run(open_stream):
+                    yield item
+            finished = True
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            self._failed(e)
+            finished = True
+            raise
+        finally:
+            if not finished:
+                # Rejected before reaching upstream, or the consumer stopped early
+                self.breaker.abandon()
+        self._inc("successes")
+        self.breaker.record_success()
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """asyncio variant of ``call``; shares the same slots, bucket and breaker."""
+        self._admit()
+        finished = False
+        try:
+            deadline = time.monotonic() + self.queue_timeout
+            self._inc("queued")
+            try:
+                while not self._sem.acquire(blocking=False):
+                    if time.monotonic() >= deadline:
+                        self._inc("rejected")
+                        raise LLMUnavailable("Timed out waiting for an LLM slot")
+                    await asyncio.sleep(0.01)
+            finally:
+                self._inc("queued", -1)
+            try:
+                wait = self.bucket.reserve(max(0.0, deadline - time.monotonic()))
+                if wait is None:
+                    self._inc("rejected")
+                    raise LLMUnavailable("LLM rate limit exceeded")
+                if wait:
+                    await asyncio.sleep(wait)
+                self._inc("in_flight")
+                try:
+                    attempt = 0
+                    while True:
+                        try:
+                            result = await fn()
+                            break
+                        except Exception as e:
+                            if attempt >= self.max_retries or not is_retryable(e):
+                                self._failed(e)
+                                finished = True
+                                raise
+                            self._inc("retries")
+                            await asyncio.sleep(self._backoff(attempt, e))
+                            attempt += 1
+                finally:
+                    self._inc("in_flight", -1)
+            finally:
+                self._sem.release()
+            finished = True
+        finally:
+            if not finished:
+                # Rejected before reaching upstream, or cancelled (e.g. by asyncio.wait_for) while waiting or in flight
+                self.breaker.abandon()
+        self._inc("successes")
+        self.breaker.record_success()
+        return result
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """
+    Process-wide scheduler configured by RESUME_LLM_MAX_IN_FLIGHT, RESUME_LLM_RATE
+    (requests/sec, 0 = unlimited), RESUME_LLM_BURST, RESUME_LLM_MAX_RETRIES,
+    RESUME_LLM_QUEUE_TIMEOUT, RESUME_LLM_BREAKER_THRESHOLD and RESUME_LLM_BREAKER_RESET.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            env = os.environ.get
+            burst = env("RESUME_LLM_BURST")
+            _scheduler = LLMScheduler(
+                max_in_flight=int(env("RESUME_LLM_MAX_IN_FLIGHT", "8")),
+                rate=float(env("RESUME_LLM_RATE", "0")),
+                burst=float(burst) if burst else None,
+                max_retries=int(env("RESUME_LLM_MAX_RETRIES", "3")),
+                queue_timeout=float(env("RESUME_LLM_QUEUE_TIMEOUT", "30")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(env("RESUME_LLM_BREAKER_THRESHOLD", "5")),
+                    reset_timeout=float(env("RESUME_LLM_BREAKER_RESET", "30")),
+                ),
+            )
+        return _scheduler
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import functools
+import re
+import warnings
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9_+#\.\-/]*")
+
+# Key under which a trie node stores the canonical keyword it completes.
+# Tokens always start with a letter, so the empty string cannot collide.
+_END = ""
+
+
+def keyword_tokens(phrase: str) -> List[str]:
+    return [t.lower() for t in TOKEN_RE.findall(phrase)]
+
+
+class KeywordMatcher:
+    """
+    Token trie compiled from every category's keywords at once.
+
+    Keywords may be multi-word phrases ("machine learning") and may have aliases
+    ("k8s" -> "kubernetes"); matches are always reported under the canonical
+    keyword. A scan tokenizes the text once and walks the trie from each token,
+    so the cost is linear in the text (times the longest phrase, a handful of
+    tokens) and independent of how many keywords are loaded.
+    """
+
+    def __init__(self, keywords_by_cat: Mapping[str, Iterable[str]], aliases: Optional[Mapping[str, str]] = None):
+        self._root: Dict[str, dict] = {}
+        self.max_tokens = 1
+        self.categories: Dict[str, Set[str]] = {}
+        for cat, kws in keywords_by_cat.items():
+            for kw in kws:
+                self.categories.setdefault(kw, set()).add(cat)
+                self._insert(kw, kw)
+        # A keyword's own entry wins over an alias spelled the same way
+        own = {tuple(keyword_tokens(kw)) for kw in self.categories}
+        for alias, canonical in (aliases or {}).items():
+            if canonical not in self.categories:
+                continue
+            if tuple(keyword_tokens(alias)) in own and alias != canonical:
+                warnings.warn(f"Alias {alias!r} -> {canonical!r} ignored: {alias!r} is itself a keyword", stacklevel=2)
+                continue
+            self._insert(alias, canonical)
+        self.keywords: Set[str] = set(self.categories)
+
+    def _insert(self, phrase: str, canonical: str) -> None:
+        toks = keyword_tokens(phrase)
+        if not toks:
+            return
+        # Longest phrase in tokens: how far past its start a match can reach
+        self.max_tokens = max(self.max_tokens, len(toks))
+        node = self._root
+        for tok in toks:
+            node = node.setdefault(tok, {})
+        node[_END] = canonical
+
+    def _matches_at(self, tokens: List[str], i: int) -> Iterator[str]:
+        """Canonical keywords of every phrase starting at ``tokens[i]`` (lowercase tokens)."""
+        node = self._root.get(tokens[i])
+        j = i
+        n = len(tokens)
+        while node is not None:
+            kw = node.get(_END)
+            if kw is not None:
+                yield kw
+            j += 1
+            if j >= n:
+                break
+            node = node.get(tokens[j])
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """Return {canonical keyword: [character offsets of each occurrence]}."""
+        found = list(TOKEN_RE.finditer(text or ""))
+        tokens = [m.group(0).lower() for m in found]
+        hits: Dict[str, List[int]] = {}
+        for i in range(len(tokens)):
+            for kw in self._matches_at(tokens, i):
+                hits.setdefault(kw, []).append(found[i].start())
+        return hits
+
+    def match_tokens(self, tokens: List[str], stop: Optional[int] = None) -> List[str]:
+        """
+        Canonical keywords of the matches starting in ``tokens[:stop]``, one entry per
+        occurrence; tokens past ``stop`` only complete phrases that start earlier.
+        """
+        stop = len(tokens) if stop is None else min(stop, len(tokens))
+        out: List[str] = []
+        for i in range(stop):
+            out.extend(self._matches_at(tokens, i))
+        return out
+
+    def find(self, text: str) -> Set[str]:
+        """Canonical keywords present in ``text``."""
+        return set(self.scan(text))
+
+    def by_category(self, found: Iterable[str]) -> Dict[str, Set[str]]:
+        out: Dict[str, Set[str]] = {}
+        for kw in found:
+            for cat in self.categories.get(kw, ()):
+                out.setdefault(cat, set()).add(kw)
+        return out
+
+
+class KeywordIndex(dict):
+    """
+    ``{category: {keywords}}`` as returned by ``load_keywords``, carrying alias
+    groups and the compiled matcher (built on first use). ``version`` identifies
+    the keyword content when it comes from a KeywordStore.
+    """
+
+    def __init__(
+        self,
+        categories: Optional[Mapping[str, Set[str]]] = None,
+        aliases: Optional[Mapping[str, str]] = None,
+        version: str = "",
+    ):
+        super().__init__(categories or {})
+        self.aliases: Dict[str, str] = dict(aliases or {})
+        self.version = version
+        self._matcher: Optional[KeywordMatcher] = None
+        self._vocab = None
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        if self._matcher is None:
+            self._matcher = KeywordMatcher(self, self.aliases)
+        return self._matcher
+
+    @property
+    def vocab(self):
+        """Interned keyword vocabulary shared by compact score results (``vocab.KeywordVocab``)."""
+        if self._vocab is None:
+            from .vocab import KeywordVocab
+
+            self._vocab = KeywordVocab(self)
+        return self._vocab
+
+
+@functools.lru_cache(maxsize=16)
+def _compiled(frozen) -> KeywordMatcher:
+    return KeywordMatcher({cat: kws for cat, kws in frozen})
+
+
+def get_matcher(keywords_by_cat: Mapping[str, Iterable[str]]) -> KeywordMatcher:
+    """Compiled matcher for a KeywordIndex (cached on it) or a plain category dict (cached by content)."""
+    if isinstance(keywords_by_cat, KeywordIndex):
+        return keywords_by_cat.matcher
+    return _compiled(frozenset((cat, frozenset(kws)) for cat, kws in keywords_by_cat.items()))
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Lightweight in-process metrics: timing spans aggregated into histograms plus
+# event counters, rendered in the Prometheus text format. A request can also
+# collect its own spans (``trace``) for a per-request breakdown.
+#   RESUME_METRICS_LOG  log every span and event as one JSON line (logger "resume_optimizer.metrics")
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_log = logging.getLogger("resume_optimizer.metrics")
+_LOG_ENABLED = bool(os.environ.get("RESUME_METRICS_LOG"))
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.n += 1
+
+
+class Event(NamedTuple):
+    kind: str  # "span" (value in seconds) or "count"
+    name: str
+    labels: Labels
+    value: float
+    depth: int = 0
+
+
+class Trace:
+    """Spans and counts recorded while a ``trace()`` block is active."""
+
+    def __init__(self):
+        self.events: List[Event] = []
+        self.depth = 0
+        self.started = time.perf_counter()
+
+    def breakdown(self) -> List[Dict[str, object]]:
+        rows = []
+        for e in self.events:
+            if e.kind == "span":
+                label = ", ".join(f"{k}={v}" for k, v in e.labels)
+                rows.append({"stage": "  " * e.depth + e.name, "labels": label, "ms": round(e.value * 1000.0, 2)})
+        return rows
+
+    def counts(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for e in self.events:
+            if e.kind == "count":
+                key = e.name + "".join(f" {k}={v}" for k, v in e.labels)
+                out[key] = out.get(key, 0.0) + e.value
+        return out
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("resume_trace", default=None)
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, Labels], Histogram] = {}
+_counters: Dict[Tuple[str, Labels], float] = {}
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _observe(name: str, seconds: float, labels: Labels) -> None:
+    with _lock:
+        hist = _histograms.get((name, labels))
+        if hist is None:
+            hist = _histograms[(name, labels)] = Histogram()
+        hist.observe(seconds)
+    if _LOG_ENABLED:
+        _log.info(json.dumps({"span": name, "seconds": round(seconds, 6), **dict(labels)}))
+
+
+def _record_span(name: str, seconds: float, labels: Labels, depth: int = 0) -> None:
+    _observe(name, seconds, labels)
+    trace = _current.get()
+    if trace is not None:
+        trace.events.append(Event("span", name, labels, seconds, trace.depth + depth))
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Add one already-measured duration for stage ``name`` (for work that cannot sit inside a ``span``)."""
+    _record_span(name, seconds, _labels(labels))
+
+
+def count(name: str, value: float = 1.0, **labels) -> None:
+    """Increment counter ``name`` (exported as ``resume_<name>_total``)."""
+    _record_count(name, value, _labels(labels))
+
+
+def _record_count(name: str, value: float, labels: Labels) -> None:
+    with _lock:
+        _counters[(name, labels)] = _counters.get((name, labels), 0.0) + value
+    trace = _current.get()
+    if trace is not None:
+        trace.events.append(Event("count", name, labels, value, trace.depth))
+    if _LOG_ENABLED:
+        _log.info(json.dumps({"count": name, "value": value, **dict(labels)}))
+
+
+@contextmanager
+def span(name: str, **labels) -> Iterator[None]:
+    """
+    Time the block as stage ``name``; an exception is counted in ``resume_errors_total``
+    and re-raised. Early stops (GeneratorExit from an abandoned stream, cancellation,
+    KeyboardInterrupt) are timed but not counted as errors.
+    """
+    key = _labels(labels)
+    trace = _current.get()
+    if trace is not None:
+        # Reserve the slot so the breakdown lists a span before its children
+        slot = len(trace.events)
+        trace.events.append(Event("span", name, key, 0.0, trace.depth))
+        trace.depth += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        count("errors", stage=name)
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        _observe(name, seconds, key)
+        if trace is not None:
+            trace.depth -= 1
+            trace.events[slot] = trace.events[slot]._replace(value=seconds)
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Collect the spans of the enclosed work (in this thread/task, in start order) into a Trace."""
+    t = Trace()
+    token = _current.set(t)
+    try:
+        yield t
+    finally:
+        _current.reset(token)
+
+
+def replay(events: List[Event]) -> None:
+    """Record events captured by a ``trace()`` in another process (e.g. a pool worker)."""
+    for e in events:
+        if e.kind == "span":
+            _record_span(e.name, e.value, e.labels, e.depth)
+        else:
+            _record_count(e.name, e.value, e.labels)
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """``{"stage{labels}": {"count", "sum", "mean"}}`` for every histogram, plus counters under "counters"."""
+    out: Dict[str, Dict[str, float]] = {}
+    with _lock:
+        for (name, labels), h in _histograms.items():
+            key = name + _format_labels(labels)
+            out[key] = {"count": h.n, "sum": h.total, "mean": h.total / h.n if h.n else 0.0}
+        out["counters"] = {name + _format_labels(labels): v for (name, labels), v in _counters.items()}
+    return out
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in items)
+    return "{" + body + "}"
+
+
+def render_prometheus(gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Prometheus text exposition of ``resume_stage_seconds`` (histogram, one series
+    per stage and labels), ``resume_<name>_total`` counters and any extra gauges.
+    """
+    lines: List[str] = []
+    with _lock:
+        hists = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    if hists:
+        lines.append("# HELP resume_stage_seconds Time spent per processing stage.")
+        lines.append("# TYPE resume_stage_seconds histogram")
+    for (name, labels), h in hists:
+        base = (("stage", name),) + labels
+        cumulative = 0
+        for bound, c in zip(BUCKETS + (float("inf"),), h.counts):
+            cumulative += c
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"resume_stage_seconds_bucket{_format_labels(base, ('le', le))} {cumulative}")
+        lines.append(f"resume_stage_seconds_sum{_format_labels(base)} {h.total:.6f}")
+        lines.append(f"resume_stage_seconds_count{_format_labels(base)} {h.n}")
+    seen = set()
+    for (name, labels), v in counters:
+        metric = f"resume_{name}_total"
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_format_labels(labels)} {v:g}")
+    for name, v in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {v:g}")
+    return "\n".join(lines) + "\n"
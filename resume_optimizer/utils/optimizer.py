@@ -1,43 +1,131 @@
 from __future__ import annotations
+import asyncio
 import os
-from typing import Iterable
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from . import metrics
+from .llm_cache import cache_key, get_llm_cache
+from .llm_client import get_async_client, get_client
+from .llm_scheduler import get_scheduler
+from .sections import Section, split_body, split_sections
+from .semantic import semantic_similarity
+
+# Part of the LLM cache key: bump whenever the prompt changes meaningfully
+PROMPT_VERSION = "1"
+
+# Resumes longer than RESUME_LLM_CHUNK_CHARS are optimized section by section:
+# only sections relevant to the JD are sent (in chunks of at most
+# RESUME_LLM_SECTION_CHARS, concurrently), with the JD trimmed to RESUME_LLM_JD_CHARS.
+CHUNK_THRESHOLD_CHARS = int(os.environ.get("RESUME_LLM_CHUNK_CHARS", "6000"))
+SECTION_MAX_CHARS = int(os.environ.get("RESUME_LLM_SECTION_CHARS", "3000"))
+JD_MAX_CHARS = int(os.environ.get("RESUME_LLM_JD_CHARS", "4000"))
+SECTION_MIN_RELEVANCE = 0.05
+_ALWAYS_REWRITE = {"experience", "projects", "research"}
+_HEADER_KINDS = {"summary", "skills"}
 
 
 def llm_available() -> bool:
     return bool(os.environ.get("GROQ_API_KEY"))
 
 
-def _rule_based_opt(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> str:
+# Rule-based templates, shared by the single and batch paths
+_SUMMARY = (
+    "Professional Summary\n"
+    "Results-driven professional with experience relevant to the target role.\n"
+    "Tailored to the job description with emphasis on measurable impact, tools, and domain expertise.\n"
+)
+_SKILLS_HEADING = "Key Skills\n"
+_NO_MISSING = "Aligned with JD; core skills already present."
+_EXPERIENCE_HEADING = "Experience\n"
+
+
+def _skills_line(missing_keywords: Iterable[str]) -> str:
     missing_sorted = sorted({k for k in missing_keywords if k and len(k) < 40})
-    summary = (
-        "Professional Summary\n"
-        "Results-driven professional with experience relevant to the target role.\n"
-        "Tailored to the job description with emphasis on measurable impact, tools, and domain expertise.\n"
-    )
-    skills = "Key Skills\n" + (", ".join(missing_sorted) if missing_sorted else "Aligned with JD; core skills already present.") + "\n"
-
-    optimized = (
-        summary
-        + "\n"
-        + skills
-        + "\n"
-        + "Experience\n"
-        + resume_text.strip()
-    )
+    return ", ".join(missing_sorted) if missing_sorted else _NO_MISSING
+
+
+def _rule_based_header(missing_keywords: Iterable[str]) -> str:
+    return _SUMMARY + "\n" + _SKILLS_HEADING + _skills_line(missing_keywords) + "\n"
+
+
+def _rule_based_opt(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> str:
+    with metrics.span("optimize", mode="rules"):
+        optimized = (
+            _rule_based_header(missing_keywords)
+            + "\n"
+            + _EXPERIENCE_HEADING
+            + resume_text.strip()
+        )
     return optimized
 
 
-def _llm_opt(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> str:
+# Batch runs keep at most this many distinct skills lines / resume bodies memoized
+BATCH_MEMO_SIZE = 4096
+
+
+def optimize_many_rules(items: Iterable[Tuple[str, str, Iterable[str]]]) -> Iterator[str]:
+    """
+    Rule-based optimization of many ``(resume_text, job_desc, missing_keywords)``
+    triples, yielded in order; each text equals ``optimize_text(..., use_llm=False)``.
+
+    The header template is built once, and the sorted skills line (per set of
+    missing keywords) and the stripped resume body (per resume) are memoized, so
+    one resume tailored to many JDs, or many resumes to one JD, does that work
+    once. Items are consumed lazily and the memos are bounded, so memory stays
+    flat however long the input is.
+    """
+    prefix = _SUMMARY + "\n" + _SKILLS_HEADING
+    infix = "\n\n" + _EXPERIENCE_HEADING
+    skills: Dict[FrozenSet[str], str] = {}
+    bodies: Dict[str, str] = {}
+    n = 0
+    elapsed = 0.0
     try:
-        from groq import Groq
-    except Exception:
-        return _rule_based_opt(resume_text, job_desc, missing_keywords)
+        for resume_text, _job_desc, missing_keywords in items:
+            t0 = time.perf_counter()
+            key = missing_keywords if isinstance(missing_keywords, frozenset) else frozenset(missing_keywords)
+            line = skills.get(key)
+            if line is None:
+                if len(skills) >= BATCH_MEMO_SIZE:
+                    skills.clear()
+                line = skills[key] = _skills_line(key)
+            body = bodies.get(resume_text)
+            if body is None:
+                if len(bodies) >= BATCH_MEMO_SIZE:
+                    bodies.clear()
+                body = bodies[resume_text] = resume_text.strip()
+            text = prefix + line + infix + body
+            n += 1
+            elapsed += time.perf_counter() - t0
+            yield text
+    finally:
+        if n:
+            metrics.observe("optimize", elapsed, mode="rules_batch")
+            metrics.count("optimized", n, mode="rules_batch")
 
-    api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key:
-        return _rule_based_opt(resume_text, job_desc, missing_keywords)
 
-    client = Groq(api_key=api_key)
+def scored_triples(
+    resumes: Sequence[str], jds: Sequence[str], rows: Iterable[list]
+) -> Iterator[Tuple[str, str, Iterable[str]]]:
+    """
+    ``(resume, jd, missing)`` triples from ``scorer.score_many`` output, ready for
+    ``optimize_many_rules``. Accepts both the full (one result per JD) and the
+    ``top_k`` (``(jd_index, result)`` pairs) forms.
+    """
+    for i, row in enumerate(rows):
+        for j, entry in enumerate(row):
+            if len(entry) == 2:
+                j, entry = entry
+            yield resumes[i], jds[j], entry[2]
+
+
+def _model() -> str:
+    return os.environ.get("GROQ_MODEL", "llama-3.1-8b-instant")
+
+
+def _build_messages(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> List[dict]:
     missing = ", ".join(sorted(set(missing_keywords)))
     prompt = f"""
     You are an expert resume writer. Improve the following resume to better match the job description. Keep the structure concise and quantifiable. Use action verbs and measurable outcomes. Ensure inclusion of these missing keywords when relevant: {missing}.
@@ -46,23 +134,348 @@ def _llm_opt(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -
 
     Output a refined resume with sections: Professional Summary, Key Skills, Experience, Education (if present), Projects (if present).
     """
-    model = os.environ.get("GROQ_MODEL", "llama-3.1-8b-instant")
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You improve resumes for ATS and readability."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
+    return [
+        {"role": "system", "content": "You improve resumes for ATS and readability."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _cache_key(resume_text: str, job_desc: str, missing_keywords: Iterable[str], chunked: bool = False) -> str:
+    version = PROMPT_VERSION + ("+sections" if chunked else "")
+    return cache_key(resume_text, job_desc, missing_keywords, _model(), version)
+
+
+def _complete(messages: List[dict]) -> str:
+    """
+    One blocking completion through the scheduler (concurrency/rate limits,
+    retries, circuit breaker); raises on failure and on empty answers.
+    """
+    client = get_client()
+
+    def _once() -> str:
+        resp = client.chat.completions.create(model=_model(), messages=messages, temperature=0.2)
         content = (resp.choices[0].message.content or "").strip()
-        return content or _rule_based_opt(resume_text, job_desc, missing_keywords)
-    except Exception:
+        if not content:
+            raise ValueError("Empty completion")
+        return content
+
+    with metrics.span("llm_call", mode="blocking"):
+        return get_scheduler().call(_once)
+
+
+def _record_fallback() -> None:
+    get_scheduler().record_fallback()
+    metrics.count("fallbacks", stage="optimize")
+
+
+def _fallback(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> str:
+    _record_fallback()
+    return _rule_based_opt(resume_text, job_desc, missing_keywords)
+
+
+# Appended when a stream dies after some text was shown, so a cut-off answer is never taken as complete
+_TRUNCATED_NOTICE = (
+    "\n\n[Incomplete: the LLM response was interrupted. Run the optimization again, "
+    "or turn off LLM optimization for the rule-based version.]"
+)
+
+
+class _Piece(NamedTuple):
+    text: str  # static text, or the fallback when ``messages`` is set
+    messages: Optional[List[dict]] = None  # LLM rewrite task for this piece
+    heading: str = ""
+
+
+class _Degraded(Exception):
+    """Some section rewrites failed; ``text`` holds the result with originals in their place."""
+
+    def __init__(self, text: str):
+        super().__init__("Some sections fell back to the original text")
+        self.text = text
+
+
+def _section_messages(title: str, body: str, job_desc: str, missing: str) -> List[dict]:
+    prompt = f"""
+    You are an expert resume writer. Rewrite the "{title}" section of a resume to better match the job description. Keep every fact, date and employer; use action verbs and measurable outcomes. Work in these missing keywords only where they are truthful: {missing}.
+
+    Job Description:\n{job_desc}\n\nSection:\n{body}
+
+    Output only the rewritten section content, without the section heading.
+    """
+    return [
+        {"role": "system", "content": "You improve resumes for ATS and readability."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _header_messages(context: str, job_desc: str, missing: str) -> List[dict]:
+    prompt = f"""
+    You are an expert resume writer. Write a concise Professional Summary (2-3 sentences) and a Key Skills list for this candidate, targeted at the job description. Include these missing keywords when relevant: {missing}.
+
+    Job Description:\n{job_desc}\n\nCandidate background:\n{context}
+
+    Output exactly two sections with the headings "Professional Summary" and "Key Skills".
+    """
+    return [
+        {"role": "system", "content": "You improve resumes for ATS and readability."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _long_sections(resume_text: str) -> Optional[List[Section]]:
+    """
+    The resume's sections when it is optimized section by section, or None when
+    it is short enough (or has too few sections) for a single prompt. Cheap: it
+    decides the cache key, so it runs before the cache lookup.
+    """
+    if len(resume_text) <= CHUNK_THRESHOLD_CHARS:
+        return None
+    sections = split_sections(resume_text)
+    if sum(1 for sec in sections if sec.kind != "preamble") < 2:
+        return None
+    return sections
+
+
+def _chunk_plan(sections: List[Section], job_desc: str, missing_keywords: List[str]) -> List[_Piece]:
+    """
+    Turn a long resume's sections into ordered pieces: the contact preamble and
+    sections unrelated to the JD pass through unchanged, a generated summary/skills
+    block replaces any existing ones, and relevant sections become rewrite tasks.
+    Scores each section against the JD, so it only runs on a cache miss.
+    """
+    jd = job_desc[:JD_MAX_CHARS]
+    missing = ", ".join(sorted(set(missing_keywords)))
+    plan: List[_Piece] = []
+    for sec in sections:
+        if sec.kind == "preamble":
+            plan.append(_Piece(sec.body))
+
+    context = "\n\n".join(f"{sec.title}\n{sec.body}" for sec in sections if sec.kind in _HEADER_KINDS)
+    if not context:
+        context = "\n\n".join(f"{sec.title}\n{sec.body}" for sec in sections if sec.kind == "experience")
+    plan.append(_Piece(_rule_based_header(missing_keywords).strip(), _header_messages(context[:SECTION_MAX_CHARS], jd, missing)))
+
+    for sec in sections:
+        if sec.kind == "preamble" or sec.kind in _HEADER_KINDS:
+            continue
+        relevant = sec.kind in _ALWAYS_REWRITE or semantic_similarity(sec.body, jd) >= SECTION_MIN_RELEVANCE
+        if not relevant or not sec.body.strip():
+            plan.append(_Piece(f"{sec.title}\n{sec.body}".strip("\n")))
+            continue
+        for i, chunk in enumerate(split_body(sec.body, SECTION_MAX_CHARS)):
+            plan.append(_Piece(chunk, _section_messages(sec.title, chunk, jd, missing), sec.title if i == 0 else ""))
+    return plan
+
+
+def _run_plan(plan: List[_Piece]) -> Iterator[Tuple[str, bool]]:
+    """Run the plan's rewrite tasks concurrently, yielding (rendered piece, ok) in document order."""
+    tasks = [i for i, piece in enumerate(plan) if piece.messages]
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(tasks), get_scheduler().max_in_flight)))
+    try:
+        futures = {i: pool.submit(_complete, plan[i].messages) for i in tasks}
+        for i, piece in enumerate(plan):
+            ok = True
+            text = piece.text
+            if piece.messages:
+                try:
+                    text = futures[i].result()
+                except Exception:
+                    ok = False
+            yield (f"{piece.heading}\n{text}" if piece.heading else text), ok
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _chunked_opt(plan: List[_Piece]) -> str:
+    with metrics.span("llm_call", mode="sections"):
+        results = list(_run_plan(plan))
+    text = "\n\n".join(t for t, _ in results if t.strip())
+    task_ok = [ok for (_, ok), piece in zip(results, plan) if piece.messages]
+    if not any(task_ok):
+        raise RuntimeError("All section rewrites failed")
+    if not all(task_ok):
+        raise _Degraded(text)
+    return text
+
+
+def _llm_opt(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> str:
+    missing_keywords = list(missing_keywords)
+    if not llm_available():
         return _rule_based_opt(resume_text, job_desc, missing_keywords)
 
+    sections = _long_sections(resume_text)
+    if sections is not None:
+        compute = lambda: _chunked_opt(_chunk_plan(sections, job_desc, missing_keywords))  # noqa: E731
+    else:
+        messages = _build_messages(resume_text, job_desc, missing_keywords)
+        compute = lambda: _complete(messages)  # noqa: E731
+    cache = get_llm_cache()
+    try:
+        if cache is None:
+            return compute()
+        # Identical concurrent requests share one upstream call
+        return cache.get_or_compute(_cache_key(resume_text, job_desc, missing_keywords, sections is not None), compute)
+    except _Degraded as e:
+        _record_fallback()
+        return e.text
+    except Exception:
+        return _fallback(resume_text, job_desc, missing_keywords)
+
+
+def _llm_stream(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> Iterator[str]:
+    """
+    Yield completion chunks as they arrive. If the call fails before any text was
+    produced, the rule-based result is yielded instead; if it fails part-way, a
+    notice that the text is incomplete is yielded last. Cached answers (and answers
+    to an identical in-flight request) are yielded as a single chunk.
+    """
+    missing_keywords = list(missing_keywords)
+    cache = get_llm_cache() if llm_available() else None
+    sections = _long_sections(resume_text) if llm_available() else None
+    key = _cache_key(resume_text, job_desc, missing_keywords, sections is not None)
+    leader = False
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            yield hit
+            return
+        leader, flight = cache.flights.begin(key)
+        if not leader:
+            try:
+                yield flight.result(timeout=cache.flight_wait)
+            except _Degraded as e:
+                yield e.text
+            except Exception:
+                yield _fallback(resume_text, job_desc, missing_keywords)
+            return
+
+    parts: List[str] = []
+    completed = False
+    try:
+        try:
+            if not llm_available():
+                raise RuntimeError("LLM not configured")
+            if sections is not None:
+                plan = _chunk_plan(sections, job_desc, missing_keywords)
+                # Sections are emitted in order as soon as each one (and those before it) is ready
+                task_ok = []
+                for (text, ok), piece in zip(_run_plan(plan), plan):
+                    if piece.messages:
+                        task_ok.append(ok)
+                    if text.strip():
+                        chunk = ("\n\n" if parts else "") + text
+                        parts.append(chunk)
+                        yield chunk
+                completed = all(task_ok) and any(task_ok)
+                if not completed:
+                    _record_fallback()
+                return
+            client = get_client()
+            messages = _build_messages(resume_text, job_desc, missing_keywords)
+            stream = get_scheduler().stream(
+                lambda: client.chat.completions.create(
+                    model=_model(), messages=messages, temperature=0.2, stream=True
+                )
+            )
+            # Includes the time the consumer spends rendering each chunk
+            with metrics.span("llm_call", mode="stream"):
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            completed = True
+        except Exception:
+            pass
+        if not parts:
+            yield _fallback(resume_text, job_desc, missing_keywords)
+        elif not completed:
+            _record_fallback()
+            yield _TRUNCATED_NOTICE
+    finally:
+        if leader:
+            text = "".join(parts).strip()
+            if completed and text:
+                try:
+                    cache.put(key, text)
+                finally:
+                    cache.flights.finish(key, result=text)
+            else:
+                cache.flights.finish(key, error=RuntimeError("LLM stream did not complete"))
+
 
-def optimize_text(resume_text: str, job_desc: str, missing_keywords: Iterable[str], use_llm: bool = False) -> str:
+async def _llm_opt_async(resume_text: str, job_desc: str, missing_keywords: Iterable[str]) -> str:
+    missing_keywords = list(missing_keywords)
+    if len(resume_text) > CHUNK_THRESHOLD_CHARS:
+        # Long resumes use the sectioned path, whose rewrites already run concurrently
+        return await asyncio.to_thread(_llm_opt, resume_text, job_desc, missing_keywords)
+    cache = get_llm_cache()
+    key = _cache_key(resume_text, job_desc, missing_keywords)
+    leader = False
+    if cache is not None:
+        # SQLite calls run off the event loop
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            return hit
+        leader, flight = cache.flights.begin(key)
+        if not leader:
+            try:
+                # shield: a timed-out waiter must not cancel the future other waiters share
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(flight)), cache.flight_wait)
+            except Exception:
+                return _fallback(resume_text, job_desc, missing_keywords)
+
+    async def _once() -> str:
+        resp = await client.chat.completions.create(model=_model(), messages=messages, temperature=0.2)
+        content = (resp.choices[0].message.content or "").strip()
+        if not content:
+            raise ValueError("Empty completion")
+        return content
+
+    try:
+        client = get_async_client()
+        messages = _build_messages(resume_text, job_desc, missing_keywords)
+        with metrics.span("llm_call", mode="async"):
+            content = await get_scheduler().acall(_once)
+    except BaseException as e:
+        if leader:
+            cache.flights.finish(key, error=e)
+        if not isinstance(e, Exception):
+            raise
+        return _fallback(resume_text, job_desc, missing_keywords)
+    if leader:
+        try:
+            await asyncio.to_thread(cache.put, key, content)
+        finally:
+            cache.flights.finish(key, result=content)
+    return content
+
+
+def optimize_text(
+    resume_text: str,
+    job_desc: str,
+    missing_keywords: Iterable[str],
+    use_llm: bool = False,
+    stream: bool = False,
+) -> Union[str, Iterator[str]]:
+    """
+    Return the optimized resume. With ``stream=True`` an iterator of text chunks is
+    returned instead, so a UI can render LLM output as it arrives (the rule-based
+    path yields its whole result as a single chunk).
+    """
+    if stream:
+        if use_llm and llm_available():
+            return _llm_stream(resume_text, job_desc, missing_keywords)
+        return iter([_rule_based_opt(resume_text, job_desc, missing_keywords)])
     if use_llm and llm_available():
         return _llm_opt(resume_text, job_desc, missing_keywords)
     return _rule_based_opt(resume_text, job_desc, missing_keywords)
+
+
+async def optimize_text_async(resume_text: str, job_desc: str, missing_keywords: Iterable[str], use_llm: bool = False) -> str:
+    """asyncio variant of ``optimize_text``; concurrent calls share one pooled client per event loop."""
+    if use_llm and llm_available():
+        return await _llm_opt_async(resume_text, job_desc, missing_keywords)
+    return _rule_based_opt(resume_text, job_desc, missing_keywords)
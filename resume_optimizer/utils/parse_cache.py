@@ -0,0 +1,168 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+ParseResult = Tuple[str, Dict[str, str]]
+
+
+class ParseCache:
+    """
+    Content-addressed cache for parsed resumes.
+
+    Keys are a SHA-256 of the parser version, file extension and bytes, so the
+    same upload hits regardless of file name. A bounded in-memory LRU sits in
+    front of an optional on-disk tier (one JSON file per entry under
+    ``disk_dir``), which is trimmed to ``disk_max_bytes`` by evicting the least
+    recently used files.
+    """
+
+    def __init__(self, max_entries: int = 64, disk_dir: Optional[Path] = None, disk_max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+        # Bytes written since the disk tier was last measured (None: not measured yet)
+        self._disk_bytes: Optional[int] = None
+        self._mem: "OrderedDict[str, ParseResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name: str, data: bytes, version: str = "") -> str:
+        """``version`` identifies the parser and its limits; entries from other versions never hit."""
+        ext = os.path.splitext(name or "")[1].lower()
+        h = hashlib.sha256(version.encode("utf-8") + b"\0" + ext.encode("utf-8") + b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[ParseResult]:
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return hit[0], dict(hit[1])
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                result = (payload["text"], dict(payload["fields"]))
+                # mtime doubles as the last use for eviction
+                os.utime(path)
+            except Exception:
+                result = None
+            if result is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, result)
+                return result[0], dict(result[1])
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str, fields: Dict[str, str]) -> None:
+        self._remember(key, (text, dict(fields)))
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"text": text, "fields": fields}, f)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except Exception:
+            # The disk tier is best-effort
+            return
+        if self.disk_max_bytes:
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += size
+                over = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+            if over:
+                self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """Measure the disk tier and delete least recently used entries down to 90% of the bound."""
+        entries = []
+        for p in self.disk_dir.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        if total > self.disk_max_bytes:
+            target = self.disk_max_bytes * 0.9
+            entries.sort()
+            for _, size, p in entries:
+                if total <= target:
+                    break
+                try:
+                    p.unlink()
+                    total -= size
+                except OSError:
+                    pass
+        # Leftovers of writers that died mid-write
+        for p in self.disk_dir.glob("*/*.tmp"):
+            try:
+                if p.stat().st_mtime < time.time() - 3600:
+                    p.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def _remember(self, key: str, result: ParseResult) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._mem[key] = result
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._mem),
+                "max_entries": self.max_entries,
+            }
+
+
+_default_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """
+    Process-wide cache, sized by RESUME_PARSE_CACHE_SIZE with an optional
+    RESUME_PARSE_CACHE_DIR disk tier bounded by RESUME_PARSE_CACHE_DISK_MB.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache(
+            max_entries=int(os.environ.get("RESUME_PARSE_CACHE_SIZE", "64")),
+            disk_dir=os.environ.get("RESUME_PARSE_CACHE_DIR") or None,
+            disk_max_bytes=int(float(os.environ.get("RESUME_PARSE_CACHE_DISK_MB", "256")) * 1024 * 1024),
+        )
+    return _default_cache
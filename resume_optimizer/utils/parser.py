@@ -1,61 +1,386 @@
 from __future__ import annotations
 import io
+import multiprocessing
+import os
 import re
-from typing import Dict, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
 
-from docx import Document
-from PyPDF2 import PdfReader
+from . import metrics
+from .parse_cache import get_parse_cache
 
 
 EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}")
 PHONE_RE = re.compile(r"(?:\+\d{1,3}[\s-]?)?(?:\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}")
+# Longest possible PHONE_RE match; whether it matches at a position depends on this many characters
+_PHONE_SPAN = 19
+# Runs of characters between the line boundaries str.splitlines() uses
+_LINE_RE = re.compile(r"[^\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]+")
+
+# Part of the parse cache key: bump whenever extracted text or fields change
+PARSER_VERSION = "2"
+
+# Upload limits: bytes read from the upload, PDF pages, and (against zip bombs)
+# the uncompressed size of a DOCX as a multiple of the byte cap. 0 disables a cap.
+MAX_UPLOAD_BYTES = int(os.environ.get("RESUME_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.environ.get("RESUME_MAX_PDF_PAGES", "100"))
+DOCX_MAX_EXPANSION = 20
+
+
+class FileTooLarge(ValueError):
+    """The upload exceeds a size cap (bytes, PDF pages or uncompressed DOCX size)."""
+
+
+class ParseEvent(NamedTuple):
+    kind: str  # "fields": newly found contact fields (partial), "done": the full result
+    text: str
+    fields: Dict[str, str]
 
 
 def _read_txt(file_bytes: bytes) -> str:
     return file_bytes.decode("utf-8", errors="ignore")
 
 
-def _read_pdf(file: io.BytesIO) -> str:
-    reader = PdfReader(file)
-    text_parts = []
-    for page in reader.pages:
+# Parallel PDF extraction is opt-in: RESUME_PDF_WORKERS > 1 enables a process pool
+# for documents with at least RESUME_PDF_PARALLEL_MIN_PAGES pages.
+PDF_WORKERS = int(os.environ.get("RESUME_PDF_WORKERS", "1"))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("RESUME_PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_PAGE_TIMEOUT = float(os.environ.get("RESUME_PDF_PAGE_TIMEOUT", "20"))
+# Serial extraction abandons the helper thread of a timed-out page (threads cannot be
+# killed). While this many abandoned threads are still running, the pages that
+# remain are skipped instead of starting more threads that could get stuck.
+PDF_MAX_STUCK_THREADS = int(os.environ.get("RESUME_PDF_MAX_STUCK_THREADS", "4"))
+
+_stuck_threads = 0
+_stuck_lock = threading.Lock()
+
+
+def _thread_unstuck(_fut) -> None:
+    global _stuck_threads
+    with _stuck_lock:
+        _stuck_threads -= 1
+
+_worker_reader = None
+
+
+def _init_pdf_worker(data: bytes) -> None:
+    # Each worker opens the document once and then extracts pages by index
+    global _worker_reader
+    from PyPDF2 import PdfReader
+
+    _worker_reader = PdfReader(io.BytesIO(data))
+
+
+def _extract_serial(reader, index: int) -> Tuple[str, float]:
+    t0 = time.perf_counter()
+    try:
+        text = reader.pages[index].extract_text() or ""
+    except Exception:
+        metrics.count("errors", stage="parse_page")
+        text = ""
+    return text, time.perf_counter() - t0
+
+
+def _iter_serial(data: bytes, reader, n_pages: int, page_timeout: float) -> Iterator[str]:
+    if not page_timeout:
+        for i in range(n_pages):
+            text, seconds = _extract_serial(reader, i)
+            metrics.observe("parse_page", seconds, mode="serial")
+            yield text
+        return
+    # Each page runs on a helper thread so a stuck page cannot stall the caller. A thread
+    # cannot be killed: after a timeout it is abandoned (it keeps running, and holds its
+    # reader and the document, until the page finishes) and the remaining pages use a new
+    # thread and a new reader, since readers are not safe to share between threads.
+    global _stuck_threads
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-page")
+    try:
+        for i in range(n_pages):
+            if PDF_MAX_STUCK_THREADS and _stuck_threads >= PDF_MAX_STUCK_THREADS:
+                metrics.count("errors", stage="parse_page", reason="stuck_threads", value=n_pages - i)
+                for _ in range(i, n_pages):
+                    yield ""
+                return
+            fut = executor.submit(_extract_serial, reader, i)
+            try:
+                text, seconds = fut.result(timeout=page_timeout)
+            except FutureTimeout:
+                metrics.count("errors", stage="parse_page", reason="timeout")
+                with _stuck_lock:
+                    _stuck_threads += 1
+                fut.add_done_callback(_thread_unstuck)
+                executor.shutdown(wait=False)
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-page")
+                from PyPDF2 import PdfReader
+
+                reader = PdfReader(io.BytesIO(data))
+                yield ""
+                continue
+            metrics.observe("parse_page", seconds, mode="serial")
+            yield text
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _extract_page(index: int) -> Tuple[str, float]:
+    t0 = time.perf_counter()
+    try:
+        text = _worker_reader.pages[index].extract_text() or ""
+    except Exception:
+        text = ""
+    return text, time.perf_counter() - t0
+
+
+def iter_pdf_pages(
+    data: bytes,
+    workers: Optional[int] = None,
+    page_timeout: Optional[float] = None,
+    max_pages: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield the text of each page in order as soon as it is ready. Raises
+    FileTooLarge before extracting anything if the document has more than
+    ``max_pages`` pages (default MAX_PDF_PAGES).
+
+    A page that takes longer than ``page_timeout`` seconds (default
+    PDF_PAGE_TIMEOUT; 0 disables it) is yielded as "". With more than one worker
+    (and a long enough document) pages are extracted in a process pool: at most
+    one page per worker is in flight, so each page's deadline runs from its own
+    submission, and the pool is replaced once every worker is stuck and
+    terminated when the document is done or the caller stops early. Otherwise
+    each page runs on a helper thread, which is abandoned on timeout; while
+    PDF_MAX_STUCK_THREADS abandoned threads are still running (process-wide),
+    remaining pages are skipped. Unreadable pages are yielded as "".
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    page_timeout = PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+    # Imported on first use so that .txt/.docx uploads never load PyPDF2
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    if max_pages and n_pages > max_pages:
+        raise FileTooLarge(f"PDF has {n_pages} pages; the limit is {max_pages}")
+
+    if workers <= 1 or n_pages < max(2, PDF_PARALLEL_MIN_PAGES):
+        yield from _iter_serial(data, reader, n_pages, page_timeout)
+        return
+
+    procs = min(workers, n_pages)
+
+    def new_pool():
+        return multiprocessing.get_context().Pool(processes=procs, initializer=_init_pdf_worker, initargs=(data,))
+
+    # Without a timeout every page is queued at once; with one, only as many as there
+    # are free workers, so a page's deadline is measured from when it can start
+    window = procs if page_timeout else n_pages
+    pool = new_pool()
+    in_flight: Dict[int, Tuple[object, float]] = {}
+    stuck = []  # timed-out pages still occupying a worker
+    submitted = 0
+    timed_out = False
+    completed = False
+    try:
+        for i in range(n_pages):
+            stuck = [r for r in stuck if not r.ready()]
+            if len(stuck) >= procs:
+                # Every worker is stuck: replace the pool and restart the pages in flight
+                pool.terminate()
+                pool.join()
+                pool = new_pool()
+                stuck = []
+                for k in list(in_flight):
+                    in_flight[k] = (pool.apply_async(_extract_page, (k,)), time.monotonic() + page_timeout)
+            while submitted < n_pages and len(in_flight) + len(stuck) < window:
+                in_flight[submitted] = (pool.apply_async(_extract_page, (submitted,)), time.monotonic() + page_timeout)
+                submitted += 1
+            res, deadline = in_flight.pop(i)
+            try:
+                text, seconds = res.get(timeout=max(0.0, deadline - time.monotonic()) if page_timeout else None)
+            except multiprocessing.TimeoutError:
+                timed_out = True
+                stuck.append(res)
+                metrics.count("errors", stage="parse_page", reason="timeout")
+                yield ""
+                continue
+            except Exception:
+                metrics.count("errors", stage="parse_page")
+                yield ""
+                continue
+            metrics.observe("parse_page", seconds, mode="parallel")
+            yield text
+        completed = True
+    finally:
+        # A caller that stopped early must not wait for the remaining (or stuck) pages
+        if timed_out or not completed:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+
+def _iter_docx_paragraphs(data: bytes, max_bytes: int) -> Iterator[str]:
+    import zipfile
+
+    from docx import Document
+
+    if max_bytes:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            expanded = sum(info.file_size for info in zf.infolist())
+        if expanded > max_bytes * DOCX_MAX_EXPANSION:
+            raise FileTooLarge(f"DOCX expands to {expanded} bytes; the limit is {max_bytes * DOCX_MAX_EXPANSION}")
+    for p in Document(io.BytesIO(data)).paragraphs:
+        yield p.text
+
+
+class _FieldScanner:
+    """
+    Finds name, email and phone in text that arrives in chunks (pages or
+    paragraphs, joined with "\n"), with the same result as scanning the joined
+    text: the first non-empty line and the first regex matches. A field is only
+    reported once later text cannot change it, so a value is never revised.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self._phone_buf = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next chunk; returns True if a field was found."""
+        before = len(self.fields)
+        if "name" not in self.fields:
+            line = next((m.group(0).strip() for m in _LINE_RE.finditer(chunk) if m.group(0).strip()), "")
+            if line:
+                self.fields["name"] = line if 1 <= len(line.split()) <= 5 else ""
+        if "email" not in self.fields:
+            # Emails cannot contain a newline, so a match never spans two chunks
+            m = EMAIL_RE.search(chunk)
+            if m:
+                self.fields["email"] = m.group(0)
+        if "phone" not in self.fields:
+            # A phone number can span the "\n" between chunks: keep the undecided tail
+            buf = self._phone_buf + "\n" + chunk if self._started else chunk
+            m = PHONE_RE.search(buf)
+            if m and m.start() + _PHONE_SPAN <= len(buf):
+                self.fields["phone"] = m.group(0)
+            else:
+                keep = max(0, len(buf) - 2 * _PHONE_SPAN)
+                if m:
+                    keep = min(keep, m.start())
+                self._phone_buf = buf[keep:]
+        self._started = True
+        return len(self.fields) > before
+
+    def finish(self) -> Dict[str, str]:
+        if "phone" not in self.fields and self._phone_buf:
+            m = PHONE_RE.search(self._phone_buf)
+            if m:
+                self.fields["phone"] = m.group(0)
+        return {key: self.fields.get(key, "") for key in ("name", "email", "phone")}
+
+
+def _read_upload(uploaded_file, max_bytes: int) -> bytes:
+    """Read the upload, refusing (without reading it all) anything over ``max_bytes``."""
+    if max_bytes:
         try:
-            text_parts.append(page.extract_text() or "")
+            pos = uploaded_file.tell()
+            end = uploaded_file.seek(0, io.SEEK_END)
+            uploaded_file.seek(pos)
+            size = end - pos
         except Exception:
-            continue
-    return "\n".join(text_parts)
+            size = None
+        if size is not None and size > max_bytes:
+            raise FileTooLarge(f"Upload is {size} bytes; the limit is {max_bytes}")
+        data = uploaded_file.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise FileTooLarge(f"Upload exceeds the limit of {max_bytes} bytes")
+        return data
+    return uploaded_file.read()
+
+
+def _format(name: str) -> str:
+    return "pdf" if name.endswith(".pdf") else "docx" if name.endswith(".docx") else "txt"
+
 
+def _iter_chunks(fmt: str, data: bytes, max_bytes: int, max_pages: Optional[int]) -> Iterator[str]:
+    if fmt == "pdf":
+        return iter_pdf_pages(data, max_pages=max_pages)
+    if fmt == "docx":
+        return _iter_docx_paragraphs(data, max_bytes)
+    return iter([_read_txt(data)])
 
-def _read_docx(file: io.BytesIO) -> str:
-    doc = Document(file)
-    return "\n".join(p.text for p in doc.paragraphs)
 
+def _iter_parse(name: str, data: bytes, max_bytes: int, max_pages: Optional[int]) -> Iterator[ParseEvent]:
+    fmt = _format(name)
+    scanner = _FieldScanner()
+    chunks = []
+    with metrics.span("parse", format=fmt):
+        for chunk in _iter_chunks(fmt, data, max_bytes, max_pages):
+            chunks.append(chunk)
+            if len(scanner.fields) < 3 and scanner.feed(chunk):
+                yield ParseEvent("fields", "", dict(scanner.fields))
+        text = "\n".join(chunks)
+    yield ParseEvent("done", text, scanner.finish())
 
-def extract_text_and_fields(uploaded_file) -> Tuple[str, Dict[str, str]]:
+
+def iter_extract(
+    uploaded_file,
+    use_cache: bool = True,
+    max_bytes: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> Iterator[ParseEvent]:
     """
-    Accepts a Streamlit UploadedFile or any file-like object with .read() and .name.
-    Returns (text, fields_dict).
+    Streaming ``extract_text_and_fields``: yields a "fields" event each time name,
+    email or phone is found (usually on the first page or paragraph, before the
+    rest is extracted), then a final "done" event with the full text and fields.
+
+    Raises FileTooLarge when the upload exceeds ``max_bytes`` (default
+    MAX_UPLOAD_BYTES; checked before reading it when the file is seekable) or a
+    PDF has more than ``max_pages`` pages (default MAX_PDF_PAGES).
     """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
     name = getattr(uploaded_file, "name", "resume.txt").lower()
-    data = uploaded_file.read()
-
-    text = ""
-    if name.endswith(".pdf"):
-        text = _read_pdf(io.BytesIO(data))
-    elif name.endswith(".docx"):
-        text = _read_docx(io.BytesIO(data))
-    else:
-        text = _read_txt(data)
-
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    first_line = lines[0] if lines else ""
-    email_match = EMAIL_RE.search(text)
-    phone_match = PHONE_RE.search(text)
-
-    fields = {
-        "name": first_line if 1 <= len(first_line.split()) <= 5 else "",
-        "email": email_match.group(0) if email_match else "",
-        "phone": phone_match.group(0) if phone_match else "",
-    }
-
-    return text, fields
+    data = _read_upload(uploaded_file, max_bytes)
+
+    if not use_cache:
+        yield from _iter_parse(name, data, max_bytes, max_pages)
+        return
+    cache = get_parse_cache()
+    # The limits are part of the version so a lower cap is never bypassed by an older entry
+    pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    key = cache.key(name, data, f"{PARSER_VERSION}:{max_bytes}:{pages}")
+    hit = cache.get(key)
+    if hit is not None:
+        metrics.count("parse_cache", result="hit")
+        text, fields = hit
+        yield ParseEvent("fields", "", dict(fields))
+        yield ParseEvent("done", text, fields)
+        return
+    metrics.count("parse_cache", result="miss")
+    for event in _iter_parse(name, data, max_bytes, max_pages):
+        if event.kind == "done":
+            cache.put(key, event.text, event.fields)
+        yield event
+
+
+def extract_text_and_fields(
+    uploaded_file,
+    use_cache: bool = True,
+    max_bytes: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Accepts a Streamlit UploadedFile or any file-like object with .read() and .name.
+    Returns (text, fields_dict). Results are cached by a hash of the file bytes
+    (see parse_cache) unless use_cache is False. Uploads over the size caps raise
+    FileTooLarge (see ``iter_extract``).
+    """
+    for event in iter_extract(uploaded_file, use_cache=use_cache, max_bytes=max_bytes, max_pages=max_pages):
+        if event.kind == "done":
+            return event.text, event.fields
+    return "", {"name": "", "email": "", "phone": ""}
+
@@ -1,63 +1,79 @@
 from __future__ import annotations
 from pathlib import Path
-import re
-from typing import Dict, Iterable, Set, Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
-from .semantic import semantic_similarity
+from . import metrics
+from .matcher import KeywordIndex, get_matcher
+from .semantic import semantic_similarity, similarity_matrix
 
-_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9_+#\.\-/]*")
+
+DEFAULT_KEYWORDS: Dict[str, Set[str]] = {
+    "General": {
+        "python", "java", "javascript", "sql", "aws", "azure", "gcp",
+        "docker", "kubernetes", "microservices", "rest", "graphql",
+        "machine learning", "nlp", "cv", "mlops", "pandas",
+        "numpy", "scikit-learn", "tensorflow", "pytorch",
+        "communication", "leadership", "agile", "scrum",
+    }
+}
 
 
-def _tokenize(text: str) -> Set[str]:
-    return {t.lower() for t in _WORD_RE.findall(text)}
+def category_name(path: Path) -> str:
+    return path.stem.replace("_", " ").title()
 
 
-def load_keywords(directory: Path) -> Dict[str, Set[str]]:
+def parse_keyword_text(text: str) -> Tuple[Set[str], Dict[str, str]]:
+    """
+    Parse one category file: a keyword or phrase per line, optionally followed by
+    aliases separated with "|" (e.g. "kubernetes | k8s"). Returns (keywords, {alias: keyword}).
+    """
+    words: Set[str] = set()
+    aliases: Dict[str, str] = {}
+    for line in text.splitlines():
+        parts = [w.strip().lower() for w in line.split("|")]
+        parts = [w for w in parts if w]
+        if not parts:
+            continue
+        words.add(parts[0])
+        for alias in parts[1:]:
+            aliases[alias] = parts[0]
+    return words, aliases
+
+
+def load_keywords(directory: Path) -> KeywordIndex:
     """
     Load keywords grouped by category (filename stem -> category name).
-    Returns a dict: {category: {keywords}}
+    Returns a KeywordIndex, a dict {category: {keywords}} that also carries the
+    alias groups and a compiled matcher for all categories.
     """
     categories: Dict[str, Set[str]] = {}
+    aliases: Dict[str, str] = {}
     if directory.exists() and directory.is_dir():
         for p in sorted(directory.glob("*.txt")):
             try:
-                cat = p.stem.replace("_", " ").title()
-                words: Set[str] = set()
-                for line in p.read_text(encoding="utf-8").splitlines():
-                    w = line.strip().lower()
-                    if w:
-                        words.add(w)
+                words, file_aliases = parse_keyword_text(p.read_text(encoding="utf-8"))
                 if words:
-                    categories[cat] = words
+                    categories[category_name(p)] = words
+                    aliases.update(file_aliases)
             except Exception:
                 continue
     if not categories:
-        categories = {
-            "General": {
-                "python", "java", "javascript", "sql", "aws", "azure", "gcp",
-                "docker", "kubernetes", "microservices", "rest", "graphql",
-                "machine learning", "nlp", "cv", "mlops", "pandas",
-                "numpy", "scikit-learn", "tensorflow", "pytorch",
-                "communication", "leadership", "agile", "scrum",
-            }
-        }
-    return categories
+        categories = {cat: set(kws) for cat, kws in DEFAULT_KEYWORDS.items()}
+    return KeywordIndex(categories, aliases)
 
 
-def score_text(resume_text: str, job_desc: str, keywords_by_cat: Dict[str, Set[str]]):
+def _score_from_matches(
+    res_tokens: Set[str],
+    jd_tokens: Set[str],
+    keywords_by_cat: Dict[str, Set[str]],
+    union_all: Set[str],
+    sem: float,
+):
     """
-    Returns (overall_score, matched_keywords, missing_keywords, details_dict)
-    details = {
-      'exact_score': float 0..100,
-      'semantic': float 0..100,
-      'category_breakdown': {cat: {"coverage": %, "matched": set, "missing": set}}
-    }
+    Shared scoring core for the single-pair and batch paths. ``res_tokens``/``jd_tokens``
+    are the canonical keywords found by the matcher; ``sem`` is already 0..100.
     """
-    res_tokens = _tokenize(resume_text)
-    jd_tokens = _tokenize(job_desc)
-
     # Build JD-focused keyword set and per-category stats
-    union_all: Set[str] = set().union(*keywords_by_cat.values()) if keywords_by_cat else set()
     jd_kw = union_all.intersection(jd_tokens) or union_all
 
     matched = jd_kw.intersection(res_tokens)
@@ -80,12 +96,11 @@ def score_text(resume_text: str, job_desc: str, keywords_by_cat: Dict[str, Set[s
             "missing": cat_missing,
         }
 
-    # Semantic similarity (TF-IDF cosine) scaled to 0..100
-    try:
-        sem = semantic_similarity(resume_text, job_desc) * 100.0
-    except Exception:
-        sem = 0.0
+    overall, details = _blend(exact_score, sem, cat_breakdown)
+    return overall, matched, missing, details
+
 
+def _blend(exact_score: float, sem: float, cat_breakdown: Dict[str, Dict[str, object]]):
     # Blend score: emphasize exact matches but include semantics
     overall = round(0.7 * exact_score + 0.3 * sem, 1)
 
@@ -94,4 +109,141 @@ def score_text(resume_text: str, job_desc: str, keywords_by_cat: Dict[str, Set[s
         "semantic": round(sem, 1),
         "category_breakdown": cat_breakdown,
     }
-    return overall, matched, missing, details
+    return overall, details
+
+
+def score_text(resume_text: str, job_desc: str, keywords_by_cat: Dict[str, Set[str]]):
+    """
+    Returns (overall_score, matched_keywords, missing_keywords, details_dict)
+    details = {
+      'exact_score': float 0..100,
+      'semantic': float 0..100,
+      'category_breakdown': {cat: {"coverage": %, "matched": set, "missing": set}}
+    }
+    """
+    with metrics.span("score"):
+        with metrics.span("keyword_match"):
+            matcher = get_matcher(keywords_by_cat)
+            res_tokens = matcher.find(resume_text)
+            jd_tokens = matcher.find(job_desc)
+        union_all = matcher.keywords
+
+        # Semantic similarity (TF-IDF cosine) scaled to 0..100
+        try:
+            sem = semantic_similarity(resume_text, job_desc) * 100.0
+        except Exception:
+            metrics.count("errors", stage="semantic")
+            sem = 0.0
+
+        return _score_from_matches(res_tokens, jd_tokens, keywords_by_cat, union_all, sem)
+
+
+def score_report(overall: float, matched: Set[str], missing: Set[str], details: Dict[str, object]) -> Dict[str, object]:
+    """JSON-serializable form of a ``score_text`` result (sets become sorted lists)."""
+    cat_json = {}
+    for cat, info in (details.get("category_breakdown") or {}).items():
+        if isinstance(info, dict):
+            cat_json[cat] = {
+                "coverage": float(info.get("coverage", 0.0)),
+                "matched": sorted(info.get("matched", [])),
+                "missing": sorted(info.get("missing", [])),
+            }
+    return {
+        "overall": float(overall),
+        "details": {
+            "exact_score": float(details.get("exact_score", 0.0)),
+            "semantic": float(details.get("semantic", 0.0)),
+            "category_breakdown": cat_json,
+        },
+        "matched": sorted(matched),
+        "missing": sorted(missing),
+    }
+
+
+def _keyword_matrix(token_sets: Sequence[Set[str]], kw_index: Dict[str, int]):
+    """Binary docs x keywords CSR matrix built from already-matched documents."""
+    import numpy as np
+    import scipy.sparse as sp
+
+    indptr = [0]
+    indices: List[int] = []
+    for toks in token_sets:
+        indices.extend(kw_index[t] for t in toks if t in kw_index)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float64)
+    return sp.csr_matrix((data, indices, indptr), shape=(len(token_sets), len(kw_index)))
+
+
+def score_many(
+    resumes: Sequence[str],
+    jds: Sequence[str],
+    keywords_by_cat: Dict[str, Set[str]],
+    top_k: Optional[int] = None,
+):
+    """
+    Score every resume against every job description in one vectorized pass.
+
+    Each document is scanned once by the keyword matcher, exact-match counts come from a single
+    resumes x keywords by keywords x JDs sparse product, and semantic similarity
+    from ``semantic.similarity_matrix``. Per-pair results are identical to
+    ``score_text``.
+
+    Returns one list per resume:
+      - top_k is None: ``[(overall, matched, missing, details), ...]`` in JD order
+      - otherwise: ``[(jd_index, (overall, matched, missing, details)), ...]`` for the
+        ``top_k`` best JDs, highest overall score first
+    """
+    import numpy as np
+
+    resumes = list(resumes)
+    jds = list(jds)
+    n_r, n_j = len(resumes), len(jds)
+    if not n_r:
+        return []
+    with metrics.span("keyword_match", mode="batch"):
+        matcher = get_matcher(keywords_by_cat)
+        res_tokens = [matcher.find(t) for t in resumes]
+        jd_tokens = [matcher.find(t) for t in jds]
+    union_all = matcher.keywords
+
+    try:
+        sem = similarity_matrix(resumes, jds) * 100.0
+    except Exception:
+        metrics.count("errors", stage="semantic")
+        sem = np.zeros((n_r, n_j))
+
+    # Exact-match scores for all pairs; an empty JD focus falls back to every keyword.
+    kw_index = {kw: i for i, kw in enumerate(sorted(union_all))}
+    R = _keyword_matrix(res_tokens, kw_index)
+    J = _keyword_matrix(jd_tokens, kw_index)
+    jd_focus = np.asarray(J.sum(axis=1)).ravel()
+    empty_focus = jd_focus == 0
+    if empty_focus.any():
+        J = J.tolil()
+        for j in np.flatnonzero(empty_focus):
+            J[j, :] = 1.0
+        J = J.tocsr()
+        jd_focus[empty_focus] = len(kw_index)
+    matched_counts = (R @ J.T).toarray()
+    exact = 100.0 * matched_counts / np.maximum(1.0, jd_focus)[None, :]
+
+    def _pair(i: int, j: int):
+        return _score_from_matches(res_tokens[i], jd_tokens[j], keywords_by_cat, union_all, float(sem[i, j]))
+
+    out = []
+    if top_k is None:
+        for i in range(n_r):
+            out.append([_pair(i, j) for j in range(n_j)])
+        return out
+
+    k = max(0, min(int(top_k), n_j))
+    blended = 0.7 * exact + 0.3 * sem
+    for i in range(n_r):
+        if k == 0:
+            out.append([])
+            continue
+        row = blended[i]
+        idx = np.argpartition(-row, k - 1)[:k] if k < n_j else np.arange(n_j)
+        idx = idx[np.argsort(-row[idx], kind="stable")]
+        out.append([(int(j), _pair(i, int(j))) for j in idx])
+    return out
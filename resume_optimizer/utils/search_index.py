@@ -0,0 +1,522 @@
+from __future__ import annotations
+import argparse
+import heapq
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .matcher import KeywordIndex
+
+if TYPE_CHECKING:
+    from .semantic_model import SemanticModel
+
+FORMAT_VERSION = 1
+# Same blend as scorer._blend
+EXACT_WEIGHT, SEMANTIC_WEIGHT = 0.7, 0.3
+
+
+class SearchHit(NamedTuple):
+    doc_id: str
+    score: float  # overall 0..100, as score_text reports it
+    exact: float
+    semantic: float
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _save_array(path: Path, arr) -> None:
+    import numpy as np
+
+    with path.open("wb") as f:
+        np.save(f, arr)
+
+
+def _gather(ptr, data, rows):
+    """Concatenate ``data[ptr[r]:ptr[r + 1]]`` for every row in ``rows`` with one fancy index."""
+    import numpy as np
+
+    starts = ptr[rows]
+    lens = ptr[rows + 1] - starts
+    offsets = np.repeat(starts - (np.cumsum(lens) - lens), lens) + np.arange(int(lens.sum()))
+    return data[offsets]
+
+
+class _Segment:
+    """
+    One immutable batch of documents. Everything is memory-mapped except the
+    tombstone list, the only file rewritten after the segment is created.
+
+    Files: ``term_ids``/``term_ptr``/``term_docs``/``term_w`` (TF-IDF postings for
+    the model terms present, l2-normalized per document), ``kw_ptr``/``kw_docs``
+    (keyword postings), ``n_kw`` (distinct keywords per document), ``ids.bin`` +
+    ``id_off`` (document ids) and ``deleted.npy`` (tombstoned local positions).
+    """
+
+    def __init__(self, path: Path):
+        import numpy as np
+
+        self.path = path
+        # Plain ndarray views of the maps: indexing np.memmap itself is much slower
+        load = lambda name: np.load(path / f"{name}.npy", mmap_mode="r").view(np.ndarray)  # noqa: E731
+        self.term_ids = load("term_ids")
+        self.term_ptr = load("term_ptr")
+        self.term_docs = load("term_docs")
+        self.term_w = load("term_w")
+        self.kw_ptr = load("kw_ptr")
+        self.kw_docs = load("kw_docs")
+        self.n_kw = load("n_kw")
+        self.id_off = load("id_off")
+        self.ids = np.memmap(path / "ids.bin", dtype=np.uint8, mode="r").view(np.ndarray)
+        self.n_docs = len(self.n_kw)
+        self._terms = None
+        self.load_deleted()
+
+    def load_deleted(self) -> None:
+        import numpy as np
+
+        self.deleted = np.zeros(self.n_docs, dtype=bool)
+        if (self.path / "deleted.npy").exists():
+            self.deleted[np.load(self.path / "deleted.npy")] = True
+
+    @property
+    def terms(self):
+        """Postings as a docs x present-terms CSC matrix over the mapped arrays (no copy)."""
+        if self._terms is None:
+            import scipy.sparse as sp
+
+            self._terms = sp.csc_matrix(
+                (self.term_w, self.term_docs, self.term_ptr), shape=(self.n_docs, len(self.term_ids))
+            )
+        return self._terms
+
+    @property
+    def live(self) -> int:
+        return self.n_docs - int(self.deleted.sum())
+
+    def doc_id(self, i: int) -> str:
+        return bytes(self.ids[self.id_off[i] : self.id_off[i + 1]]).decode("utf-8")
+
+    def iter_ids(self) -> Iterator[Tuple[int, str]]:
+        data = bytes(self.ids)
+        off = self.id_off
+        for i in range(self.n_docs):
+            yield i, data[off[i] : off[i + 1]].decode("utf-8")
+
+    def mark_deleted(self, local: Sequence[int]) -> None:
+        import numpy as np
+
+        self.deleted[list(local)] = True
+        _save_array_atomic(self.path / "deleted.npy", np.flatnonzero(self.deleted).astype(np.int32))
+
+    def blended(self, q_terms, q_weights, kw_rows, exact_denom: int, n_keywords: int):
+        """Blended 0..100 score of every document in the segment (-inf for deleted ones)."""
+        import numpy as np
+
+        n = self.n_docs
+        pos = np.searchsorted(self.term_ids, q_terms)
+        pos_ok = pos < len(self.term_ids)
+        hit = np.zeros(len(q_terms), dtype=bool)
+        hit[pos_ok] = self.term_ids[pos[pos_ok]] == q_terms[pos_ok]
+        rows, weights = pos[hit], q_weights[hit]
+        # Column gather + product in C; touches only the postings of the JD's terms
+        sem = self.terms[:, rows] @ weights if len(rows) else np.zeros(n)
+        np.clip(sem, 0.0, 1.0, out=sem)
+
+        if exact_denom:
+            matched = np.bincount(_gather(self.kw_ptr, self.kw_docs, kw_rows), minlength=n)
+            exact = 100.0 * matched / exact_denom
+        else:
+            # JD names no known keyword: score against every keyword
+            exact = 100.0 * np.asarray(self.n_kw, dtype=np.float64) / max(1, n_keywords)
+        blended = EXACT_WEIGHT * exact + SEMANTIC_WEIGHT * (sem * 100.0)
+        blended[self.deleted] = -np.inf
+        return blended, exact, sem * 100.0
+
+
+def _save_array_atomic(path: Path, arr) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    _save_array(tmp, arr)
+    os.replace(tmp, path)
+
+
+def _write_segment(path: Path, ids: List[str], X, kw_sets: List[List[int]], n_keywords: int) -> None:
+    """Write documents (``X``: l2-normalized TF-IDF rows, ``kw_sets``: keyword ids per doc) as a segment."""
+    import numpy as np
+
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    csc = X.tocsc()
+    counts = np.diff(csc.indptr)
+    present = np.flatnonzero(counts)
+    _save_array(tmp / "term_ids.npy", present.astype(np.int64))
+    # int32 postings when they fit, so the memory-mapped arrays are used by scipy as they are
+    idx_dtype = np.int32 if csc.nnz < 2**31 else np.int64
+    _save_array(tmp / "term_ptr.npy", np.concatenate([[0], np.cumsum(counts[present])]).astype(idx_dtype))
+    _save_array(tmp / "term_docs.npy", csc.indices.astype(idx_dtype))
+    _save_array(tmp / "term_w.npy", csc.data.astype(np.float32))
+
+    pairs = sorted((k, d) for d, kws in enumerate(kw_sets) for k in kws)
+    kw_counts = np.bincount(np.asarray([k for k, _ in pairs], dtype=np.int64), minlength=n_keywords)
+    _save_array(tmp / "kw_ptr.npy", np.concatenate([[0], np.cumsum(kw_counts)]).astype(np.int64))
+    _save_array(tmp / "kw_docs.npy", np.asarray([d for _, d in pairs], dtype=np.int32))
+    _save_array(tmp / "n_kw.npy", np.asarray([len(k) for k in kw_sets], dtype=np.int32))
+
+    encoded = [i.encode("utf-8") for i in ids]
+    (tmp / "ids.bin").write_bytes(b"".join(encoded))
+    _save_array(tmp / "id_off.npy", np.concatenate([[0], np.cumsum([len(e) for e in encoded])]).astype(np.int64))
+    os.replace(tmp, path)
+
+
+class SearchIndex:
+    """
+    On-disk top-k retrieval of resumes for a job description.
+
+    Documents are stored as l2-normalized TF-IDF vectors under a frozen corpus
+    model (``semantic_model.SemanticModel``) and as keyword postings under a
+    frozen keyword index, both kept inside the index directory. A query walks
+    only the postings of the JD's terms and keywords and ranks with the scorer's
+    blend (0.7 exact keyword coverage + 0.3 semantic), so with the index's model
+    active ``score_text`` gives the same numbers.
+
+    Adds write a new immutable segment and deletes write a tombstone list, so
+    both are incremental; ``compact`` merges segments and drops deleted
+    documents. All arrays are memory-mapped, so every process that opens the
+    index shares one copy through the page cache. Searches pick up changes made
+    by another process (``refresh``); only one process should write at a time.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._meta_stamp: Optional[int] = None
+        self._segments: Dict[str, _Segment] = {}
+        self._ids: Optional[Dict[str, Tuple[str, int]]] = None
+        self.model: Optional[SemanticModel] = None
+        self._load_meta()
+
+    # ---- lifecycle -------------------------------------------------------
+
+    @classmethod
+    def create(cls, directory: Path, keywords_by_cat: Dict[str, Set[str]], model: Optional[SemanticModel] = None):
+        """
+        Start an empty index with these keywords. Without a model, one is fitted
+        on the first batch added, so make that batch representative (or fit a
+        model on a corpus first with ``python -m utils.semantic_model``).
+        """
+        directory = Path(directory)
+        if (directory / "meta.json").exists():
+            raise FileExistsError(f"Index already exists: {directory}")
+        directory.mkdir(parents=True, exist_ok=True)
+        keywords = {
+            "categories": {cat: sorted(kws) for cat, kws in keywords_by_cat.items()},
+            "aliases": dict(getattr(keywords_by_cat, "aliases", {})),
+            "version": getattr(keywords_by_cat, "version", ""),
+        }
+        _atomic_write(directory / "keywords.json", json.dumps(keywords, indent=2).encode("utf-8"))
+        if model is not None:
+            model.save(directory / "model")
+        meta = {"version": FORMAT_VERSION, "segments": [], "next_segment": 1}
+        _atomic_write(directory / "meta.json", json.dumps(meta, indent=2).encode("utf-8"))
+        return cls(directory)
+
+    @classmethod
+    def open(cls, directory: Path) -> "SearchIndex":
+        return cls(directory)
+
+    def _load_meta(self) -> None:
+        meta_path = self.directory / "meta.json"
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index format: {meta.get('version')}")
+        self._meta = meta
+        self._meta_stamp = meta_path.stat().st_mtime_ns
+        kw = json.loads((self.directory / "keywords.json").read_text(encoding="utf-8"))
+        self.keywords = KeywordIndex(
+            {cat: set(words) for cat, words in kw["categories"].items()}, kw.get("aliases"), kw.get("version", "")
+        )
+        self._kw_order = sorted(self.keywords.matcher.keywords)
+        self._kw_pos = {k: i for i, k in enumerate(self._kw_order)}
+        if self.model is None and (self.directory / "model" / "meta.json").exists():
+            from .semantic_model import SemanticModel
+
+            self.model = SemanticModel.load(self.directory / "model", mmap=True)
+        segments = {}
+        for name in meta["segments"]:
+            seg = self._segments.get(name)
+            if seg is None:
+                seg = _Segment(self.directory / name)
+            else:
+                seg.load_deleted()  # may have changed in another process
+            segments[name] = seg
+        self._segments = segments
+        self._ids = None
+
+    def refresh(self) -> bool:
+        """Reload if another process changed the index; returns True when it did."""
+        with self._lock:
+            stamp = (self.directory / "meta.json").stat().st_mtime_ns
+            if stamp == self._meta_stamp:
+                return False
+            self._load_meta()
+            return True
+
+    def _write_meta(self) -> None:
+        meta_path = self.directory / "meta.json"
+        _atomic_write(meta_path, json.dumps(self._meta, indent=2).encode("utf-8"))
+        self._meta_stamp = meta_path.stat().st_mtime_ns
+
+    def __len__(self) -> int:
+        return sum(seg.live for seg in self._segments.values())
+
+    # ---- writes ----------------------------------------------------------
+
+    def _id_map(self) -> Dict[str, Tuple[str, int]]:
+        """
+        Live location of every id. An id live in two segments (an add interrupted
+        between writing the new copy and retiring the old one) resolves to the
+        newer copy, and the older one is tombstoned here.
+        """
+        if self._ids is None:
+            ids: Dict[str, Tuple[str, int]] = {}
+            stale: Dict[str, List[int]] = {}
+            for name, seg in self._segments.items():
+                for i, doc_id in seg.iter_ids():
+                    if seg.deleted[i]:
+                        continue
+                    prev = ids.get(doc_id)
+                    if prev is not None:
+                        stale.setdefault(prev[0], []).append(prev[1])
+                    ids[doc_id] = (name, i)
+            for name, local in stale.items():
+                self._segments[name].mark_deleted(local)
+            if stale:
+                self._write_meta()
+            self._ids = ids
+        return self._ids
+
+    def _keyword_rows(self, text: str) -> List[int]:
+        return sorted(self._kw_pos[k] for k in self.keywords.matcher.find(text))
+
+    def add(self, records: Iterable[Tuple[str, str]], batch_size: int = 50_000) -> int:
+        """Index ``(doc_id, text)`` records, one new segment per batch; re-adding an id replaces it."""
+        added = 0
+        batch: List[Tuple[str, str]] = []
+        with self._lock:
+            self.refresh()
+            for rec in records:
+                batch.append(rec)
+                if len(batch) >= batch_size:
+                    added += self._add_batch(batch)
+                    batch = []
+            if batch:
+                added += self._add_batch(batch)
+        return added
+
+    def _add_batch(self, batch: List[Tuple[str, str]]) -> int:
+        latest: Dict[str, str] = {doc_id: text for doc_id, text in batch if doc_id}  # last occurrence wins
+        if not latest:
+            return 0
+        # Resolved before the new segment exists, so it still points at the old copies
+        self._id_map()
+        ids = list(latest)
+        texts = [latest[i] or "" for i in ids]
+        if self.model is None:
+            from .semantic_model import SemanticModel
+
+            self.model = SemanticModel.fit(texts)
+            self.model.save(self.directory / "model")
+            self.model = SemanticModel.load(self.directory / "model", mmap=True)
+        X = self.model.transform(texts)
+        kw_sets = [self._keyword_rows(t) for t in texts]
+
+        name = f"seg-{self._meta['next_segment']:06d}"
+        _write_segment(self.directory / name, ids, X, kw_sets, len(self._kw_order))
+        self._meta["next_segment"] += 1
+        self._meta["segments"].append(name)
+        self._write_meta()
+        seg = self._segments[name] = _Segment(self.directory / name)
+        # Retire replaced copies only once the new ones are committed: a crash in between
+        # leaves a duplicate (resolved by _id_map on the next write) instead of losing documents
+        self.delete(latest)
+        for i, doc_id in enumerate(ids):
+            self._ids[doc_id] = (name, i)
+        return seg.n_docs
+
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """Tombstone documents by id; unknown ids are ignored. Returns how many were deleted."""
+        with self._lock:
+            ids = self._id_map()
+            by_segment: Dict[str, List[int]] = {}
+            for doc_id in doc_ids:
+                loc = ids.pop(doc_id, None)
+                if loc is not None:
+                    by_segment.setdefault(loc[0], []).append(loc[1])
+            for name, local in by_segment.items():
+                self._segments[name].mark_deleted(local)
+            if by_segment:
+                self._write_meta()  # bump the stamp so other processes reload tombstones
+            return sum(len(v) for v in by_segment.values())
+
+    def compact(self) -> int:
+        """Merge all segments into one without deleted documents; returns the live document count."""
+        import numpy as np
+        import scipy.sparse as sp
+
+        with self._lock:
+            self.refresh()
+            if self.model is None or not self._segments:
+                return 0
+            self._id_map()  # drops duplicates left by an interrupted add
+            n_terms = self.model.n_terms
+            blocks, ids, kw_sets = [], [], []
+            for seg in self._segments.values():
+                lens = np.diff(seg.term_ptr)
+                cols = np.repeat(np.asarray(seg.term_ids), lens)
+                X = sp.csr_matrix(
+                    (np.asarray(seg.term_w), (np.asarray(seg.term_docs), cols)), shape=(seg.n_docs, n_terms)
+                )
+                keep = np.flatnonzero(~seg.deleted)
+                blocks.append(X[keep])
+                doc_kws: List[List[int]] = [[] for _ in range(seg.n_docs)]
+                for k in range(len(self._kw_order)):
+                    for d in seg.kw_docs[seg.kw_ptr[k] : seg.kw_ptr[k + 1]]:
+                        doc_kws[d].append(k)
+                live = set(keep.tolist())
+                for i, doc_id in seg.iter_ids():
+                    if i in live:
+                        ids.append(doc_id)
+                        kw_sets.append(doc_kws[i])
+            old = list(self._segments)
+            name = f"seg-{self._meta['next_segment']:06d}"
+            self._meta["next_segment"] += 1
+            if ids:
+                _write_segment(self.directory / name, ids, sp.vstack(blocks).tocsr(), kw_sets, len(self._kw_order))
+                self._meta["segments"] = [name]
+            else:
+                self._meta["segments"] = []
+            self._write_meta()
+            self._load_meta()
+            for n in old:
+                shutil.rmtree(self.directory / n, ignore_errors=True)
+            return len(ids)
+
+    # ---- queries ---------------------------------------------------------
+
+    def search(self, job_desc: str, top_k: int = 10) -> List[SearchHit]:
+        """Top ``top_k`` documents for ``job_desc``, best first."""
+        import numpy as np
+
+        from . import metrics
+
+        with metrics.span("search"):
+            self.refresh()
+            if self.model is None or top_k <= 0:
+                return []
+            q = self.model.transform([job_desc or ""]).tocsr()
+            order = np.argsort(q.indices)
+            q_terms = q.indices[order].astype(np.int64)
+            q_weights = q.data[order].astype(np.float64)
+            jd_kw = self._keyword_rows(job_desc or "")
+            kw_rows = np.asarray(jd_kw, dtype=np.int64)
+
+            heap: List[Tuple[float, int, str, int, float, float]] = []
+            for s_idx, (name, seg) in enumerate(self._segments.items()):
+                if not seg.n_docs:
+                    continue
+                blended, exact, sem = seg.blended(q_terms, q_weights, kw_rows, len(jd_kw), len(self._kw_order))
+                k = min(top_k, seg.n_docs)
+                idx = np.argpartition(-blended, k - 1)[:k] if k < seg.n_docs else np.arange(seg.n_docs)
+                for i in idx:
+                    b = float(blended[i])
+                    if b == -np.inf:
+                        continue
+                    item = (b, -s_idx, name, -int(i), float(exact[i]), float(sem[i]))
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+            hits = []
+            for b, _, name, neg_i, exact, sem in sorted(heap, reverse=True):
+                hits.append(
+                    SearchHit(self._segments[name].doc_id(-neg_i), round(b, 1), round(exact, 1), round(sem, 1))
+                )
+            return hits
+
+
+def _read_records(paths: Sequence[str]) -> Iterator[Tuple[str, str]]:
+    """``(id, text)`` from ingest JSONL output (records with errors are skipped) or from .txt files/directories."""
+    for raw in paths:
+        p = Path(raw)
+        if p.suffix.lower() == ".jsonl":
+            with p.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not rec.get("error") and rec.get("id"):
+                        yield rec["id"], rec.get("text") or ""
+        else:
+            files = sorted(p.rglob("*.txt")) if p.is_dir() else [p]
+            for f in files:
+                yield str(f), f.read_text(encoding="utf-8", errors="ignore")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build and query the resume search index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="Index ingest JSONL output or .txt files (creates the index if needed)")
+    p_add.add_argument("index")
+    p_add.add_argument("inputs", nargs="+")
+    p_add.add_argument("--keywords", default=str(Path(__file__).resolve().parents[1] / "data" / "keywords"))
+    p_add.add_argument("--model", help="Corpus model directory (default: SEMANTIC_MODEL_DIR, else fit on the first batch)")
+    p_add.add_argument("--batch-size", type=int, default=50_000)
+    p_query = sub.add_parser("query", help="Top-k documents for a JD")
+    p_query.add_argument("index")
+    p_query.add_argument("jd", help="Job description file ('-' for stdin)")
+    p_query.add_argument("-k", "--top-k", type=int, default=10)
+    p_del = sub.add_parser("delete", help="Delete documents by id")
+    p_del.add_argument("index")
+    p_del.add_argument("ids", nargs="+")
+    p_compact = sub.add_parser("compact", help="Merge segments and drop deleted documents")
+    p_compact.add_argument("index")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "add":
+        directory = Path(args.index)
+        if (directory / "meta.json").exists():
+            index = SearchIndex.open(directory)
+        else:
+            from .keyword_store import get_keywords
+
+            from .semantic import load_model
+
+            model = load_model(Path(args.model) if args.model else None)
+            index = SearchIndex.create(directory, get_keywords(Path(args.keywords)), model)
+        n = index.add(_read_records(args.inputs), batch_size=args.batch_size)
+        print(f"added {n} documents; {len(index)} live in {len(index._segments)} segment(s)")
+    elif args.cmd == "query":
+        index = SearchIndex.open(Path(args.index))
+        jd = sys.stdin.read() if args.jd == "-" else Path(args.jd).read_text(encoding="utf-8")
+        for hit in index.search(jd, args.top_k):
+            print(f"{hit.score:6.1f}  exact {hit.exact:5.1f}  semantic {hit.semantic:5.1f}  {hit.doc_id}")
+    elif args.cmd == "delete":
+        print(f"deleted {SearchIndex.open(Path(args.index)).delete(args.ids)}")
+    else:
+        print(f"compacted to {SearchIndex.open(Path(args.index)).compact()} documents")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import List, NamedTuple
+
+# Recognised headings (lowercase, without trailing ":") -> canonical section kind
+SECTION_KINDS = {
+    "summary": "summary",
+    "professional summary": "summary",
+    "profile": "summary",
+    "objective": "summary",
+    "about me": "summary",
+    "skills": "skills",
+    "key skills": "skills",
+    "technical skills": "skills",
+    "core competencies": "skills",
+    "experience": "experience",
+    "work experience": "experience",
+    "professional experience": "experience",
+    "employment history": "experience",
+    "work history": "experience",
+    "projects": "projects",
+    "selected projects": "projects",
+    "education": "education",
+    "publications": "publications",
+    "research": "research",
+    "research experience": "research",
+    "teaching": "teaching",
+    "teaching experience": "teaching",
+    "certifications": "certifications",
+    "awards": "awards",
+    "honors and awards": "awards",
+    "volunteer": "volunteer",
+    "volunteering": "volunteer",
+    "languages": "languages",
+    "interests": "interests",
+    "references": "references",
+}
+
+
+class Section(NamedTuple):
+    title: str  # heading line as written; "" for the preamble before the first heading
+    kind: str  # canonical kind from SECTION_KINDS, "preamble" for the header block
+    body: str
+
+
+def heading_kind(line: str) -> str:
+    """Canonical kind if ``line`` is a recognised section heading, else ""."""
+    key = " ".join(line.strip().rstrip(":").lower().split())
+    if not key or len(key) > 40:
+        return ""
+    return SECTION_KINDS.get(key, "")
+
+
+def split_sections(text: str) -> List[Section]:
+    """Split a resume into its preamble (name/contact block) and headed sections, in order."""
+    sections: List[Section] = []
+    title, kind, body = "", "preamble", []
+    for line in (text or "").splitlines():
+        k = heading_kind(line)
+        if k:
+            if title or any(b.strip() for b in body):
+                sections.append(Section(title, kind, "\n".join(body).strip("\n")))
+            title, kind, body = line.strip(), k, []
+        else:
+            body.append(line)
+    if title or any(b.strip() for b in body):
+        sections.append(Section(title, kind, "\n".join(body).strip("\n")))
+    return sections
+
+
+def split_body(body: str, max_chars: int) -> List[str]:
+    """
+    Split a long section body into chunks of up to ``max_chars``, breaking between
+    paragraphs (blank-line separated) or, if there are none, between lines.
+    """
+    if len(body) <= max_chars:
+        return [body]
+    sep = "\n\n" if "\n\n" in body else "\n"
+    chunks: List[str] = []
+    current = ""
+    for unit in body.split(sep):
+        candidate = f"{current}{sep}{unit}" if current else unit
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            current = unit
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
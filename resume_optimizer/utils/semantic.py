@@ -1,11 +1,56 @@
 from __future__ import annotations
+import math
+import os
 from functools import lru_cache
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity as _cos
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from . import metrics
+
+if TYPE_CHECKING:
+    from .semantic_model import SemanticModel
+
+# numpy/scikit-learn are imported inside the functions that use them, so importing
+# this module (and utils) stays cheap until the first similarity is computed.
+
+# Corpus-fitted model; when set, similarities use its frozen vocabulary and IDF
+# instead of fitting a vectorizer on each pair.
+_MODEL: Optional[SemanticModel] = None
+
+
+def set_model(model: Optional[SemanticModel]) -> None:
+    global _MODEL
+    _MODEL = model
+
+
+def get_model() -> Optional[SemanticModel]:
+    return _MODEL
+
+
+def load_model(directory: Optional[Path] = None) -> Optional[SemanticModel]:
+    """
+    Memory-map a saved model and make it the active one.
+    Uses SEMANTIC_MODEL_DIR when no directory is given; returns None if nothing is found.
+    """
+    if directory is None:
+        env = os.environ.get("SEMANTIC_MODEL_DIR")
+        if not env:
+            return None
+        directory = Path(env)
+    directory = Path(directory)
+    if not (directory / "meta.json").exists():
+        return None
+    from .semantic_model import SemanticModel
+
+    model = SemanticModel.load(directory, mmap=True)
+    set_model(model)
+    return model
 
 
 @lru_cache(maxsize=64)
 def _vectorize_pair(a: str, b: str):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     vec = TfidfVectorizer(ngram_range=(1, 2), stop_words="english")
     X = vec.fit_transform([a or "", b or ""])  # 2 x N
     return X
@@ -13,19 +58,86 @@ def _vectorize_pair(a: str, b: str):
 
 def semantic_similarity(a: str, b: str) -> float:
     """Return cosine similarity in 0..1 between two texts using TF-IDF bigrams."""
-    try:
-        X = _vectorize_pair(a or "", b or "")
-    except Exception:
-        # Handles cases like empty vocabulary or unexpected errors
-        return 0.0
-    try:
-        # sklearn returns a dense 1x1 ndarray; index with [0, 0]
-        sim = float(_cos(X[0], X[1])[0, 0])
-    except Exception:
-        return 0.0
+    if _MODEL is not None:
+        with metrics.span("tfidf", mode="model"):
+            try:
+                return min(1.0, max(0.0, _MODEL.similarity(a or "", b or "")))
+            except Exception:
+                metrics.count("errors", stage="tfidf")
+                return 0.0
+    with metrics.span("tfidf", mode="pair"):
+        try:
+            X = _vectorize_pair(a or "", b or "")
+        except Exception:
+            # Handles cases like empty vocabulary or unexpected errors
+            metrics.count("errors", stage="tfidf")
+            return 0.0
+        try:
+            from sklearn.metrics.pairwise import cosine_similarity as _cos
+
+            # sklearn returns a dense 1x1 ndarray; index with [0, 0]
+            sim = float(_cos(X[0], X[1])[0, 0])
+        except Exception:
+            metrics.count("errors", stage="tfidf")
+            return 0.0
     # clamp possible numerical instability
     if sim < 0:
         sim = 0.0
     if sim > 1:
         sim = 1.0
     return float(sim)
+
+
+# Pair-fitted IDF (smooth_idf over two documents): 1.0 for terms in both,
+# 1 + ln(3/2) for terms that occur in only one of them.
+_PAIR_IDF_UNIQUE = 1.0 + math.log(1.5)
+
+
+def similarity_matrix(docs_a: Sequence[str], docs_b: Sequence[str]):
+    """
+    Return a dense len(docs_a) x len(docs_b) array of cosine similarities in 0..1.
+
+    All documents are tokenized once by a single vectorizer, and every cell equals
+    ``semantic_similarity(docs_a[i], docs_b[j])``: the per-pair IDF of the
+    two-document fit is reconstructed from three sparse products instead of
+    fitting a new vectorizer for each pair. With an active corpus model this is a
+    single product of the two transformed blocks.
+    """
+    import numpy as np
+
+    n_a, n_b = len(docs_a), len(docs_b)
+    if not n_a or not n_b:
+        return np.zeros((n_a, n_b))
+    if _MODEL is not None:
+        with metrics.span("tfidf_matrix", mode="model"):
+            return _MODEL.similarity_matrix(docs_a, docs_b)
+    with metrics.span("tfidf_matrix", mode="pair"):
+        return _pair_similarity_matrix(docs_a, docs_b)
+
+
+def _pair_similarity_matrix(docs_a: Sequence[str], docs_b: Sequence[str]):
+    import numpy as np
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    n_a, n_b = len(docs_a), len(docs_b)
+    vec = CountVectorizer(ngram_range=(1, 2), stop_words="english")
+    try:
+        C = vec.fit_transform([d or "" for d in docs_a] + [d or "" for d in docs_b])
+    except ValueError:
+        # Empty vocabulary across the whole batch
+        return np.zeros((n_a, n_b))
+    C = C.tocsr().astype(np.float64)
+    A, B = C[:n_a], C[n_a:]
+    A_bin, B_bin = (A > 0).astype(np.float64), (B > 0).astype(np.float64)
+    A_sq, B_sq = A.multiply(A), B.multiply(B)
+
+    # Numerator: only shared terms contribute, and their pair IDF is 1.
+    dot = (A @ B.T).toarray()
+    # Squared norms: c^2 * (all terms) - (c^2 - 1) * (terms shared with the other doc)
+    c2 = _PAIR_IDF_UNIQUE ** 2
+    norm_a = c2 * np.asarray(A_sq.sum(axis=1)) - (c2 - 1.0) * (A_sq @ B_bin.T).toarray()
+    norm_b = c2 * np.asarray(B_sq.sum(axis=1)).T - (c2 - 1.0) * (A_bin @ B_sq.T).toarray()
+    denom = np.sqrt(np.clip(norm_a, 0.0, None) * np.clip(norm_b, 0.0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sim = np.where(denom > 0, dot / denom, 0.0)
+    return np.clip(sim, 0.0, 1.0)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Must stay in sync with the pair-fitted vectorizer in semantic.py
+NGRAM_RANGE = (1, 2)
+STOP_WORDS = "english"
+FORMAT_VERSION = 1
+
+
+class SemanticModel:
+    """
+    Corpus-level TF-IDF model with a frozen vocabulary.
+
+    Fit once on a reference corpus of resumes and JDs, save to a directory and
+    load it memory-mapped; scoring then only transforms the documents at hand.
+    Document frequencies are kept so the model can be refit incrementally.
+
+    The term index is a sorted array of fixed-width UTF-8 keys plus the column
+    of each (``keys.npy``/``cols.npy``), searched with ``np.searchsorted``, so a
+    loaded model keeps no per-term Python objects: every process maps the same
+    pages. The fixed width is that of the longest term, so the index costs
+    ``n_terms x longest term`` bytes of (shared) page cache. ``terms.txt`` is
+    only read when the model is refit or saved.
+    """
+
+    def __init__(self, terms: List[str], df: np.ndarray, n_docs: int):
+        self._terms: Optional[List[str]] = terms
+        self._dir: Optional[Path] = None
+        self.df = df
+        self.n_docs = int(n_docs)
+        self.idf = self._compute_idf(df, self.n_docs)
+        self._keys, self._cols = self._build_index(terms)
+        self._analyzer: Optional[Callable[[str], List[str]]] = None
+
+    @staticmethod
+    def _compute_idf(df: np.ndarray, n_docs: int) -> np.ndarray:
+        # Same smoothing as TfidfVectorizer(smooth_idf=True)
+        return np.log((1.0 + n_docs) / (1.0 + np.asarray(df, dtype=np.float64))) + 1.0
+
+    @staticmethod
+    def _build_index(terms: Sequence[str]):
+        encoded = np.array([t.encode("utf-8") for t in terms] or [b""], dtype=bytes)[: len(terms)]
+        order = np.argsort(encoded, kind="stable")
+        return encoded[order], order.astype(np.int64)
+
+    @staticmethod
+    def _doc_frequencies(docs: Sequence[str]):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        vec = CountVectorizer(ngram_range=NGRAM_RANGE, stop_words=STOP_WORDS, binary=True)
+        try:
+            X = vec.fit_transform([d or "" for d in docs])
+        except ValueError:
+            # Empty vocabulary
+            return {}, np.zeros(0, dtype=np.int64)
+        df = np.asarray(X.sum(axis=0)).ravel().astype(np.int64)
+        return vec.vocabulary_, df
+
+    @classmethod
+    def fit(cls, docs: Iterable[str]) -> "SemanticModel":
+        docs = list(docs)
+        vocab, df = cls._doc_frequencies(docs)
+        terms = [""] * len(vocab)
+        for term, idx in vocab.items():
+            terms[idx] = term
+        return cls(terms, df, len(docs))
+
+    def partial_fit(self, docs: Iterable[str]) -> "SemanticModel":
+        """Fold new documents into the document frequencies; unseen terms extend the vocabulary."""
+        docs = list(docs)
+        if not docs:
+            return self
+        vocab, new_df = self._doc_frequencies(docs)
+        new_terms = list(vocab)
+        cols = self.lookup(new_terms)
+        df = np.array(self.df, dtype=np.int64)  # copy: a loaded df may be a read-only memmap
+        added: List[str] = []
+        added_df: List[int] = []
+        for term, pos in zip(new_terms, cols.tolist()):
+            if pos < 0:
+                added.append(term)
+                added_df.append(int(new_df[vocab[term]]))
+            else:
+                df[pos] += new_df[vocab[term]]
+        terms = self.terms
+        if added:
+            df = np.concatenate([df, np.asarray(added_df, dtype=np.int64)])
+            terms = terms + added
+        self._terms = terms
+        self.df = df
+        self.n_docs += len(docs)
+        self.idf = self._compute_idf(df, self.n_docs)
+        self._keys, self._cols = self._build_index(terms)
+        return self
+
+    @property
+    def terms(self) -> List[str]:
+        """Vocabulary in column order (read from ``terms.txt`` on first use for a loaded model)."""
+        if self._terms is None:
+            text = (self._dir / "terms.txt").read_text(encoding="utf-8")
+            self._terms = text.split("\n") if text else []
+        return self._terms
+
+    @property
+    def n_terms(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, terms: Sequence[str]) -> np.ndarray:
+        """Column of each of ``terms``, or -1 for terms outside the vocabulary."""
+        keys = self._keys
+        if not len(terms) or not len(keys):
+            return np.full(len(terms), -1, dtype=np.int64)
+        encoded = [t.encode("utf-8") for t in terms]
+        # Keys are fixed width; a longer term cannot be in the vocabulary (and would be truncated)
+        fits = np.fromiter((len(e) <= keys.itemsize for e in encoded), dtype=bool, count=len(encoded))
+        query = np.array(encoded, dtype=keys.dtype)
+        pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+        found = fits & (keys[pos] == query)
+        return np.where(found, self._cols[pos], -1)
+
+    def _get_analyzer(self) -> Callable[[str], List[str]]:
+        if self._analyzer is None:
+            from sklearn.feature_extraction.text import CountVectorizer
+
+            # The same preprocessing, tokenization, stop words and n-grams the model was fitted with
+            self._analyzer = CountVectorizer(ngram_range=NGRAM_RANGE, stop_words=STOP_WORDS).build_analyzer()
+        return self._analyzer
+
+    def counts(self, docs: Sequence[str]):
+        """Term counts of ``docs`` over the frozen vocabulary (``CountVectorizer.transform`` equivalent)."""
+        import scipy.sparse as sp
+
+        analyzer = self._get_analyzer()
+        terms: List[str] = []
+        counts: List[int] = []
+        lengths: List[int] = []
+        for doc in docs:
+            c = Counter(analyzer(doc or ""))
+            terms.extend(c)
+            counts.extend(c.values())
+            lengths.append(len(c))
+        cols = self.lookup(terms)
+        keep = cols >= 0
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        return sp.csr_matrix(
+            (np.asarray(counts, dtype=np.float64)[keep], (rows[keep], cols[keep])), shape=(len(lengths), self.n_terms)
+        )
+
+    def transform(self, docs: Sequence[str]):
+        """L2-normalized TF-IDF rows for ``docs`` against the frozen vocabulary."""
+        from sklearn.preprocessing import normalize
+
+        counts = self.counts(docs)
+        return normalize(counts.multiply(self.idf).tocsr(), norm="l2", copy=False)
+
+    def similarity(self, a: str, b: str) -> float:
+        X = self.transform([a, b])
+        return float(X[0].multiply(X[1]).sum())
+
+    def similarity_matrix(self, docs_a: Sequence[str], docs_b: Sequence[str]):
+        A = self.transform(docs_a)
+        B = self.transform(docs_b)
+        return np.clip((A @ B.T).toarray(), 0.0, 1.0)
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        terms = self.terms
+        np.save(directory / "df.npy", np.asarray(self.df, dtype=np.int64))
+        np.save(directory / "idf.npy", self.idf)
+        np.save(directory / "keys.npy", np.asarray(self._keys))
+        np.save(directory / "cols.npy", np.asarray(self._cols))
+        (directory / "terms.txt").write_text("\n".join(terms), encoding="utf-8")
+        meta = {
+            "version": FORMAT_VERSION,
+            "n_docs": self.n_docs,
+            "n_terms": len(terms),
+            "ngram_range": list(NGRAM_RANGE),
+            "stop_words": STOP_WORDS,
+        }
+        (directory / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "SemanticModel":
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported semantic model format: {meta.get('version')}")
+        mode = "r" if mmap else None
+        model = cls.__new__(cls)
+        model._terms = None
+        model._dir = directory
+        model.df = np.load(directory / "df.npy", mmap_mode=mode)
+        model.n_docs = int(meta["n_docs"])
+        model.idf = np.load(directory / "idf.npy", mmap_mode=mode)
+        if (directory / "keys.npy").exists():
+            model._keys = np.load(directory / "keys.npy", mmap_mode=mode)
+            model._cols = np.load(directory / "cols.npy", mmap_mode=mode)
+        else:
+            # Saved before the index files existed: build the index in this process
+            model._keys, model._cols = cls._build_index(model.terms)
+        model._analyzer = None
+        return model
+
+
+def _read_corpus(paths: Iterable[str]) -> List[str]:
+    """Collect documents from .txt files, directories of them, or JSONL files with a "text" field."""
+    docs: List[str] = []
+    for raw in paths:
+        p = Path(raw)
+        files = sorted(p.rglob("*.txt")) if p.is_dir() else [p]
+        for f in files:
+            if f.suffix.lower() == ".jsonl":
+                for line in f.read_text(encoding="utf-8").splitlines():
+                    if line.strip():
+                        text = json.loads(line).get("text") or ""
+                        if text:
+                            docs.append(text)
+            else:
+                docs.append(f.read_text(encoding="utf-8", errors="ignore"))
+    return docs
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Fit or update the corpus TF-IDF model used for semantic scoring.")
+    ap.add_argument("inputs", nargs="+", help=".txt files, directories of .txt files, or .jsonl files")
+    ap.add_argument("--out", required=True, help="Model directory")
+    ap.add_argument("--update", action="store_true", help="Refit incrementally on top of the model in --out")
+    args = ap.parse_args(argv)
+
+    docs = _read_corpus(args.inputs)
+    out = Path(args.out)
+    if args.update and (out / "meta.json").exists():
+        model = SemanticModel.load(out, mmap=False).partial_fit(docs)
+    else:
+        model = SemanticModel.fit(docs)
+    model.save(out)
+    print(f"{len(docs)} documents, {model.n_docs} total, {len(model.terms)} terms -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+from __future__ import annotations
+import sys
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Sequence, Set, Tuple
+
+# Compact scoring results: keywords are interned once per keyword set in a
+# KeywordVocab, and a result keeps only two sorted arrays of keyword ids (the
+# resume's keywords and the JD focus) plus three floats. A result scored against
+# a large vocabulary still only pays for the keywords it names. Everything
+# score_text reports (matched/missing overall and per category, coverage) is
+# derived from those ids on demand.
+
+
+class KeywordVocab:
+    """
+    Interned, sorted keyword vocabulary with the keyword ids of each category.
+    Ids follow sorting order, so decoding sorted ids yields sorted keywords.
+    Shared by every result scored against the same keyword set.
+    """
+
+    def __init__(self, keywords_by_cat: Mapping[str, Iterable[str]]):
+        words: Set[str] = set()
+        for kws in keywords_by_cat.values():
+            words.update(kws)
+        self.terms: Tuple[str, ...] = tuple(sys.intern(w) for w in sorted(words))
+        self.ids: Dict[str, int] = {w: i for i, w in enumerate(self.terms)}
+        self.typecode = "H" if len(self.terms) <= 0xFFFF else "I"
+        self.categories: Dict[str, FrozenSet[int]] = {
+            cat: frozenset(self.ids[w] for w in kws) for cat, kws in keywords_by_cat.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def id_array(self, words: Iterable[str]) -> array:
+        """Sorted ids of the known keywords in ``words`` (unknown ones are ignored)."""
+        ids = self.ids
+        return array(self.typecode, sorted({ids[w] for w in words if w in ids}))
+
+    def words(self, ids: Iterable[int]) -> List[str]:
+        """Keywords for ``ids``, sorted."""
+        terms = self.terms
+        return [terms[i] for i in sorted(ids)]
+
+
+def get_vocab(keywords_by_cat: Mapping[str, Iterable[str]]) -> KeywordVocab:
+    """Vocabulary for a KeywordIndex (cached on it) or a plain category dict (built now)."""
+    from .matcher import KeywordIndex
+
+    if isinstance(keywords_by_cat, KeywordIndex):
+        return keywords_by_cat.vocab
+    return KeywordVocab(keywords_by_cat)
+
+
+class CompactScore:
+    """
+    A ``score_text`` result in compact form: the resume's keywords and the JD
+    focus as sorted keyword-id arrays over a shared KeywordVocab, plus the three
+    scores.
+
+    The JD focus is the JD's keywords (all keywords when it names none), so
+    matched = focus & resume and missing = focus - resume; a category's focus is
+    its keywords within the JD focus, or all of its keywords when that is empty.
+    """
+
+    __slots__ = ("vocab", "overall", "exact_score", "semantic", "resume_ids", "focus_ids")
+
+    def __init__(
+        self,
+        vocab: KeywordVocab,
+        overall: float,
+        exact_score: float,
+        semantic: float,
+        resume_ids: Sequence[int],
+        focus_ids: Sequence[int],
+    ):
+        self.vocab = vocab
+        self.overall = overall
+        self.exact_score = exact_score
+        self.semantic = semantic
+        self.resume_ids = resume_ids
+        self.focus_ids = focus_ids
+
+    @classmethod
+    def from_result(cls, result, keywords_by_cat: Mapping[str, Iterable[str]]) -> "CompactScore":
+        """Pack ``(overall, matched, missing, details)`` from score_text, score_many or a ScoringSession."""
+        overall, matched, missing, details = result
+        vocab = get_vocab(keywords_by_cat)
+        resume = set(matched)
+        # Categories whose focus fell back to all their keywords report matches outside the JD focus
+        for info in (details.get("category_breakdown") or {}).values():
+            resume.update(info.get("matched", ()))
+        return cls(
+            vocab,
+            float(overall),
+            float(details.get("exact_score", 0.0)),
+            float(details.get("semantic", 0.0)),
+            vocab.id_array(resume),
+            vocab.id_array(set(matched) | set(missing)),
+        )
+
+    def _matched_ids(self) -> List[int]:
+        resume = set(self.resume_ids)
+        return [i for i in self.focus_ids if i in resume]
+
+    @property
+    def matched(self) -> List[str]:
+        return self.vocab.words(self._matched_ids())
+
+    @property
+    def missing(self) -> List[str]:
+        resume = set(self.resume_ids)
+        return self.vocab.words(i for i in self.focus_ids if i not in resume)
+
+    def _category_ids(self) -> Iterable[Tuple[str, Set[int], List[int]]]:
+        """``(category, focus ids, matched ids)`` per category."""
+        for cat, cat_ids in self.vocab.categories.items():
+            focus = cat_ids.intersection(self.focus_ids) or cat_ids
+            yield cat, focus, [i for i in self.resume_ids if i in focus]
+
+    def coverage(self) -> Dict[str, float]:
+        return {
+            cat: 100.0 * len(matched) / max(1, len(focus)) for cat, focus, matched in self._category_ids()
+        }
+
+    def report(self) -> Dict[str, object]:
+        """The same JSON-serializable dict as ``scorer.score_report``, decoded straight from the ids."""
+        words = self.vocab.words
+        cat_json = {}
+        for cat, focus, matched in self._category_ids():
+            cat_json[cat] = {
+                "coverage": 100.0 * len(matched) / max(1, len(focus)),
+                "matched": words(matched),
+                "missing": words(focus.difference(matched)),
+            }
+        return {
+            "overall": self.overall,
+            "details": {"exact_score": self.exact_score, "semantic": self.semantic, "category_breakdown": cat_json},
+            "matched": self.matched,
+            "missing": self.missing,
+        }
+
+    def to_result(self):
+        """Expand back to score_text's ``(overall, matched, missing, details)`` with sets."""
+        cat_breakdown: Dict[str, Dict[str, object]] = {}
+        for cat, info in self.report()["details"]["category_breakdown"].items():
+            cat_breakdown[cat] = {
+                "coverage": info["coverage"],
+                "matched": set(info["matched"]),
+                "missing": set(info["missing"]),
+            }
+        details = {"exact_score": self.exact_score, "semantic": self.semantic, "category_breakdown": cat_breakdown}
+        return self.overall, set(self.matched), set(self.missing), details
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactScore(overall={self.overall}, exact_score={self.exact_score}, semantic={self.semantic}, "
+            f"matched={len(self._matched_ids())}/{len(self.focus_ids)})"
+        )